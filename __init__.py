@@ -1,3 +1,4 @@
+from .nodes.images_to_video import ImagesToVideo
 from .nodes.video_audio import VideoAudioMix
 from .nodes.video_compress import VideoCompress
 from .nodes.video_concat import VideoConcat
@@ -12,6 +13,17 @@ from .nodes.video_info import VideoInfo
 from .nodes.video_merge import VideoMerge
 from .nodes.video_metadata import VideoMetadata
 from .nodes.video_pip import VideoPiP
+from .nodes.video_pipeline import (
+    VideoPipelineLoad,
+    VideoPipelineFilter,
+    VideoPipelineEffects,
+    VideoPipelineEnhance,
+    VideoPipelineDenoise,
+    VideoPipelineCrop,
+    VideoPipelineScale,
+    VideoPipelineWatermark,
+    VideoPipelineRender,
+)
 from .nodes.video_resolution import VideoResolution
 from .nodes.video_resize import VideoResize
 from .nodes.video_reverse import VideoReverse
@@ -22,11 +34,13 @@ from .nodes.video_stabilize import VideoStabilize
 from .nodes.video_streaming import VideoStreaming
 from .nodes.video_subtitle import VideoSubtitle
 from .nodes.video_thumbnail import VideoThumbnail
+from .nodes.video_to_images import VideoToImages
 from .nodes.video_transition import VideoTransition
 from .nodes.video_trim import VideoTrim
 from .nodes.video_watermark import VideoWatermark
 
 NODE_CLASS_MAPPINGS = {
+    "ImagesToVideo": ImagesToVideo,
     "VideoAudioMix": VideoAudioMix,
     "VideoCompress": VideoCompress,
     "VideoConcat": VideoConcat,
@@ -41,6 +55,15 @@ NODE_CLASS_MAPPINGS = {
     "VideoMerge": VideoMerge,
     "VideoMetadata": VideoMetadata,
     "VideoPiP": VideoPiP,
+    "VideoPipelineLoad": VideoPipelineLoad,
+    "VideoPipelineFilter": VideoPipelineFilter,
+    "VideoPipelineEffects": VideoPipelineEffects,
+    "VideoPipelineEnhance": VideoPipelineEnhance,
+    "VideoPipelineDenoise": VideoPipelineDenoise,
+    "VideoPipelineCrop": VideoPipelineCrop,
+    "VideoPipelineScale": VideoPipelineScale,
+    "VideoPipelineWatermark": VideoPipelineWatermark,
+    "VideoPipelineRender": VideoPipelineRender,
     "VideoResolution": VideoResolution,
     "VideoResize": VideoResize,
     "VideoReverse": VideoReverse,
@@ -51,12 +74,14 @@ NODE_CLASS_MAPPINGS = {
     "VideoStreaming": VideoStreaming,
     "VideoSubtitle": VideoSubtitle,
     "VideoThumbnail": VideoThumbnail,
+    "VideoToImages": VideoToImages,
     "VideoTransition": VideoTransition,
     "VideoTrim": VideoTrim,
     "VideoWatermark": VideoWatermark
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
+    "ImagesToVideo": "图像转视频",
     "VideoAudioMix": "视频音频混音",
     "VideoCompress": "视频压缩",
     "VideoConcat": "视频拼接",
@@ -71,6 +96,15 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "VideoMerge": "视频合并",
     "VideoMetadata": "视频元数据",
     "VideoPiP": "视频画中画",
+    "VideoPipelineLoad": "视频管线输入",
+    "VideoPipelineFilter": "管线滤镜",
+    "VideoPipelineEffects": "管线特效",
+    "VideoPipelineEnhance": "管线增强",
+    "VideoPipelineDenoise": "管线降噪",
+    "VideoPipelineCrop": "管线裁剪",
+    "VideoPipelineScale": "管线缩放",
+    "VideoPipelineWatermark": "管线水印",
+    "VideoPipelineRender": "管线渲染",
     "VideoResolution": "视频分辨率",
     "VideoResize": "视频调整大小",
     "VideoReverse": "视频反转",
@@ -81,9 +115,10 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "VideoStreaming": "视频流处理",
     "VideoSubtitle": "视频字幕",
     "VideoThumbnail": "视频缩略图生成",
+    "VideoToImages": "视频转图像",
     "VideoTransition": "视频转场",
     "VideoTrim": "视频剪辑",
     "VideoWatermark": "视频水印"
 }
 
-__all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS', 'VideoAudioMix', 'VideoCompress', 'VideoConcat', 'VideoConvert', 'VideoCrop', 'VideoDenoise', 'VideoEffects', 'VideoEnhance', 'VideoFilter', 'VideoFormat', 'VideoInfo', 'VideoMerge', 'VideoMetadata', 'VideoMixing', 'VideoPiP', 'VideoResolution', 'VideoResize', 'VideoReverse', 'VideoRotate', 'VideoSpeed', 'VideoSplitting', 'VideoStabilize', 'VideoStreaming', 'VideoSubtitle', 'VideoThumbnail', 'VideoTransition', 'VideoTrim', 'VideoWatermark']
\ No newline at end of file
+__all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS', 'ImagesToVideo', 'VideoAudioMix', 'VideoCompress', 'VideoConcat', 'VideoConvert', 'VideoCrop', 'VideoDenoise', 'VideoEffects', 'VideoEnhance', 'VideoFilter', 'VideoFormat', 'VideoInfo', 'VideoMerge', 'VideoMetadata', 'VideoMixing', 'VideoPiP', 'VideoPipelineLoad', 'VideoPipelineFilter', 'VideoPipelineEffects', 'VideoPipelineEnhance', 'VideoPipelineDenoise', 'VideoPipelineCrop', 'VideoPipelineScale', 'VideoPipelineWatermark', 'VideoPipelineRender', 'VideoResolution', 'VideoResize', 'VideoReverse', 'VideoRotate', 'VideoSpeed', 'VideoSplitting', 'VideoStabilize', 'VideoStreaming', 'VideoSubtitle', 'VideoThumbnail', 'VideoToImages', 'VideoTransition', 'VideoTrim', 'VideoWatermark']
\ No newline at end of file
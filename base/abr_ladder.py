@@ -0,0 +1,97 @@
+"""
+自适应码率(ABR)阶梯
+根据源视频的分辨率、帧率和码率生成各档清晰度，所有档位由一个ffmpeg进程
+解码一次后 split 成多路分别缩放、编码
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .media_info import MediaInfo
+
+# 常见高度及30fps下的参考码率(kbps)
+_STANDARD_RUNGS = [
+    (2160, 14000),
+    (1440, 8000),
+    (1080, 5000),
+    (720, 2800),
+    (480, 1400),
+    (360, 800),
+    (240, 400),
+]
+
+# 没有更小的标准档位时的最小高度
+_MIN_HEIGHT = 144
+
+
+@dataclass(frozen=True)
+class Rung:
+    """阶梯中的一档"""
+    height: int
+    bitrate: int        # 视频码率(kbps)
+
+    @property
+    def maxrate(self) -> int:
+        return int(self.bitrate * 1.07)
+
+    @property
+    def bufsize(self) -> int:
+        return int(self.bitrate * 1.5)
+
+
+def _reference_bitrate(height: int) -> int:
+    """按像素数在标准档位之间插值参考码率"""
+    for standard_height, bitrate in _STANDARD_RUNGS:
+        if height >= standard_height:
+            return int(bitrate * (height / standard_height) ** 2)
+    smallest_height, smallest_bitrate = _STANDARD_RUNGS[-1]
+    return max(100, int(smallest_bitrate * (height / smallest_height) ** 2))
+
+
+def build_ladder(info: MediaInfo, levels: int) -> List[Rung]:
+    """
+    生成码率阶梯，从高到低排列
+    最高档为源分辨率，其余从低于源分辨率的标准高度中选取，码率不超过源视频码率
+    """
+    video = info.video
+    if video is None or not video.height:
+        raise ValueError("无法获取视频分辨率")
+
+    source_height = video.height - video.height % 2
+    heights = [source_height]
+    heights.extend(h for h, _ in _STANDARD_RUNGS if h < source_height * 0.9)
+    if len(heights) < levels and source_height > _MIN_HEIGHT:
+        heights.append(_MIN_HEIGHT)
+    heights = heights[:max(1, levels)]
+
+    # 高帧率需要更高码率
+    fps_factor = 1.5 if (video.frame_rate or 30.0) > 40 else 1.0
+    source_bitrate = _source_video_bitrate(info)
+
+    ladder = []
+    for height in heights:
+        bitrate = int(_reference_bitrate(height) * fps_factor)
+        if source_bitrate:
+            # 按分辨率比例缩放源码率作为上限
+            bitrate = min(bitrate, max(100, int(source_bitrate * (height / source_height) ** 2)))
+        ladder.append(Rung(height, bitrate))
+    return ladder
+
+
+def _source_video_bitrate(info: MediaInfo) -> Optional[int]:
+    """源视频码率(kbps)，视频流没有码率时用总码率减去音频码率估计"""
+    video = info.video
+    if video is not None and video.bit_rate:
+        return video.bit_rate // 1000
+    if info.bit_rate:
+        audio_bitrate = info.audio.bit_rate if info.audio is not None and info.audio.bit_rate else 0
+        return max(0, info.bit_rate - audio_bitrate) // 1000 or None
+    return None
+
+
+def build_split_filter(ladder: List[Rung]) -> str:
+    """解码一次后split成多路并分别缩放，输出标签为 [out0]、[out1] ..."""
+    outputs = "".join(f"[s{i}]" for i in range(len(ladder)))
+    graph = [f"[0:v]split={len(ladder)}{outputs}"]
+    for i, rung in enumerate(ladder):
+        graph.append(f"[s{i}]scale=-2:{rung.height}[out{i}]")
+    return ";".join(graph)
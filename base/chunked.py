@@ -0,0 +1,104 @@
+"""
+分段并行编码
+在关键帧处把输入切成若干段，各段由独立的ffmpeg进程并行处理，再用concat分离器无损拼接。
+时域滤镜(hqdn3d、minterpolate等)依赖前面的帧，每段从起点之前 overlap 秒开始解码，
+处理后再用 trim 裁掉重叠部分，保证段与段之间的衔接
+"""
+import os
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+# 每段的最短时长(秒)，太短的分段启动开销大于并行收益
+MIN_CHUNK_DURATION = 2.0
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """一个分段，时间均为相对文件起点的秒数"""
+    index: int
+    start: float            # 本段起点(关键帧)
+    end: Optional[float]    # 本段终点(下一段的起点)，None表示到文件结尾
+    seek: float             # 输入端 -ss 位置，即起点减去重叠时长
+
+
+def plan_chunks(keyframes: Sequence[float], duration: float, chunks: int,
+                overlap: float = 0.0,
+                min_duration: float = MIN_CHUNK_DURATION) -> List[Chunk]:
+    """
+    在关键帧处规划分段
+    keyframes: 升序的关键帧时间
+    返回: 分段列表，不值得分段时返回空列表
+    """
+    if chunks < 2 or not duration or not keyframes:
+        return []
+    chunks = min(chunks, int(duration // min_duration))
+
+    boundaries = [0.0]
+    for k in range(1, chunks):
+        # 均分点之前最近的关键帧
+        i = bisect_right(keyframes, duration * k / chunks) - 1
+        if i < 0:
+            continue
+        t = keyframes[i]
+        if t - boundaries[-1] >= min_duration and duration - t >= min_duration:
+            boundaries.append(t)
+
+    if len(boundaries) < 2:
+        return []
+
+    result = []
+    for i, start in enumerate(boundaries):
+        end = boundaries[i + 1] if i + 1 < len(boundaries) else None
+        result.append(Chunk(i, start, end, max(0.0, start - overlap)))
+    return result
+
+
+def build_chunk_command(command: List[str], chunk: Chunk, output_path: str,
+                        frame_time: float, overlap: float = 0.0) -> List[str]:
+    """
+    由整段处理的命令生成单个分段的命令
+    要求命令只有一个输入并使用 -vf，分段只输出视频，音频在拼接时从原文件复制
+    """
+    new_command = list(command[:-1])
+
+    # 裁掉重叠部分，边界取半帧，避免浮点误差导致边界帧重复或丢失
+    trim = []
+    if chunk.start > chunk.seek:
+        trim.append(f"start={chunk.start - chunk.seek - frame_time / 2:.6f}")
+    if chunk.end is not None:
+        trim.append(f"end={chunk.end - chunk.seek - frame_time / 2:.6f}")
+    if trim:
+        vf_index = new_command.index("-vf") + 1
+        filters = [f for f in (new_command[vf_index], "trim=" + ":".join(trim), "setpts=PTS-STARTPTS") if f]
+        new_command[vf_index] = ",".join(filters)
+
+    # 输入端定位，并限制读取长度(trim不会让解码提前结束)
+    input_options = ["-ss", f"{chunk.seek:.6f}"]
+    if chunk.end is not None:
+        input_options.extend(["-t", f"{chunk.end - chunk.seek + overlap + 0.5:.6f}"])
+    input_index = new_command.index("-i")
+    new_command[input_index:input_index] = input_options
+
+    new_command.extend(["-an", output_path])
+    return new_command
+
+
+def write_concat_list(list_path: str, files: List[str]) -> None:
+    """写入concat分离器使用的文件列表"""
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in files:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def build_concat_command(list_path: str, audio_source: str, output_path: str) -> List[str]:
+    """拼接各段视频并从原文件复制音频，全部流复制不重新编码"""
+    return [
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-i", audio_source,
+        "-map", "0:v", "-map", "1:a?",
+        "-c", "copy",
+        output_path
+    ]
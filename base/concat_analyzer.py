@@ -0,0 +1,133 @@
+"""
+拼接兼容性分析
+根据探测信息比较各输入的编码格式、profile、分辨率、像素格式、时间基、SAR和音频布局，
+判断能否用concat分离器直接流复制；不兼容时找出多数格式，只把少数不一致的片段转成该格式
+"""
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .media_info import MediaInfo
+from .smart_cut import matching_encoder_args, timescale_args
+
+# 音频编码格式 -> 编码器
+_AUDIO_ENCODERS = {
+    "aac": "aac",
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+    "vorbis": "libvorbis",
+    "ac3": "ac3",
+    "flac": "flac",
+    "pcm_s16le": "pcm_s16le",
+}
+
+
+@dataclass(frozen=True)
+class StreamSignature:
+    """决定能否流复制拼接的参数"""
+    codec: Optional[str]
+    profile: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    pix_fmt: Optional[str]
+    time_base: Optional[str]
+    sample_aspect_ratio: str
+    audio_codec: Optional[str]
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    channel_layout: Optional[str]
+
+    @classmethod
+    def from_media_info(cls, info: MediaInfo) -> "StreamSignature":
+        video = info.video
+        audio = info.audio
+        sar = video.sample_aspect_ratio if video is not None else None
+        # 未设置SAR的视频按方形像素处理
+        if not sar or sar in ("0:1", "N/A"):
+            sar = "1:1"
+        return cls(
+            codec=video.codec_name if video else None,
+            profile=video.profile if video else None,
+            width=video.width if video else None,
+            height=video.height if video else None,
+            pix_fmt=video.pix_fmt if video else None,
+            time_base=video.time_base if video else None,
+            sample_aspect_ratio=sar,
+            audio_codec=audio.codec_name if audio else None,
+            sample_rate=audio.sample_rate if audio else None,
+            channels=audio.channels if audio else None,
+            channel_layout=audio.channel_layout if audio else None,
+        )
+
+
+@dataclass(frozen=True)
+class ConcatPlan:
+    """拼接方案"""
+    target: StreamSignature     # 多数输入的格式
+    reference: int              # 具有目标格式的第一个输入
+    outliers: Tuple[int, ...]   # 需要转换格式的输入
+
+    @property
+    def compatible(self) -> bool:
+        return not self.outliers
+
+
+def analyze_concat(infos: List[MediaInfo]) -> ConcatPlan:
+    """分析各输入能否直接流复制拼接，数量相同时以先出现的格式为准"""
+    signatures = [StreamSignature.from_media_info(info) for info in infos]
+    target, _ = Counter(signatures).most_common(1)[0]
+    return ConcatPlan(
+        target=target,
+        reference=signatures.index(target),
+        outliers=tuple(i for i, signature in enumerate(signatures) if signature != target),
+    )
+
+
+def build_conform_command(source: MediaInfo, reference: MediaInfo, output_path: str,
+                          crf: int = 23, preset: str = "medium") -> Optional[List[str]]:
+    """
+    把source转换成与reference相同格式的命令
+    目标编码格式不支持重新编码时返回None
+    """
+    target = StreamSignature.from_media_info(reference)
+    video = reference.video
+    encoder_args = matching_encoder_args(video) if video is not None else None
+    if encoder_args is None:
+        return None
+
+    command = ["ffmpeg", "-y", "-i", source.path]
+
+    # 目标有音频而该片段没有时补一段静音，保证拼接后音视频对齐
+    needs_silence = target.audio_codec is not None and source.audio is None
+    if needs_silence:
+        layout = target.channel_layout or "stereo"
+        command.extend(["-f", "lavfi", "-i",
+                        f"anullsrc=channel_layout={layout}:sample_rate={target.sample_rate or 48000}"])
+
+    command.extend(["-map", "0:v:0"])
+    if target.audio_codec is not None:
+        command.extend(["-map", "1:a:0" if needs_silence else "0:a:0"])
+
+    sar = target.sample_aspect_ratio.replace(":", "/")
+    command.extend([
+        "-vf", (f"scale={target.width}:{target.height}:force_original_aspect_ratio=decrease,"
+                f"pad={target.width}:{target.height}:(ow-iw)/2:(oh-ih)/2,setsar={sar}"),
+        *encoder_args,
+        "-preset", preset,
+        "-crf", str(crf),
+        *timescale_args(video),
+    ])
+
+    if target.audio_codec is None:
+        command.append("-an")
+    else:
+        command.extend(["-c:a", _AUDIO_ENCODERS.get(target.audio_codec, "aac")])
+        if target.sample_rate:
+            command.extend(["-ar", str(target.sample_rate)])
+        if target.channels:
+            command.extend(["-ac", str(target.channels)])
+        if needs_silence:
+            command.append("-shortest")
+
+    command.append(output_path)
+    return command
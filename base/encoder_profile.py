@@ -0,0 +1,158 @@
+"""
+视频编码参数
+用 (编码格式, 质量, 速度) 描述编码需求，再按实际使用的编码器转换为对应的参数，
+质量统一使用x264的CRF刻度，速度统一使用x264的预设名称
+"""
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .scheduler import load_settings
+
+# 速度档位，从快到慢
+SPEED_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast",
+                 "medium", "slow", "slower", "veryslow"]
+DEFAULT_SPEED = "medium"
+
+# 编码格式别名
+_CODEC_ALIASES = {"h265": "hevc", "x264": "h264", "x265": "hevc", "vp09": "vp9"}
+
+# 编码格式 -> 软件编码器
+SOFTWARE_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "av1": "libsvtav1",
+    "vp9": "libvpx-vp9",
+}
+
+# 各速度档位对应的编码器预设(与 SPEED_PRESETS 一一对应)
+_NVENC_PRESETS = ["p1", "p1", "p2", "p3", "p3", "p4", "p5", "p6", "p7"]
+_QSV_PRESETS = ["veryfast", "veryfast", "veryfast", "faster", "fast",
+                "medium", "slow", "slower", "veryslow"]
+_AMF_QUALITY = ["speed", "speed", "speed", "speed", "balanced",
+                "balanced", "quality", "quality", "quality"]
+_SVTAV1_PRESETS = [13, 12, 11, 10, 9, 8, 6, 4, 2]
+_VP9_CPU_USED = [8, 7, 5, 5, 4, 3, 2, 1, 0]
+
+# 与x264相近画质时各编码器的质量值偏移(x265的CRF 28约等于x264的CRF 23)
+_QUALITY_OFFSETS = {
+    "libx265": 5,
+    "libsvtav1": 12,
+    "libvpx-vp9": 10,
+}
+# 质量值的上限
+_QUALITY_LIMITS = {
+    "libsvtav1": 63,
+    "libvpx-vp9": 63,
+}
+
+
+def per_stream_args(args: List[str], index: int) -> List[str]:
+    """把编码参数限定到第index路视频输出流，如 -c:v -> -c:v:0、-preset -> -preset:v:0"""
+    result = []
+    for name, value in zip(args[::2], args[1::2]):
+        name = f"{name}:{index}" if name.endswith(":v") else f"{name}:v:{index}"
+        result.extend([name, value])
+    return result
+
+
+def normalize_codec(codec: str) -> str:
+    codec = codec.lower()
+    return _CODEC_ALIASES.get(codec, codec)
+
+
+def normalize_speed(speed: Optional[str]) -> str:
+    """速度档位，无法识别时使用全局默认值"""
+    if speed in SPEED_PRESETS:
+        return speed
+    return get_default_speed()
+
+
+def get_default_speed() -> str:
+    """
+    全局速度档位，环境变量优先于配置文件
+    COMFYUI_FFMPEG_ENCODER_SPEED 或配置文件中的 encoder.speed
+    """
+    speed = os.environ.get("COMFYUI_FFMPEG_ENCODER_SPEED",
+                           load_settings().get("encoder", {}).get("speed", DEFAULT_SPEED))
+    return speed if speed in SPEED_PRESETS else DEFAULT_SPEED
+
+
+def get_quality_offset() -> int:
+    """
+    全局质量偏移，加到所有节点的质量值上(正数文件更小，负数画质更高)
+    COMFYUI_FFMPEG_QUALITY_OFFSET 或配置文件中的 encoder.quality_offset
+    """
+    try:
+        return int(os.environ.get("COMFYUI_FFMPEG_QUALITY_OFFSET",
+                                  load_settings().get("encoder", {}).get("quality_offset", 0)))
+    except ValueError:
+        return 0
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """
+    编码需求
+    quality: x264刻度的CRF值(0~51，越小画质越高)
+    speed: x264预设名称
+    bitrate: 目标码率(kbps)，设置后使用码率模式而不是恒定质量
+    tune: x264/x265的 -tune 参数，硬件编码器忽略
+    """
+    codec: str = "h264"
+    quality: int = 23
+    speed: str = DEFAULT_SPEED
+    bitrate: Optional[int] = None
+    tune: Optional[str] = None
+
+    @property
+    def software_encoder(self) -> str:
+        return SOFTWARE_ENCODERS.get(normalize_codec(self.codec), "libx264")
+
+    def quality_for(self, encoder: str) -> int:
+        """把x264刻度的质量值转换为编码器自己的刻度"""
+        quality = self.quality + _QUALITY_OFFSETS.get(encoder, 0)
+        return max(0, min(_QUALITY_LIMITS.get(encoder, 51), quality))
+
+    def args(self, encoder: Optional[str] = None) -> List[str]:
+        """生成编码器参数(-c:v 及质量、速度参数)，encoder为空时使用软件编码器"""
+        encoder = encoder or self.software_encoder
+        level = SPEED_PRESETS.index(self.speed) if self.speed in SPEED_PRESETS else 5
+        quality = self.quality_for(encoder)
+        args = ["-c:v", encoder]
+
+        if encoder in ("libx264", "libx265"):
+            args.extend(["-preset", SPEED_PRESETS[level]])
+            if self.tune:
+                args.extend(["-tune", self.tune])
+            args.extend(self._rate_args(["-crf", str(quality)]))
+        elif encoder.endswith("_nvenc"):
+            args.extend(["-preset", _NVENC_PRESETS[level], "-tune", "hq", "-rc", "vbr"])
+            args.extend(self._rate_args(["-cq", str(quality), "-b:v", "0"]))
+        elif encoder.endswith("_qsv"):
+            args.extend(["-preset", _QSV_PRESETS[level]])
+            args.extend(self._rate_args(["-global_quality", str(quality)]))
+        elif encoder.endswith("_amf"):
+            args.extend(["-quality", _AMF_QUALITY[level]])
+            args.extend(self._rate_args(["-rc", "cqp", "-qp_i", str(quality), "-qp_p", str(quality)]))
+        elif encoder.endswith("_vaapi"):
+            # 需要调用方添加 -vaapi_device 和 format=nv12,hwupload 滤镜
+            args.extend(self._rate_args(["-qp", str(quality)]))
+        elif encoder.endswith("_videotoolbox"):
+            # VideoToolbox 使用0~100的质量值
+            args.extend(self._rate_args(["-q:v", str(max(1, 100 - quality * 2))]))
+        elif encoder == "libsvtav1":
+            args.extend(["-preset", str(_SVTAV1_PRESETS[level])])
+            args.extend(self._rate_args(["-crf", str(quality)]))
+        elif encoder == "libvpx-vp9":
+            args.extend(["-deadline", "realtime" if level < 2 else "good",
+                         "-cpu-used", str(_VP9_CPU_USED[level]), "-row-mt", "1"])
+            args.extend(self._rate_args(["-crf", str(quality), "-b:v", "0"]))
+        else:
+            args.extend(self._rate_args([]))
+        return args
+
+    def _rate_args(self, quality_args: List[str]) -> List[str]:
+        if self.bitrate:
+            return ["-b:v", f"{self.bitrate}k"]
+        return quality_args
@@ -1,15 +1,50 @@
 import os
 import sys
 import hashlib
+import time
+import shutil
+import tempfile
 import subprocess
-from typing import List, Dict, Tuple, Optional, Union
+from contextlib import contextmanager
+from typing import Callable, Deque, Iterator, List, Dict, Tuple, Optional, Union
 import folder_paths
+from .media_info import MediaInfo, PROBE_CACHE
+from .probe_index import get_probe_index
+from .keyframe_index import KeyframeIndex, KEYFRAME_CACHE, FLAG_DISCARD
+from .scene_index import SceneIndex, SCENE_CACHE, INDEX_KIND as SCENE_INDEX_KIND, build_scene_filter
+from .progress import FFmpegProgress, ProgressParser, ProgressCallback, ComfyProgressBar
+from .scheduler import get_scheduler, apply_thread_limits, PRIORITY_NORMAL
+from .result_cache import get_result_cache
+from .fingerprint import fingerprint_file
+from .frame_cache import CachedFrames, PIXEL_FORMATS, get_frame_cache
+from .encoder_profile import EncoderProfile, normalize_codec, normalize_speed, get_quality_offset
+from .hw_caps import Capabilities, SOFTWARE_ONLY, get_capabilities, adapt_command, uses_hardware
+from .telemetry import TrackedPopen, get_telemetry, parse_speed, record_process, run_tracked
+from .concat_analyzer import analyze_concat, build_conform_command
+from .chunked import plan_chunks, build_chunk_command, write_concat_list, build_concat_command
+
+# 常见媒体文件扩展名
+MEDIA_EXTENSIONS = (
+    ".mp4", ".mov", ".mkv", ".avi", ".webm", ".flv", ".wmv", ".m4v", ".ts", ".gif",
+    ".mp3", ".wav", ".aac", ".flac", ".m4a", ".ogg", ".opus"
+)
+
+# ffmpeg版本信息缓存 {可执行文件路径: 版本}
+_FFMPEG_VERSIONS: Dict[str, str] = {}
 
 class FFmpegBase:
     """
     FFmpeg基础类
     提供FFmpeg操作的基础功能和工具方法
     """
+    # 进度模式下保留的标准错误行数
+    STDERR_TAIL_LINES = 200
+    # 调度优先级，交互类节点可以覆盖为 PRIORITY_INTERACTIVE
+    JOB_PRIORITY = PRIORITY_NORMAL
+    # 是否缓存输出结果，只适用于单一输入输出文件的节点
+    CACHE_RESULTS = False
+    # 编码速度档位(x264预设名称)，None表示使用全局设置
+    ENCODER_SPEED: Optional[str] = None
     
     def __init__(self):
         self.ffmpeg_path = self._get_ffmpeg_path()
@@ -31,74 +66,514 @@ class FFmpegBase:
             return 'ffprobe.exe'
         return 'ffprobe'
 
-    def get_video_hash(self, video_path: str) -> str:
+    def get_video_hash(self, *video_paths: str) -> str:
         """
         生成视频文件的哈希值
-        用于创建唯一的输出文件名
+        用于创建唯一的输出文件名，基于文件内容指纹(与路径无关)，多个输入时组合各自的指纹
         """
-        if not os.path.exists(video_path):
-            return hashlib.md5(video_path.encode()).hexdigest()[:8]
-        
-        file_stat = os.stat(video_path)
-        hash_input = f"{video_path}{file_stat.st_size}{file_stat.st_mtime}"
-        return hashlib.md5(hash_input.encode()).hexdigest()[:8]
+        parts = []
+        for video_path in video_paths:
+            try:
+                parts.append(fingerprint_file(video_path))
+            except OSError:
+                # 不存在的文件(流地址等)使用路径本身
+                parts.append("path:" + video_path)
+        if len(parts) == 1 and not parts[0].startswith("path:"):
+            return parts[0][:16]
+        return hashlib.blake2b("\n".join(parts).encode(), digest_size=8).hexdigest()
 
     def get_gpu_params(self, use_gpu: bool) -> Dict[str, Union[List[str], str]]:
         """
         获取GPU相关的FFmpeg参数
+        按实际检测到的能力选择最快的硬件解码方式和编码器，没有可用硬件时使用软件编码
         """
         if not use_gpu:
             return {
                 "hw_accel": [],
-                "h264_encoder": "libx264"
+                "h264_encoder": "libx264",
+                "hevc_encoder": "libx265"
             }
 
-        # 检测系统和GPU类型
-        if sys.platform == 'win32':
-            # NVIDIA GPU
-            return {
-                "hw_accel": ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"],
-                "h264_encoder": "h264_nvenc"
-            }
-        elif sys.platform == 'darwin':
-            # macOS (VideoToolbox)
-            return {
-                "hw_accel": ["-hwaccel", "videotoolbox"],
-                "h264_encoder": "h264_videotoolbox"
-            }
-        else:
-            # Linux (VAAPI)
-            return {
-                "hw_accel": ["-hwaccel", "vaapi", "-hwaccel_output_format", "vaapi"],
-                "h264_encoder": "h264_vaapi"
-            }
+        caps = self.get_capabilities()
+        hwaccel = caps.best_hwaccel()
+        return {
+            # 不指定 -hwaccel_output_format，解码后的帧回到内存，后续可以使用任意软件滤镜
+            "hw_accel": ["-hwaccel", hwaccel] if hwaccel else [],
+            "h264_encoder": caps.best_encoder("h264"),
+            "hevc_encoder": caps.best_encoder("hevc")
+        }
 
-    def execute_ffmpeg(self, command: List[str]) -> Tuple[bool, str]:
+    def get_encoder_profile(self, quality: int = 23, codec: str = "h264",
+                            speed: Optional[str] = None, bitrate: Optional[int] = None,
+                            tune: Optional[str] = None) -> EncoderProfile:
+        """
+        生成编码需求
+        速度依次使用参数、节点的 ENCODER_SPEED 和全局设置，质量加上全局质量偏移
+        """
+        return EncoderProfile(
+            codec=normalize_codec(codec),
+            quality=quality + get_quality_offset(),
+            speed=normalize_speed(speed or self.ENCODER_SPEED),
+            bitrate=bitrate,
+            tune=tune
+        )
+
+    def get_encoder_args(self, use_gpu: bool, quality: int = 23, codec: str = "h264",
+                         speed: Optional[str] = None, bitrate: Optional[int] = None,
+                         tune: Optional[str] = None) -> List[str]:
+        """
+        获取视频编码参数(-c:v 及质量、速度参数)
+        use_gpu 时使用检测到的硬件编码器，没有对应的硬件编码器时使用软件编码器
+        """
+        profile = self.get_encoder_profile(quality, codec, speed, bitrate, tune)
+        encoder = None
+        if use_gpu:
+            encoder = self.get_gpu_params(True).get(f"{profile.codec}_encoder")
+        return profile.args(encoder)
+
+    def get_capabilities(self) -> Capabilities:
+        """获取ffmpeg的硬件编解码能力(按可执行文件和版本缓存)"""
+        try:
+            return get_capabilities(self.ffmpeg_path, self.get_ffmpeg_version())
+        except Exception as e:
+            print(f"检测硬件能力失败: {str(e)}")
+            return SOFTWARE_ONLY
+
+    def get_ffmpeg_version(self) -> str:
+        """获取ffmpeg版本信息(按可执行文件路径缓存)"""
+        version = _FFMPEG_VERSIONS.get(self.ffmpeg_path)
+        if version is None:
+            try:
+                _, stdout, _ = run_tracked([self.ffmpeg_path, "-version"], type(self).__name__)
+                version = stdout.splitlines()[0] if stdout else ""
+            except OSError:
+                version = ""
+            _FFMPEG_VERSIONS[self.ffmpeg_path] = version
+        return version
+
+    def execute_ffmpeg(self, command: List[str], **kwargs) -> Tuple[bool, str]:
         """
         执行FFmpeg命令
+        参数同 run_ffmpeg
         返回: (成功标志, 输出信息)
         """
+        returncode, stdout, stderr = self.run_ffmpeg(command, **kwargs)
+
+        # 检查执行结果
+        if returncode != 0:
+            return False, stderr
+
+        return True, stdout
+
+    def execute_composite(self, key_command: List[str],
+                          producer: Callable[[str], Tuple[bool, str]]) -> Tuple[bool, str]:
+        """
+        执行由多个ffmpeg进程组成的任务(分段编码、智能剪切等)，并接入结果缓存
+        Args:
+            key_command: 描述该任务的等价命令，用于生成缓存键，最后一个参数为输出路径
+            producer: 接收实际写入路径，返回 (是否成功, 错误信息)
+        """
+        output_path = key_command[-1]
+        result_cache = get_result_cache() if self.CACHE_RESULTS else None
+        cache_key = result_cache.make_key(key_command, self.get_ffmpeg_version()) if result_cache else None
+        if cache_key:
+            if result_cache.restore(cache_key, output_path):
+                return True, ""
+            target = result_cache.temp_path(cache_key, output_path)
+        else:
+            target = output_path
+            self._detach_output(output_path)
+
+        try:
+            success, message = producer(target)
+        except Exception as e:
+            success, message = False, str(e)
+
+        if cache_key:
+            if success:
+                result_cache.publish(cache_key, target, output_path)
+            else:
+                self.cleanup_temp_files(target)
+        return success, message
+
+    def run_ffmpeg_parallel(self, commands: List[List[str]]) -> Tuple[bool, str]:
+        """
+        并行执行多条ffmpeg命令(并发数和线程数由调度器限制)，进度按完成的命令数显示
+        返回: (是否全部成功, 第一个失败命令的错误信息)
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        progress_bar = ComfyProgressBar()
+        failed = None
+        with ThreadPoolExecutor(max_workers=max(1, len(commands))) as pool:
+            futures = [
+                pool.submit(self.run_ffmpeg, command, progress=False, cache=False)
+                for command in commands
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                returncode, _, stderr = future.result()
+                if returncode != 0 and failed is None:
+                    failed = stderr
+                progress_bar.update(FFmpegProgress(out_time=done, duration=len(commands)))
+        return failed is None, failed or ""
+
+    def execute_ffmpeg_chunked(self, command: List[str], chunks: Optional[int] = None,
+                               overlap: float = 0.0) -> Tuple[bool, str]:
+        """
+        分段并行执行单输入、使用 -vf 的滤镜命令
+        Args:
+            command: 与 execute_ffmpeg 相同的完整命令
+            chunks: 分段数，默认使用调度器的最大并发数
+            overlap: 时域滤镜需要的预热时长(秒)
+        无法分段(没有关键帧信息、视频太短、命令不符合要求)时退回整段执行
+        """
+        input_path = self._find_input_path(command)
+        if input_path is None or command.count("-i") != 1 or "-vf" not in command:
+            return self.execute_ffmpeg(command)
+
+        if chunks is None:
+            chunks = get_scheduler().config.max_jobs
+        duration = self.get_video_duration(input_path)
+        plan = plan_chunks(self.get_keyframe_times(input_path), duration, chunks, overlap)
+        if not plan:
+            return self.execute_ffmpeg(command)
+
+        framerate = self.get_video_framerate(input_path) or 30.0
+
+        def produce(target: str) -> Tuple[bool, str]:
+            work_dir = tempfile.mkdtemp(prefix="chunks_", dir=self.temp_dir)
+            try:
+                chunk_files = [os.path.join(work_dir, f"chunk_{chunk.index:04d}.mkv") for chunk in plan]
+                success, message = self.run_ffmpeg_parallel([
+                    build_chunk_command(command, chunk, path, 1.0 / framerate, overlap)
+                    for chunk, path in zip(plan, chunk_files)
+                ])
+                if not success:
+                    return False, message
+
+                list_path = os.path.join(work_dir, "concat_list.txt")
+                write_concat_list(list_path, chunk_files)
+                returncode, _, stderr = self.run_ffmpeg(
+                    build_concat_command(list_path, input_path, target), progress=False, cache=False
+                )
+                return returncode == 0, stderr
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        return self.execute_composite(command, produce)
+
+    def concat_stream_copy(self, video_list: List[str], output_path: str,
+                           crf: int = 23, preset: str = "medium") -> Optional[Tuple[bool, str]]:
+        """
+        尽量使用流复制拼接视频
+        各输入格式一致时直接用concat分离器 -c copy；否则只把与多数格式不同的片段
+        重新编码为多数格式，再全部流复制拼接
+        无法分析或目标编码格式不支持重新编码时返回None，由调用方完整重新编码
+        """
+        infos = [self.probe(video) for video in video_list]
+        if any(info is None or info.video is None for info in infos):
+            return None
+
+        plan = analyze_concat(infos)
+        reference = infos[plan.reference]
+        ext = os.path.splitext(reference.path)[1] or ".mp4"
+
+        conform_commands = {}
+        for i in plan.outliers:
+            command = build_conform_command(infos[i], reference, f"conform_{i:03d}{ext}", crf, preset)
+            if command is None:
+                return None
+            conform_commands[i] = command
+
+        def produce(target: str) -> Tuple[bool, str]:
+            work_dir = tempfile.mkdtemp(prefix="concat_", dir=self.temp_dir)
+            try:
+                files = list(video_list)
+                commands = []
+                for i, command in conform_commands.items():
+                    files[i] = os.path.join(work_dir, command[-1])
+                    commands.append(command[:-1] + [files[i]])
+                if commands:
+                    print(f"拼接: {len(commands)}/{len(files)} 个片段格式不一致，转换后流复制拼接")
+                    success, message = self.run_ffmpeg_parallel(commands)
+                    if not success:
+                        return False, message
+
+                list_path = os.path.join(work_dir, "concat_list.txt")
+                write_concat_list(list_path, files)
+                command = [
+                    "ffmpeg", "-y",
+                    "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-map", "0:v", "-map", "0:a?",
+                    "-c", "copy",
+                    target
+                ]
+                returncode, _, stderr = self.run_ffmpeg(command, progress=False, cache=False)
+                return returncode == 0, stderr
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        key_command = ["ffmpeg"]
+        for video in video_list:
+            key_command.extend(["-i", video])
+        key_command.extend(["concat_copy", str(crf), preset, output_path])
+        return self.execute_composite(key_command, produce)
+
+    def run_ffmpeg(self, command: List[str], timeout: int = 3600,
+                   progress: bool = True,
+                   progress_callback: Optional[ProgressCallback] = None,
+                   duration: Optional[float] = None,
+                   priority: Optional[int] = None,
+                   cache: Optional[bool] = None) -> Tuple[int, str, str]:
+        """执行ffmpeg命令
+        Args:
+            command: ffmpeg命令参数列表
+            timeout: 超时时间(秒)，默认1小时
+            progress: 是否通过 -progress pipe:1 实时解析进度
+                     (命令本身需要向标准输出写数据时必须关闭)
+            progress_callback: 可选的进度回调，参数为 FFmpegProgress
+            duration: 进度的总时长(秒)，默认使用第一个输入文件的探测时长
+            priority: 调度优先级，默认使用节点的 JOB_PRIORITY
+            cache: 是否使用输出结果缓存，默认使用节点的 CACHE_RESULTS
+        Returns:
+            (返回码, 标准输出, 标准错误)
+            进度模式下标准输出为空，标准错误只保留最后若干行
+        """
         try:
             # 确保第一个参数是ffmpeg
             if command[0] != "ffmpeg":
                 command[0] = self.ffmpeg_path
+            # 不可用的硬件解码和编码器替换为可用的方式
+            command = adapt_command(command, self.get_capabilities())
+
+            if progress and duration is None:
+                input_path = self._find_input_path(command)
+                if input_path:
+                    duration = self.get_video_duration(input_path)
+
+            # 相同输入和参数已经处理过时直接复用结果
+            result_cache = get_result_cache() if (self.CACHE_RESULTS if cache is None else cache) else None
+            cache_key = result_cache.make_key(command, self.get_ffmpeg_version()) if result_cache else None
+            if cache_key:
+                output_path = command[-1]
+                if result_cache.restore(cache_key, output_path):
+                    return 0, "", ""
+                # 先写入缓存目录中的临时文件，成功后再原子发布
+                temp_output = result_cache.temp_path(cache_key, output_path)
+                command = command[:-1] + [temp_output]
+            elif "-y" in command:
+                self._detach_output(command[-1])
+
+            # 等待调度器分配槽位，并按分得的线程数限制ffmpeg
+            if priority is None:
+                priority = self.JOB_PRIORITY
+            with get_scheduler().job(priority) as threads:
+                command = apply_thread_limits(command, threads)
+                result = self._execute_ffmpeg_once(command, timeout, progress, duration, progress_callback)
+                if result[0] != 0 and not result[2].startswith("处理超时") and uses_hardware(command):
+                    # 检测通过的硬件在实际处理时仍可能失败(显存不足、不支持的像素格式等)，改用软件重试一次
+                    print("硬件编解码失败，使用软件编解码重试")
+                    command = adapt_command(command, SOFTWARE_ONLY)
+                    result = self._execute_ffmpeg_once(command, timeout, progress, duration, progress_callback)
+
+            if cache_key:
+                if result[0] == 0:
+                    result_cache.publish(cache_key, temp_output, output_path)
+                else:
+                    self.cleanup_temp_files(temp_output)
+            return result
+
+        except Exception as e:
+            error_msg = f"执行命令失败: {str(e)}"
+            print(error_msg)
+            return -1, "", error_msg
+
+    def _execute_ffmpeg_once(self, command: List[str], timeout: int, progress: bool,
+                             duration: Optional[float],
+                             progress_callback: Optional[ProgressCallback]) -> Tuple[int, str, str]:
+        if not progress:
+            return self._execute_ffmpeg_buffered(command, timeout)
+        return self._execute_ffmpeg_with_progress(command, timeout, duration, progress_callback)
+
+    def _execute_ffmpeg_buffered(self, command: List[str], timeout: int) -> Tuple[int, str, str]:
+        """一次性读取全部输出的执行方式"""
+        # 创建进程
+        started = time.monotonic()
+        process = TrackedPopen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            errors='replace'
+        )
+
+        # 使用超时控制等待进程完成
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+            self._record_job("ffmpeg", process, started, parse_speed(stderr))
+            return process.returncode, stdout, stderr
+        except subprocess.TimeoutExpired:
+            # 超时时强制终止进程
+            process.kill()
+            process.communicate()
+            self._record_job("ffmpeg", process, started)
+            error_msg = f"处理超时 (>{timeout}秒)"
+            print(error_msg)
+            return -1, "", error_msg
+
+    def _execute_ffmpeg_with_progress(self, command: List[str], timeout: int,
+                                      duration: Optional[float],
+                                      progress_callback: Optional[ProgressCallback]) -> Tuple[int, str, str]:
+        """增量解析 -progress 输出的执行方式，标准错误保存在有界环形缓冲区中"""
+        import threading
+        from collections import deque
 
-            process = subprocess.Popen(
+        command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+        started = time.monotonic()
+        process = TrackedPopen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            errors='replace'
+        )
+
+        # 后台线程读取标准错误，避免管道写满阻塞ffmpeg
+        stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_tail.extend(process.stderr), daemon=True
+        )
+        stderr_thread.start()
+
+        # 超时后强制终止进程
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+
+        parser = ProgressParser(duration)
+        progress_bar = ComfyProgressBar()
+        last_update: Optional[FFmpegProgress] = None
+        try:
+            for line in process.stdout:
+                update = parser.feed(line)
+                if update is None:
+                    continue
+                last_update = update
+                progress_bar.update(update)
+                if progress_callback is not None:
+                    try:
+                        progress_callback(update)
+                    except Exception as e:
+                        print(f"进度回调出错: {str(e)}")
+            process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_thread.join(timeout=5)
+            self._record_job("ffmpeg", process, started, (last_update.speed or None) if last_update else None)
+
+        if timed_out.is_set():
+            error_msg = f"处理超时 (>{timeout}秒)"
+            print(error_msg)
+            return -1, "", error_msg
+
+        return process.returncode, "", "".join(stderr_tail)
+
+    @contextmanager
+    def open_ffmpeg_pipe(self, command: List[str], stdin: bool = False, stdout: bool = False,
+                         priority: Optional[int] = None) -> Iterator[Tuple[subprocess.Popen, Deque[str]]]:
+        """
+        以二进制管道启动ffmpeg(原始帧的输入或输出)，在上下文内占用调度器槽位
+        产出: (进程, 标准错误的最后若干行)
+        退出上下文时关闭标准输入并等待进程结束，发生异常时强制终止进程
+        """
+        import threading
+        from collections import deque
+
+        if command[0] != "ffmpeg":
+            command = list(command)
+        command[0] = self.ffmpeg_path
+        command = adapt_command(command, self.get_capabilities())
+        if priority is None:
+            priority = self.JOB_PRIORITY
+
+        with get_scheduler().job(priority) as threads:
+            command = apply_thread_limits(command, threads)
+            started = time.monotonic()
+            process = TrackedPopen(
                 command,
-                stdout=subprocess.PIPE,
+                stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+                stdout=subprocess.PIPE if stdout else subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
-                universal_newlines=True
             )
-            
-            stdout, stderr = process.communicate()
-            
-            # 检查执行结果
-            if process.returncode != 0:
-                return False, stderr
-            
-            return True, stdout
+            stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+            stderr_thread = threading.Thread(
+                target=lambda: stderr_tail.extend(
+                    line.decode("utf-8", errors="replace") for line in process.stderr
+                ),
+                daemon=True
+            )
+            stderr_thread.start()
+            try:
+                yield process, stderr_tail
+                if process.stdin is not None:
+                    try:
+                        process.stdin.close()
+                    except OSError:
+                        pass
+                process.wait()
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                stderr_thread.join(timeout=5)
+                self._record_job("ffmpeg", process, started, parse_speed("".join(stderr_tail)))
+
+    def _record_job(self, tool: str, process: subprocess.Popen, started: float,
+                    speed: Optional[float] = None) -> None:
+        """把已结束的ffmpeg/ffprobe进程写入遥测记录，输入指纹只对存在的输入文件计算"""
+        if not get_telemetry().enabled:
+            return
+        argv = [str(arg) for arg in process.args]
+        if tool == "ffprobe":
+            inputs = argv[-1:]
+        else:
+            inputs = [argv[i + 1] for i, arg in enumerate(argv[:-1]) if arg == "-i"]
+        inputs = [path for path in inputs if os.path.isfile(path)]
+        try:
+            fingerprint = self.get_video_hash(*inputs) if inputs else None
         except Exception as e:
-            return False, str(e)
+            print(f"计算输入指纹失败: {str(e)}")
+            fingerprint = None
+        record_process(tool, type(self).__name__, process, started, speed, fingerprint)
+
+    @staticmethod
+    def _detach_output(output_path: str) -> None:
+        """
+        输出文件是硬链接(例如来自结果缓存)时先删除该路径，
+        避免ffmpeg截断写入时同时改写缓存中的同一文件
+        """
+        try:
+            if os.stat(output_path).st_nlink > 1:
+                os.remove(output_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _find_input_path(command: List[str]) -> Optional[str]:
+        """返回命令中第一个存在的输入文件路径"""
+        for i, arg in enumerate(command[:-1]):
+            if arg == "-i" and os.path.isfile(command[i + 1]):
+                return command[i + 1]
+        return None
 
     def execute_ffprobe(self, command: List[str]) -> Optional[str]:
         """
@@ -110,14 +585,17 @@ class FFmpegBase:
             if command[0] != "ffprobe":
                 command[0] = self.ffprobe_path
 
-            process = subprocess.Popen(
+            started = time.monotonic()
+            process = TrackedPopen(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                universal_newlines=True
+                universal_newlines=True,
+                errors='replace'
             )
             
             stdout, stderr = process.communicate()
+            self._record_job("ffprobe", process, started)
             
             # 检查执行结果
             if process.returncode != 0:
@@ -129,70 +607,265 @@ class FFmpegBase:
             print(f"FFprobe执行异常: {str(e)}")
             return None
 
-    def get_video_duration(self, video_path: str) -> Optional[float]:
-        """获取视频时长(秒)"""
+    def probe(self, media_path: str) -> Optional[MediaInfo]:
+        """
+        获取媒体文件的完整信息
+        只调用一次ffprobe(-show_format -show_streams)，结果按(路径, 大小, mtime)缓存；
+        流地址等不是本地文件的输入不缓存，每次都调用ffprobe
+        返回: MediaInfo或None(如果失败)
+        """
+        key = PROBE_CACHE.make_key(media_path)
+        if key is not None:
+            info = PROBE_CACHE.get(key)
+            if info is not None:
+                return info
+
+        # 查询持久化索引
+        index = get_probe_index() if key is not None else None
+        if index is not None:
+            data = index.get("probe", key)
+            if data is not None:
+                try:
+                    info = MediaInfo.from_probe_output(media_path, data.decode("utf-8"))
+                    PROBE_CACHE.put(key, info)
+                    return info
+                except ValueError:
+                    pass
+
         command = [
-            "ffprobe",
+            self.ffprobe_path,
             "-v", "quiet",
             "-print_format", "json",
-            "-show_entries", "format=duration",
-            video_path
+            "-show_format",
+            "-show_streams",
+            media_path
         ]
-        
+
         result = self.execute_ffprobe(command)
-        if result:
-            import json
-            try:
-                data = json.loads(result)
-                return float(data['format']['duration'])
-            except:
-                return None
-        return None
+        if not result:
+            return None
+
+        try:
+            info = MediaInfo.from_probe_output(media_path, result)
+        except ValueError as e:
+            print(f"解析FFprobe输出失败: {str(e)}")
+            return None
+
+        if key is not None:
+            PROBE_CACHE.put(key, info)
+        if index is not None:
+            index.put("probe", key, result.encode("utf-8"))
+        return info
+
+    def warm_probe_index(self, directory: str, max_workers: int = 4,
+                         extensions: Tuple[str, ...] = MEDIA_EXTENSIONS) -> int:
+        """
+        预热探测索引
+        递归探测目录下的所有媒体文件，使用有限大小的线程池并发执行ffprobe
+        Args:
+            directory: 要扫描的目录
+            max_workers: 最大并发ffprobe进程数
+            extensions: 需要探测的文件扩展名
+        Returns:
+            成功探测的文件数
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        media_files = []
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith(extensions):
+                    media_files.append(os.path.join(root, name))
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(self.probe, media_files))
+
+        index = get_probe_index()
+        if index is not None:
+            index.compact()
+
+        return sum(1 for info in results if info is not None)
+
+    def get_video_duration(self, video_path: str) -> Optional[float]:
+        """获取视频时长(秒)"""
+        info = self.probe(video_path)
+        return info.duration if info else None
+
+    def get_audio_duration(self, audio_file_path: str) -> Optional[float]:
+        """获取音频文件的时长(秒)"""
+        info = self.probe(audio_file_path)
+        return info.duration if info else None
 
     def get_video_resolution(self, video_path: str) -> Optional[Tuple[int, int]]:
         """获取视频分辨率"""
-        command = [
-            "ffprobe",
-            "-v", "quiet",
-            "-print_format", "json",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            video_path
-        ]
-        
-        result = self.execute_ffprobe(command)
-        if result:
-            import json
-            try:
-                data = json.loads(result)
-                stream = data['streams'][0]
-                return (int(stream['width']), int(stream['height']))
-            except:
-                return None
-        return None
+        info = self.probe(video_path)
+        return info.resolution if info else None
 
     def get_video_framerate(self, video_path: str) -> Optional[float]:
         """获取视频帧率"""
+        info = self.probe(video_path)
+        return info.framerate if info else None
+
+    def get_keyframe_index(self, video_path: str) -> Optional[KeyframeIndex]:
+        """
+        获取视频流的关键帧索引
+        只读取数据包信息，不解码，结果按文件缓存在内存和持久化索引中
+        """
+        key = KEYFRAME_CACHE.make_key(video_path)
+        if key is None:
+            return None
+
+        keyframe_index = KEYFRAME_CACHE.get(key)
+        if keyframe_index is not None:
+            return keyframe_index
+
+        index = get_probe_index()
+        if index is not None:
+            data = index.get("packets", key)
+            if data is not None:
+                try:
+                    keyframe_index = KeyframeIndex.from_bytes(data)
+                    KEYFRAME_CACHE.put(key, keyframe_index)
+                    return keyframe_index
+                except (ValueError, KeyError, OSError):
+                    pass
+
         command = [
-            "ffprobe",
+            self.ffprobe_path,
             "-v", "quiet",
-            "-print_format", "json",
             "-select_streams", "v:0",
-            "-show_entries", "stream=r_frame_rate",
+            "-show_entries", "packet=pts_time,dts_time,pos,flags:format=start_time",
+            "-of", "compact",
             video_path
         ]
-        
         result = self.execute_ffprobe(command)
-        if result:
-            import json
-            try:
-                data = json.loads(result)
-                fps_str = data['streams'][0]['r_frame_rate']
-                num, den = map(int, fps_str.split('/'))
-                return num / den
-            except:
-                return None
-        return None
+        if not result:
+            return None
+
+        keyframe_index = KeyframeIndex.from_ffprobe_output(result)
+        if len(keyframe_index) == 0:
+            return None
+
+        KEYFRAME_CACHE.put(key, keyframe_index)
+        if index is not None:
+            index.put("packets", key, keyframe_index.to_bytes())
+        return keyframe_index
+
+    def get_keyframe_times(self, video_path: str) -> List[float]:
+        """获取视频流的关键帧时间(秒，相对文件起点)"""
+        keyframe_index = self.get_keyframe_index(video_path)
+        return keyframe_index.keyframe_times.tolist() if keyframe_index is not None else []
+
+    def get_scene_index(self, video_path: str) -> Optional[SceneIndex]:
+        """
+        获取视频的场景变化索引
+        低分辨率解码一次，记录所有超过最低分数的场景变化，结果按文件缓存在内存和持久化索引中
+        """
+        key = SCENE_CACHE.make_key(video_path)
+        if key is None:
+            return None
+
+        scene_index = SCENE_CACHE.get(key)
+        if scene_index is not None:
+            return scene_index
+
+        index = get_probe_index()
+        if index is not None:
+            data = index.get(SCENE_INDEX_KIND, key)
+            if data is not None:
+                try:
+                    scene_index = SceneIndex.from_bytes(data)
+                    SCENE_CACHE.put(key, scene_index)
+                    return scene_index
+                except (ValueError, KeyError, OSError):
+                    pass
+
+        command = [
+            "ffmpeg",
+            "-hide_banner",
+            "-i", video_path,
+            "-an", "-sn", "-dn",
+            "-vf", build_scene_filter(),
+            "-f", "null",
+            "-"
+        ]
+        # metadata滤镜把结果写在日志中，需要完整的标准错误
+        returncode, _, stderr = self.run_ffmpeg(command, progress=False, cache=False)
+        if returncode != 0:
+            print(f"场景分析失败: {stderr[-500:]}")
+            return None
+
+        # TS/MKV等容器的起始时间可能不为0，与关键帧索引一样换算为从0开始的时间
+        info = self.probe(video_path)
+        start_time = (info.start_time if info else None) or 0.0
+        scene_index = SceneIndex.from_ffmpeg_log(stderr, start_time)
+        SCENE_CACHE.put(key, scene_index)
+        if index is not None:
+            index.put(SCENE_INDEX_KIND, key, scene_index.to_bytes())
+        return scene_index
+
+    def get_cached_frames(self, video_path: str, width: int, height: int,
+                          pix_fmt: str = "rgb24") -> Optional[CachedFrames]:
+        """
+        获取按指定尺寸和像素格式解码的全部帧(内存映射，只读)
+        第一次访问时完整解码一次并写入帧缓存，缓存被禁用或解码失败时返回None
+        """
+        frame_cache = get_frame_cache()
+        if frame_cache is None:
+            return None
+
+        key = frame_cache.make_key(self.get_video_hash(video_path), width, height, pix_fmt)
+        cached = frame_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 帧时间取自数据包索引，与解码输出的帧一一对应
+        import numpy as np
+        keyframe_index = self.get_keyframe_index(video_path)
+        packet_pts = None
+        if keyframe_index is not None:
+            packet_pts = keyframe_index.pts[(keyframe_index.flags & FLAG_DISCARD) == 0]
+        framerate = self.get_video_framerate(video_path) or 30.0
+
+        def pts_for(count: int):
+            if packet_pts is not None and len(packet_pts) >= count:
+                return packet_pts[:count]
+            return np.arange(count, dtype=np.float64) / framerate
+
+        # 解码前估计大小，超过缓存容量的视频直接返回None，由调用方按普通方式解码
+        if packet_pts is not None:
+            expected_frames = len(packet_pts)
+        else:
+            info = self.probe(video_path)
+            video = info.video if info else None
+            expected_frames = (video.nb_frames if video else None) or \
+                int(((info.duration if info else None) or 0.0) * framerate)
+        expected_bytes = expected_frames * width * height * PIXEL_FORMATS[pix_fmt]
+        if not frame_cache.accepts(expected_bytes):
+            print(f"视频解码后约 {self.format_size(expected_bytes)}，超过帧缓存容量，不使用缓存")
+            return None
+
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-i", video_path,
+            "-an", "-sn", "-dn",
+            "-vf", f"scale={width}:{height}",
+            "-vsync", "passthrough",
+            "-f", "rawvideo",
+            "-pix_fmt", pix_fmt,
+            "pipe:1"
+        ]
+        with self.open_ffmpeg_pipe(command, stdout=True) as (process, stderr_tail):
+            cached = frame_cache.store(key, width, height, pix_fmt, process.stdout, pts_for)
+            process.stdout.close()
+
+        if process.returncode != 0:
+            # 解码中途失败时已写入的帧不完整
+            frame_cache.remove(key)
+            print(f"解码帧缓存失败: {''.join(stderr_tail)}")
+            return None
+        return cached
 
     def create_output_path(self, input_path: str, suffix: str = "") -> str:
         """创建输出文件路径"""
@@ -204,9 +877,14 @@ class FFmpegBase:
             output_filename = f"{video_hash}.mp4"
         return os.path.join(base_output_dir, output_filename)
 
-    def ensure_directory(self, path: str) -> None:
-        """确保目录存在"""
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+    def ensure_directory(self, file_path: str) -> None:
+        """确保文件所在目录存在
+        Args:
+            file_path: 文件路径
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
 
     def cleanup_temp_files(self, *files: str) -> None:
         """清理临时文件"""
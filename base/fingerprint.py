@@ -0,0 +1,96 @@
+"""
+文件内容指纹
+与路径无关，只取决于文件内容：默认对文件大小和开头、中间、结尾各1MiB计算blake2b摘要，
+需要严格区分时可以对整个文件计算摘要。结果按文件状态缓存，未变化的文件只需要一次stat
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# 抽样读取的块大小
+SAMPLE_SIZE = 1024 * 1024
+# 整个文件摘要的读取块大小
+_READ_SIZE = 4 * 1024 * 1024
+
+# 缓存键: (设备, inode, 文件大小, mtime_ns, ctime_ns[, 真实路径])
+StatKey = Tuple
+
+
+def _stat_key(path: str) -> Optional[StatKey]:
+    """
+    根据文件状态生成缓存键，文件不存在时返回None
+    ctime在内容被改写时总会更新(无法像mtime一样被还原)，保留mtime的修改也能识别；
+    文件系统不提供inode时加入真实路径
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    if not stat.st_ino:
+        key += (os.path.realpath(path),)
+    return key
+
+
+def _hash_file(path: str, size: int, full: bool) -> str:
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        if full or size <= 3 * SAMPLE_SIZE:
+            # 小文件抽样就等于读取全部，两种方式结果相同
+            while True:
+                data = f.read(_READ_SIZE)
+                if not data:
+                    break
+                digest.update(data)
+        else:
+            for offset in (0, (size - SAMPLE_SIZE) // 2, size - SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+class FingerprintCache:
+    """文件指纹的LRU缓存，文件变化后键随之变化，旧记录自然淘汰"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[StatKey, bool], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fingerprint(self, path: str, full: bool = False) -> str:
+        """
+        计算文件内容指纹(32位十六进制)
+        full=True 时对整个文件计算摘要，用于抽样无法区分的情况
+        """
+        key = _stat_key(path)
+        if key is None:
+            raise FileNotFoundError(path)
+
+        with self._lock:
+            value = self._entries.get((key, full))
+            if value is not None:
+                self._entries.move_to_end((key, full))
+                return value
+
+        value = _hash_file(path, key[2], full)
+        with self._lock:
+            self._entries[(key, full)] = value
+            self._entries.move_to_end((key, full))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 进程内共享的指纹缓存
+FINGERPRINT_CACHE = FingerprintCache()
+
+
+def fingerprint_file(path: str, full: bool = False) -> str:
+    """计算文件内容指纹(带缓存)"""
+    return FINGERPRINT_CACHE.fingerprint(path, full)
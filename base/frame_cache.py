@@ -0,0 +1,232 @@
+"""
+解码帧缓存
+把视频按指定分辨率和像素格式解码一次，保存为带文件头的原始帧文件，
+之后通过 np.memmap 切片直接访问任意帧，重复取帧不再解码
+文件布局: [文件头(4096字节)][帧数据 n*h*w*c][pts表 float64*n]
+"""
+import os
+import time
+import uuid
+import struct
+import threading
+from typing import BinaryIO, Callable, Optional
+
+# 魔数、版本、通道数、宽、高、帧数、像素格式、帧数据偏移、pts表偏移
+_HEADER_FORMAT = "<4sHHIII16sQQ"
+_MAGIC = b"FFMC"
+_VERSION = 1
+# 帧数据按页对齐
+DATA_OFFSET = 4096
+
+# 支持的像素格式 -> 每像素字节数
+PIXEL_FORMATS = {
+    "rgb24": 3,
+    "bgr24": 3,
+    "rgba": 4,
+    "gray": 1,
+}
+
+
+class CachedFrames:
+    """
+    缓存文件的只读视图
+    frames: np.memmap，形状为 (n, h, w, c)，dtype为uint8
+    pts: 各帧的显示时间(秒，float64)
+    """
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        with open(path, "rb") as f:
+            header = f.read(struct.calcsize(_HEADER_FORMAT))
+        (magic, version, channels, width, height, count,
+         pix_fmt, data_offset, pts_offset) = struct.unpack(_HEADER_FORMAT, header)
+        if magic != _MAGIC or version != _VERSION or count == 0:
+            raise ValueError(f"无效的帧缓存文件: {path}")
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.pix_fmt = pix_fmt.rstrip(b"\0").decode("ascii")
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset,
+                                shape=(count, height, width, channels))
+        self.pts = np.fromfile(path, dtype=np.float64, count=count, offset=pts_offset)
+
+    def __len__(self) -> int:
+        return self.frames.shape[0]
+
+    def index_at(self, t: float) -> int:
+        """t时刻显示的帧(pts不大于t的最后一帧)"""
+        import numpy as np
+
+        i = int(np.searchsorted(self.pts, t + 1e-6, side="right")) - 1
+        return min(max(i, 0), len(self) - 1)
+
+    def select(self, start_time: float = 0.0, stride: int = 1, max_frames: int = 0):
+        """从start_time开始每隔stride帧取一帧，返回memmap切片(不复制数据)"""
+        import numpy as np
+
+        first = int(np.searchsorted(self.pts, start_time - 1e-6, side="left"))
+        frames = self.frames[first::max(1, stride)]
+        return frames[:max_frames] if max_frames else frames
+
+
+class FrameCache:
+    """
+    基于目录的解码帧缓存
+    键由视频指纹、输出尺寸和像素格式组成，条目按最近使用时间(mtime)进行LRU淘汰，
+    总大小不超过 max_bytes
+    """
+    # 单个条目最多占用的容量比例，更大的视频不缓存(否则写入后会淘汰全部其他条目和它自己)
+    MAX_ENTRY_FRACTION = 0.5
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint: str, width: int, height: int, pix_fmt: str) -> str:
+        return f"{fingerprint}_{width}x{height}_{pix_fmt}"
+
+    @property
+    def max_entry_bytes(self) -> int:
+        return int(self.max_bytes * self.MAX_ENTRY_FRACTION)
+
+    def accepts(self, expected_bytes: int) -> bool:
+        """预计大小为 expected_bytes 的条目是否可以缓存"""
+        return expected_bytes <= self.max_entry_bytes
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".frames")
+
+    def get(self, key: str) -> Optional[CachedFrames]:
+        """读取缓存条目，不存在或已损坏时返回None"""
+        entry = self._entry_path(key)
+        if not os.path.isfile(entry):
+            return None
+        try:
+            # 更新mtime作为最近使用时间
+            os.utime(entry)
+            return CachedFrames(entry)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"读取帧缓存失败: {str(e)}")
+            self._remove_quietly(entry)
+            return None
+
+    def store(self, key: str, width: int, height: int, pix_fmt: str, stream: BinaryIO,
+              pts_for: Callable[[int], "object"]) -> Optional[CachedFrames]:
+        """
+        把原始帧数据流写入缓存
+        Args:
+            stream: ffmpeg输出的原始帧数据(按 pix_fmt 排列)
+            pts_for: 根据实际帧数返回pts数组
+        返回: 写入的缓存条目，没有完整的帧或超过单个条目的容量时返回None
+        """
+        import numpy as np
+
+        channels = PIXEL_FORMATS[pix_fmt]
+        frame_size = width * height * channels
+        temp_path = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}.frames")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(b"\0" * DATA_OFFSET)
+                buffer = bytearray(max(frame_size, 4 * 1024 * 1024))
+                view = memoryview(buffer)
+                written = 0
+                while True:
+                    count = stream.readinto(view)
+                    if not count:
+                        break
+                    f.write(view[:count])
+                    written += count
+                    if written > self.max_entry_bytes:
+                        raise ValueError("解码数据超过帧缓存容量，不缓存该视频")
+
+                # 丢弃不完整的最后一帧
+                count = written // frame_size
+                if count == 0:
+                    raise ValueError("没有完整的视频帧")
+                pts_offset = DATA_OFFSET + count * frame_size
+                f.truncate(pts_offset)
+                f.seek(pts_offset)
+                f.write(np.asarray(pts_for(count), dtype=np.float64)[:count].tobytes())
+
+                f.seek(0)
+                f.write(struct.pack(_HEADER_FORMAT, _MAGIC, _VERSION, channels, width, height, count,
+                                    pix_fmt.encode("ascii"), DATA_OFFSET, pts_offset))
+
+            entry = self._entry_path(key)
+            os.replace(temp_path, entry)
+        except (OSError, ValueError) as e:
+            print(f"写入帧缓存失败: {str(e)}")
+            self._remove_quietly(temp_path)
+            return None
+
+        self.evict()
+        return self.get(key)
+
+    def remove(self, key: str) -> None:
+        self._remove_quietly(self._entry_path(key))
+
+    def evict(self) -> int:
+        """按最近使用时间淘汰条目，返回删除的文件数"""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.startswith(".tmp-"):
+                    # 清理异常中断后残留超过一天的临时文件
+                    if time.time() - stat.st_mtime > 86400:
+                        self._remove_quietly(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            removed = 0
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                # 已经映射的文件在Linux上删除后仍可继续访问，Windows上删除失败时跳过
+                if self._remove_quietly(path):
+                    total -= size
+                    removed += 1
+            return removed
+
+    @staticmethod
+    def _remove_quietly(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+_frame_cache: Optional[FrameCache] = None
+_frame_cache_lock = threading.Lock()
+
+
+def get_frame_cache() -> Optional[FrameCache]:
+    """
+    获取进程内共享的帧缓存
+    COMFYUI_FFMPEG_FRAME_CACHE=0 禁用缓存，COMFYUI_FFMPEG_FRAME_CACHE_MB 设置容量(默认8GB)
+    """
+    global _frame_cache
+    if os.environ.get("COMFYUI_FFMPEG_FRAME_CACHE", "1") == "0":
+        return None
+
+    from .probe_index import get_cache_dir
+
+    with _frame_cache_lock:
+        if _frame_cache is None:
+            max_mb = int(os.environ.get("COMFYUI_FFMPEG_FRAME_CACHE_MB", "8192"))
+            _frame_cache = FrameCache(get_cache_dir("frames"), max_mb * 1024 * 1024)
+        return _frame_cache
@@ -0,0 +1,179 @@
+"""
+可续传的HLS打包
+按分片边界把时间轴划分为若干区间，每个区间由一个ffmpeg进程编码(输入端定位，
+-start_number 延续分片编号)，写入各自的分段播放列表。
+中断后根据已有播放列表找到最后一个完整分片继续编码；全部完成后把各分段播放列表
+拼接为最终的播放列表，不同区间之间加 EXT-X-DISCONTINUITY 标记(各区间时间戳从0开始)
+"""
+import os
+import re
+import json
+import glob
+import math
+from typing import Dict, List, Optional, Tuple
+
+# 分段播放列表文件名中的起始分片编号，如 playlist_0_r00012.m3u8
+_PIECE_PATTERN = re.compile(r"_r(\d+)\.m3u8$")
+# 分片文件名中的分片编号，如 playlist_0_00012.ts
+_SEGMENT_PATTERN = re.compile(r"_(\d+)\.ts$")
+
+
+def piece_playlist_path(output_dir: str, name: str, start: int) -> str:
+    """ffmpeg写入的分段播放列表路径(%v为档位序号)，文件名包含起始分片编号"""
+    return os.path.join(output_dir, f"{name}_%v_r{start:05d}.m3u8")
+
+
+def segment_filename_pattern(output_dir: str, name: str) -> str:
+    """分片文件路径，编号为整个视频中的绝对分片序号"""
+    return os.path.join(output_dir, f"{name}_%v_%05d.ts")
+
+
+def parse_media_playlist(path: str) -> Tuple[List[Tuple[float, str]], bool]:
+    """
+    解析媒体播放列表
+    返回: ([(分片时长, 分片uri)], 是否已结束)
+    """
+    entries = []
+    ended = False
+    duration = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                try:
+                    duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+                except ValueError:
+                    duration = None
+            elif line == "#EXT-X-ENDLIST":
+                ended = True
+            elif line and not line.startswith("#") and duration is not None:
+                entries.append((duration, line))
+                duration = None
+    return entries, ended
+
+
+def _variant_segments(output_dir: str, name: str, variant: int) -> Dict[int, Tuple[float, str, int]]:
+    """
+    收集某一档位所有分段播放列表中已完成的分片 {分片编号: (时长, uri, 所属区间的起始编号)}
+    播放列表只记录已经写完的分片；起始编号较大的分段后写入，覆盖较早的记录
+    """
+    pieces = []
+    for path in glob.glob(os.path.join(glob.escape(output_dir), f"{glob.escape(name)}_{variant}_r*.m3u8")):
+        match = _PIECE_PATTERN.search(path)
+        if match:
+            pieces.append((int(match.group(1)), path))
+
+    segments = {}
+    for piece, path in sorted(pieces):
+        try:
+            entries, _ = parse_media_playlist(path)
+        except OSError:
+            continue
+        for duration, uri in entries:
+            match = _SEGMENT_PATTERN.search(uri)
+            if not match:
+                continue
+            segment_path = os.path.join(output_dir, os.path.basename(uri))
+            if os.path.isfile(segment_path) and os.path.getsize(segment_path) > 0:
+                segments[int(match.group(1))] = (duration, uri, piece)
+    return segments
+
+
+def completed_segments(output_dir: str, name: str,
+                       variants: int) -> Dict[int, List[Tuple[float, str, int]]]:
+    """所有档位都已完成的分片 {分片编号: [各档位的(时长, uri, 区间)]}"""
+    per_variant = [_variant_segments(output_dir, name, v) for v in range(variants)]
+    numbers = set(per_variant[0])
+    for segments in per_variant[1:]:
+        numbers &= set(segments)
+    return {n: [segments[n] for segments in per_variant] for n in numbers}
+
+
+def plan_ranges(total_segments: int, jobs: int, done: Dict[int, object]) -> List[Tuple[int, int]]:
+    """
+    把 [0, total_segments) 均分为 jobs 个区间，并跳过每个区间开头已经完成的分片
+    返回: 需要编码的 [(起始分片, 结束分片)]
+    """
+    jobs = max(1, min(jobs, total_segments))
+    size = math.ceil(total_segments / jobs)
+    ranges = []
+    for start in range(0, total_segments, size):
+        end = min(start + size, total_segments)
+        while start < end and start in done:
+            start += 1
+        if start < end:
+            ranges.append((start, end))
+    return ranges
+
+
+def load_manifest(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def remove_pieces(output_dir: str, name: str) -> None:
+    """删除旧的分段播放列表和分片(参数变化后不能续传)"""
+    patterns = [f"{glob.escape(name)}_*_r*.m3u8", f"{glob.escape(name)}_*_*.ts"]
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(glob.escape(output_dir), pattern)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def write_media_playlists(output_dir: str, name: str, total_segments: int,
+                          segments: Dict[int, List[Tuple[float, str, int]]]) -> List[str]:
+    """把各分片写入每个档位的最终播放列表，返回播放列表文件名"""
+    missing = [n for n in range(total_segments) if n not in segments]
+    if missing:
+        raise RuntimeError(f"缺少分片: {missing[:10]}")
+
+    variants = len(segments[0])
+    names = []
+    for v in range(variants):
+        entries = [segments[n][v] for n in range(total_segments)]
+        target_duration = math.ceil(max(entry[0] for entry in entries))
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target_duration}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+        ]
+        previous_piece = None
+        for duration, uri, piece in entries:
+            # 不同区间的时间戳各自从0开始
+            if previous_piece is not None and piece != previous_piece:
+                lines.append("#EXT-X-DISCONTINUITY")
+            previous_piece = piece
+            lines.append(f"#EXTINF:{duration:.6f},")
+            lines.append(os.path.basename(uri))
+        lines.append("#EXT-X-ENDLIST")
+
+        playlist_name = f"{name}_{v}.m3u8"
+        with open(os.path.join(output_dir, playlist_name), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        names.append(playlist_name)
+    return names
+
+
+def write_master_playlist(path: str, variants: List[Tuple[str, int, int, int]]) -> None:
+    """
+    写入主播放列表
+    variants: [(媒体播放列表文件名, 带宽bps, 宽, 高)]
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for playlist_name, bandwidth, width, height in variants:
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height}")
+        lines.append(playlist_name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
@@ -0,0 +1,368 @@
+"""
+硬件编解码能力检测
+解析 ffmpeg -encoders/-decoders/-filters/-hwaccels 的输出，并对每个候选硬件编码器和
+硬件加速方式做一次极小的lavfi测试，得到实际可用的能力表(按ffmpeg路径和版本缓存)。
+命令中写死的 -hwaccel cuda、h264_nvenc 等在不可用时自动替换为可用的方式或软件编码
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .encoder_profile import SOFTWARE_ENCODERS
+from .telemetry import run_tracked
+
+# 按速度排列的候选硬件编码器；vaapi需要显式上传帧，不参与自动选择
+_HW_ENCODERS = {
+    "h264": ["h264_nvenc", "h264_qsv", "h264_videotoolbox", "h264_amf", "h264_vaapi"],
+    "hevc": ["hevc_nvenc", "hevc_qsv", "hevc_videotoolbox", "hevc_amf", "hevc_vaapi"],
+}
+_UPLOAD_ENCODERS = ("_vaapi",)
+_HW_ENCODER_SUFFIXES = ("_nvenc", "_qsv", "_videotoolbox", "_amf", "_vaapi")
+
+# 编码格式 -> 软件编码器
+_SOFTWARE_ENCODERS = dict(SOFTWARE_ENCODERS, mjpeg="mjpeg")
+
+# 按速度排列的硬件解码方式
+_HWACCELS = ["cuda", "videotoolbox", "qsv", "d3d11va", "dxva2", "vaapi"]
+
+# 编码测试中vaapi使用的设备
+_VAAPI_DEVICE = "/dev/dri/renderD128"
+
+# 能力表的持久缓存有效期(驱动或硬件可能变化)
+_CACHE_TTL = 7 * 86400
+
+# 视频编码器参数，如 -c:v、-c:v:0、-vcodec、-codec:v
+_VIDEO_CODEC_FLAG = re.compile(r"^-(c|codec)(:v(:\d+)?)?$|^-vcodec$")
+
+# NVENC预设 -> x264/x265预设
+_NVENC_PRESETS = {
+    "p1": "ultrafast", "p2": "superfast", "p3": "veryfast", "p4": "faster",
+    "p5": "fast", "p6": "medium", "p7": "slow",
+    "hp": "fast", "hq": "medium", "ll": "fast", "llhp": "fast", "llhq": "medium",
+    "lossless": "medium", "losslesshp": "fast", "default": "medium",
+}
+
+# 软件编码器不支持的硬件编码器专用参数(带一个值)
+_HW_ONLY_OPTIONS = {
+    "-rc", "-forced-idr", "-no-scenecut", "-spatial-aq", "-temporal-aq", "-zerolatency",
+    "-gpu", "-multipass", "-2pass", "-b_ref_mode", "-surfaces", "-strict_gop",
+    "-aq-strength", "-nonref_p", "-weighted_pred", "-look_ahead", "-allow_sw",
+    "-realtime", "-quality", "-usage", "-global_quality", "-qp_i", "-qp_p", "-qp_b",
+}
+_HW_ONLY_TUNES = {"hq", "ll", "ull", "lossless"}
+
+
+@dataclass
+class Capabilities:
+    """ffmpeg的编解码能力表"""
+    version: str = ""
+    encoders: Set[str] = field(default_factory=set)
+    decoders: Set[str] = field(default_factory=set)
+    filters: Set[str] = field(default_factory=set)
+    hwaccels: List[str] = field(default_factory=list)
+    working_encoders: Set[str] = field(default_factory=set)    # 测试编码成功的硬件编码器
+    working_hwaccels: Set[str] = field(default_factory=set)    # 能创建设备的硬件加速方式
+    probed_at: float = 0.0
+
+    def best_encoder(self, codec: str = "h264", allow_upload: bool = False) -> str:
+        """最快的可用编码器，没有可用的硬件编码器时返回软件编码器"""
+        for encoder in _HW_ENCODERS.get(codec, []):
+            if encoder.endswith(_UPLOAD_ENCODERS) and not allow_upload:
+                continue
+            if encoder in self.working_encoders:
+                return encoder
+        return software_encoder(codec) or codec
+
+    def best_hwaccel(self) -> Optional[str]:
+        """最快的可用硬件解码方式，没有时返回None"""
+        for method in _HWACCELS:
+            if method in self.working_hwaccels:
+                return method
+        return None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        for name in ("encoders", "decoders", "filters", "working_encoders", "working_hwaccels"):
+            data[name] = sorted(data[name])
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Capabilities":
+        return cls(
+            version=data.get("version", ""),
+            encoders=set(data.get("encoders", [])),
+            decoders=set(data.get("decoders", [])),
+            filters=set(data.get("filters", [])),
+            hwaccels=list(data.get("hwaccels", [])),
+            working_encoders=set(data.get("working_encoders", [])),
+            working_hwaccels=set(data.get("working_hwaccels", [])),
+            probed_at=float(data.get("probed_at", 0.0)),
+        )
+
+
+# 只使用软件编解码(检测失败或硬件命令运行失败后重试时使用)
+SOFTWARE_ONLY = Capabilities()
+
+
+def software_encoder(codec: str) -> Optional[str]:
+    return _SOFTWARE_ENCODERS.get(codec)
+
+
+def is_hardware_encoder(encoder: str) -> bool:
+    return encoder.endswith(_HW_ENCODER_SUFFIXES)
+
+
+def parse_codec_list(output: str) -> Set[str]:
+    """解析 -encoders/-decoders 的输出(说明部分以 ------ 结束)"""
+    names = set()
+    started = False
+    for line in output.splitlines():
+        if not started:
+            started = line.strip().startswith("------")
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            names.add(parts[1])
+    return names
+
+
+def parse_filter_list(output: str) -> Set[str]:
+    """解析 -filters 的输出，如 ' TSC adelay            A->A       Delay ...'"""
+    names = set()
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and re.fullmatch(r"[TSC.|]{2,3}", parts[0]) and "->" in parts[2]:
+            names.add(parts[1])
+    return names
+
+
+def parse_hwaccel_list(output: str) -> List[str]:
+    """解析 -hwaccels 的输出"""
+    methods = []
+    started = False
+    for line in output.splitlines():
+        line = line.strip()
+        if not started:
+            started = line.startswith("Hardware acceleration methods")
+            continue
+        if line:
+            methods.append(line)
+    return methods
+
+
+def _run(command: List[str], timeout: int = 20) -> Tuple[int, str]:
+    try:
+        returncode, stdout, _ = run_tracked(command, "hw_caps", timeout=timeout)
+        return returncode, stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return -1, ""
+
+
+def _test_encoder(ffmpeg_path: str, encoder: str) -> bool:
+    """用lavfi生成的两帧测试编码器"""
+    command = [ffmpeg_path, "-hide_banner", "-v", "error"]
+    if encoder.endswith("_vaapi"):
+        command.extend(["-vaapi_device", _VAAPI_DEVICE])
+    command.extend(["-f", "lavfi", "-i", "color=black:s=256x256:r=25:d=0.2", "-frames:v", "2"])
+    if encoder.endswith("_vaapi"):
+        command.extend(["-vf", "format=nv12,hwupload"])
+    command.extend(["-c:v", encoder, "-f", "null", "-"])
+    return _run(command)[0] == 0
+
+
+def _test_hwaccel(ffmpeg_path: str, method: str) -> bool:
+    """能否创建该硬件加速方式的设备(驱动和硬件是否可用)"""
+    command = [
+        ffmpeg_path, "-hide_banner", "-v", "error",
+        "-init_hw_device", method,
+        "-f", "lavfi", "-i", "nullsrc=s=64x64:d=0.04",
+        "-frames:v", "1", "-f", "null", "-"
+    ]
+    return _run(command)[0] == 0
+
+
+def probe_capabilities(ffmpeg_path: str, version: str) -> Capabilities:
+    """检测ffmpeg的编解码能力，并测试候选的硬件编码器和硬件加速方式"""
+    caps = Capabilities(version=version, probed_at=time.time())
+    caps.encoders = parse_codec_list(_run([ffmpeg_path, "-hide_banner", "-encoders"])[1])
+    caps.decoders = parse_codec_list(_run([ffmpeg_path, "-hide_banner", "-decoders"])[1])
+    caps.filters = parse_filter_list(_run([ffmpeg_path, "-hide_banner", "-filters"])[1])
+    caps.hwaccels = parse_hwaccel_list(_run([ffmpeg_path, "-hide_banner", "-hwaccels"])[1])
+
+    encoders = [e for codec in _HW_ENCODERS.values() for e in codec if e in caps.encoders]
+    methods = [m for m in _HWACCELS if m in caps.hwaccels]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        encoder_results = list(pool.map(lambda e: _test_encoder(ffmpeg_path, e), encoders))
+        method_results = list(pool.map(lambda m: _test_hwaccel(ffmpeg_path, m), methods))
+    caps.working_encoders = {e for e, ok in zip(encoders, encoder_results) if ok}
+    caps.working_hwaccels = {m for m, ok in zip(methods, method_results) if ok}
+    return caps
+
+
+_CAPABILITIES: Dict[Tuple[str, str], Capabilities] = {}
+_capabilities_lock = threading.Lock()
+
+
+def _cache_file(ffmpeg_path: str, version: str) -> Optional[str]:
+    try:
+        from .probe_index import get_cache_dir
+        cache_dir = get_cache_dir("capabilities")
+    except Exception:
+        return None
+    digest = hashlib.sha1(f"{ffmpeg_path}\n{version}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def get_capabilities(ffmpeg_path: str, version: str, refresh: bool = False) -> Capabilities:
+    """
+    获取ffmpeg的能力表
+    每个 (可执行文件, 版本) 只检测一次，结果保存在内存和缓存目录中；
+    COMFYUI_FFMPEG_HWACCEL=0 时只使用软件编解码
+    """
+    if os.environ.get("COMFYUI_FFMPEG_HWACCEL", "1") == "0":
+        return SOFTWARE_ONLY
+
+    resolved = shutil.which(ffmpeg_path) or ffmpeg_path
+    key = (os.path.realpath(resolved), version)
+    with _capabilities_lock:
+        caps = _CAPABILITIES.get(key)
+        if caps is not None and not refresh:
+            return caps
+
+        cache_file = _cache_file(*key)
+        if cache_file and not refresh:
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    caps = Capabilities.from_dict(json.load(f))
+                if time.time() - caps.probed_at < _CACHE_TTL:
+                    _CAPABILITIES[key] = caps
+                    return caps
+            except (OSError, ValueError):
+                pass
+
+        caps = probe_capabilities(resolved, version)
+        _CAPABILITIES[key] = caps
+        if cache_file:
+            try:
+                with open(cache_file, "w", encoding="utf-8") as f:
+                    json.dump(caps.to_dict(), f, ensure_ascii=False, indent=2)
+            except OSError:
+                pass
+        if caps.working_encoders or caps.working_hwaccels:
+            print(f"可用的硬件编码器: {sorted(caps.working_encoders)}，"
+                  f"硬件解码: {sorted(caps.working_hwaccels)}")
+        return caps
+
+
+def adapt_command(command: List[str], caps: Capabilities) -> List[str]:
+    """
+    按能力表调整命令
+    - 不可用的 -hwaccel 换成最快的可用方式，没有时删除(同时删除 -hwaccel_output_format)
+    - 不可用的硬件编码器换成对应的软件编码器，并转换或删除硬件编码器专用的参数
+    - 对应设备不可用时，滤镜中的 hwupload_cuda/hwupload 换成 null
+    """
+    args = list(command)
+    hwaccel_changed = False
+    fallback_encoders = []
+
+    i = 1
+    while i < len(args) - 1:
+        arg, value = args[i], args[i + 1]
+        if arg == "-hwaccel" and value not in ("auto", "none") and value not in caps.working_hwaccels:
+            replacement = caps.best_hwaccel()
+            if replacement:
+                args[i + 1] = replacement
+            else:
+                del args[i:i + 2]
+                hwaccel_changed = True
+                continue
+            hwaccel_changed = True
+        elif (_VIDEO_CODEC_FLAG.match(arg) and is_hardware_encoder(value)
+              and value not in caps.working_encoders):
+            codec = value.split("_", 1)[0]
+            args[i + 1] = software_encoder(codec) or "libx264"
+            fallback_encoders.append(value)
+        i += 1
+
+    if hwaccel_changed:
+        args = _remove_options(args, {"-hwaccel_output_format", "-hwaccel_device"})
+
+    if fallback_encoders:
+        args = _translate_encoder_options(args)
+        if any(encoder.endswith("_vaapi") for encoder in fallback_encoders):
+            args = _remove_options(args, {"-vaapi_device"})
+            args = _replace_in_filters(args, r"\bhwupload\b(?!_)", "null")
+
+    if "cuda" not in caps.working_hwaccels or any(e.endswith("_nvenc") for e in fallback_encoders):
+        args = _replace_in_filters(args, r"\bhwupload_cuda\b", "null")
+    return args
+
+
+def uses_hardware(command: List[str]) -> bool:
+    """命令是否使用了硬件解码或硬件编码器"""
+    for i, arg in enumerate(command[:-1]):
+        value = command[i + 1]
+        if arg == "-hwaccel" and value != "none":
+            return True
+        if _VIDEO_CODEC_FLAG.match(arg) and is_hardware_encoder(value):
+            return True
+    return False
+
+
+def _remove_options(args: List[str], names: Set[str]) -> List[str]:
+    result = []
+    i = 0
+    while i < len(args):
+        if args[i] in names and i + 1 < len(args) - 1:
+            i += 2
+            continue
+        result.append(args[i])
+        i += 1
+    return result
+
+
+def _replace_in_filters(args: List[str], pattern: str, replacement: str) -> List[str]:
+    result = list(args)
+    for i, arg in enumerate(args[:-1]):
+        if arg in ("-vf", "-filter:v", "-filter_complex", "-lavfi"):
+            result[i + 1] = re.sub(pattern, replacement, args[i + 1])
+    return result
+
+
+def _translate_encoder_options(args: List[str]) -> List[str]:
+    """把硬件编码器的参数转换成x264/x265可以接受的形式"""
+    has_crf = any(arg.startswith("-crf") for arg in args)
+    result = [args[0]]
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) - 1 else None
+        name = arg.split(":", 1)[0]
+        if value is not None:
+            if name in _HW_ONLY_OPTIONS:
+                i += 2
+                continue
+            if name == "-cq":
+                if not has_crf:
+                    result.extend(["-crf", value])
+                    has_crf = True
+                i += 2
+                continue
+            if name == "-preset" and value in _NVENC_PRESETS:
+                result.extend([arg, _NVENC_PRESETS[value]])
+                i += 2
+                continue
+            if name == "-tune" and value in _HW_ONLY_TUNES:
+                i += 2
+                continue
+        result.append(arg)
+        i += 1
+    return result
@@ -0,0 +1,124 @@
+"""
+关键帧索引
+用一次 ffprobe -show_packets 扫描(只读数据包，不解码)得到视频流每个数据包的
+时间戳、字节位置和标志，以numpy数组保存，用于输入端快速定位和按关键帧切分
+"""
+import io
+from typing import Optional
+
+from .media_info import ProbeCache
+
+# 数据包标志位
+FLAG_KEY = 1
+FLAG_DISCARD = 2
+FLAG_CORRUPT = 4
+
+_FLAG_BITS = {"K": FLAG_KEY, "D": FLAG_DISCARD, "C": FLAG_CORRUPT}
+
+
+class KeyframeIndex:
+    """
+    视频流的数据包索引
+    pts: 各数据包的显示时间(秒，相对文件起点，float64)
+    pos: 各数据包在文件中的字节位置(int64，未知为-1)
+    flags: 数据包标志(uint8，见 FLAG_*)
+    数组按pts升序排列
+    """
+
+    def __init__(self, pts, pos, flags):
+        import numpy as np
+
+        order = np.argsort(pts, kind="stable")
+        self.pts = np.asarray(pts, dtype=np.float64)[order]
+        self.pos = np.asarray(pos, dtype=np.int64)[order]
+        self.flags = np.asarray(flags, dtype=np.uint8)[order]
+
+        keyframes = (self.flags & FLAG_KEY) != 0
+        self._key_pts = self.pts[keyframes]
+        self._key_pos = self.pos[keyframes]
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    @property
+    def keyframe_times(self):
+        """所有关键帧的时间(升序)"""
+        return self._key_pts
+
+    def nearest_keyframe_before(self, t: float) -> float:
+        """t时刻(含)之前最近的关键帧时间，没有时返回0"""
+        import numpy as np
+
+        i = int(np.searchsorted(self._key_pts, t + 1e-6, side="right")) - 1
+        return float(self._key_pts[i]) if i >= 0 else 0.0
+
+    def nearest_keyframe_after(self, t: float) -> Optional[float]:
+        """t时刻(含)之后最近的关键帧时间，没有时返回None"""
+        import numpy as np
+
+        i = int(np.searchsorted(self._key_pts, t - 1e-6, side="left"))
+        return float(self._key_pts[i]) if i < len(self._key_pts) else None
+
+    def byte_offset(self, t: float) -> Optional[int]:
+        """从t时刻开始解码需要读取的起始字节位置(t之前最近关键帧的位置)"""
+        import numpy as np
+
+        i = int(np.searchsorted(self._key_pts, t + 1e-6, side="right")) - 1
+        if i < 0 or self._key_pos[i] < 0:
+            return None
+        return int(self._key_pos[i])
+
+    @classmethod
+    def from_ffprobe_output(cls, output: str) -> "KeyframeIndex":
+        """
+        解析 ffprobe -show_entries packet=pts_time,dts_time,pos,flags:format=start_time -of compact 的输出
+        没有pts的数据包使用dts
+        """
+        start_time = 0.0
+        pts, pos, flags = [], [], []
+        for line in output.splitlines():
+            fields = dict(item.split("=", 1) for item in line.split("|")[1:] if "=" in item)
+            if line.startswith("format"):
+                try:
+                    start_time = float(fields.get("start_time", 0.0))
+                except ValueError:
+                    pass
+                continue
+            if not line.startswith("packet"):
+                continue
+            try:
+                time = float(fields.get("pts_time", "N/A"))
+            except ValueError:
+                try:
+                    time = float(fields.get("dts_time", "N/A"))
+                except ValueError:
+                    continue
+            try:
+                offset = int(fields.get("pos", "-1"))
+            except ValueError:
+                offset = -1
+            pts.append(time)
+            pos.append(offset)
+            flags.append(sum(bit for char, bit in _FLAG_BITS.items() if char in fields.get("flags", "")))
+
+        import numpy as np
+        return cls(np.asarray(pts, dtype=np.float64) - start_time, pos, flags)
+
+    def to_bytes(self) -> bytes:
+        """序列化为npz格式，用于保存在探测索引中"""
+        import numpy as np
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, pts=self.pts, pos=self.pos, flags=self.flags)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KeyframeIndex":
+        import numpy as np
+
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(arrays["pts"], arrays["pos"], arrays["flags"])
+
+
+# 进程内共享的关键帧索引缓存，数据包数组较大，只保留少量条目
+KEYFRAME_CACHE = ProbeCache(maxsize=32)
@@ -0,0 +1,205 @@
+"""
+媒体信息模块
+提供ffprobe探测结果的不可变数据结构，以及按文件状态缓存的进程内LRU缓存
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Any
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """安全地转换为整数"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """安全地转换为浮点数"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_rate(value: Any) -> Optional[float]:
+    """解析 "30000/1001" 形式的帧率"""
+    if not value:
+        return None
+    try:
+        if "/" in str(value):
+            num, den = map(int, str(value).split("/"))
+            return num / den if den else None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _freeze_tags(tags: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, str], ...]:
+    """将标签字典转换为可哈希的元组"""
+    if not tags:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in tags.items()))
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    """单个媒体流的信息"""
+    index: int
+    codec_type: str
+    codec_name: Optional[str] = None
+    profile: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pix_fmt: Optional[str] = None
+    frame_rate: Optional[float] = None
+    avg_frame_rate: Optional[float] = None
+    time_base: Optional[str] = None
+    sample_aspect_ratio: Optional[str] = None
+    duration: Optional[float] = None
+    bit_rate: Optional[int] = None
+    nb_frames: Optional[int] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    channel_layout: Optional[str] = None
+    tags: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def from_dict(cls, stream: Dict[str, Any]) -> "StreamInfo":
+        """从ffprobe的stream字典创建"""
+        return cls(
+            index=_to_int(stream.get("index")) or 0,
+            codec_type=stream.get("codec_type", "unknown"),
+            codec_name=stream.get("codec_name"),
+            profile=stream.get("profile"),
+            width=_to_int(stream.get("width")),
+            height=_to_int(stream.get("height")),
+            pix_fmt=stream.get("pix_fmt"),
+            frame_rate=_parse_rate(stream.get("r_frame_rate")),
+            avg_frame_rate=_parse_rate(stream.get("avg_frame_rate")),
+            time_base=stream.get("time_base"),
+            sample_aspect_ratio=stream.get("sample_aspect_ratio"),
+            duration=_to_float(stream.get("duration")),
+            bit_rate=_to_int(stream.get("bit_rate")),
+            nb_frames=_to_int(stream.get("nb_frames")),
+            sample_rate=_to_int(stream.get("sample_rate")),
+            channels=_to_int(stream.get("channels")),
+            channel_layout=stream.get("channel_layout"),
+            tags=_freeze_tags(stream.get("tags")),
+        )
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    媒体文件信息
+    由一次 ffprobe -show_format -show_streams 调用得到
+    """
+    path: str
+    format_name: Optional[str] = None
+    duration: Optional[float] = None
+    size: Optional[int] = None
+    bit_rate: Optional[int] = None
+    start_time: Optional[float] = None
+    streams: Tuple[StreamInfo, ...] = ()
+    tags: Tuple[Tuple[str, str], ...] = ()
+    raw: str = field(default="{}", repr=False, compare=False)
+
+    @classmethod
+    def from_probe_output(cls, path: str, output: str) -> "MediaInfo":
+        """从ffprobe的JSON输出创建"""
+        data = json.loads(output)
+        format_info = data.get("format", {})
+        streams = tuple(StreamInfo.from_dict(s) for s in data.get("streams", []))
+        return cls(
+            path=path,
+            format_name=format_info.get("format_name"),
+            duration=_to_float(format_info.get("duration")),
+            size=_to_int(format_info.get("size")),
+            bit_rate=_to_int(format_info.get("bit_rate")),
+            start_time=_to_float(format_info.get("start_time")),
+            streams=streams,
+            tags=_freeze_tags(format_info.get("tags")),
+            raw=output,
+        )
+
+    @property
+    def video(self) -> Optional[StreamInfo]:
+        """第一个视频流"""
+        for stream in self.streams:
+            if stream.codec_type == "video":
+                return stream
+        return None
+
+    @property
+    def audio(self) -> Optional[StreamInfo]:
+        """第一个音频流"""
+        for stream in self.streams:
+            if stream.codec_type == "audio":
+                return stream
+        return None
+
+    @property
+    def resolution(self) -> Optional[Tuple[int, int]]:
+        """视频分辨率 (宽, 高)"""
+        video = self.video
+        if video is None or not video.width or not video.height:
+            return None
+        return (video.width, video.height)
+
+    @property
+    def framerate(self) -> Optional[float]:
+        """视频帧率"""
+        video = self.video
+        return video.frame_rate if video is not None else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """返回原始ffprobe数据"""
+        return json.loads(self.raw)
+
+
+class ProbeCache:
+    """
+    探测结果的LRU缓存
+    键为 (真实路径, 文件大小, mtime_ns, inode)，文件变化后自动失效
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, int, int, int], MediaInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(path: str) -> Optional[Tuple[str, int, int, int]]:
+        """根据文件状态生成缓存键，文件不存在时返回None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.realpath(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def get(self, key: Tuple[str, int, int, int]) -> Optional[MediaInfo]:
+        with self._lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+            return info
+
+    def put(self, key: Tuple[str, int, int, int], info: MediaInfo) -> None:
+        with self._lock:
+            self._entries[key] = info
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 进程内共享的探测缓存
+PROBE_CACHE = ProbeCache(maxsize=int(os.environ.get("COMFYUI_FFMPEG_PROBE_CACHE_SIZE", "256")))
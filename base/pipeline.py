@@ -0,0 +1,87 @@
+"""
+视频处理管线
+各节点只记录滤镜片段，由渲染节点把整条链编译成一个 -filter_complex 并只编码一次，
+避免每个节点都解码、重新编码造成的多代有损压缩
+"""
+import re
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# 滤镜片段中的标签，如 [m1]
+_LABEL_PATTERN = re.compile(r"\[([A-Za-z_][A-Za-z0-9_]*)\]")
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """
+    管线中的一个处理步骤
+    filter 中可以使用占位符:
+        {main}   上一步的视频输出，未出现时自动加在片段开头
+        {input0} extra_inputs 中第一个附加输入的视频流，依此类推
+    """
+    filter: str
+    extra_inputs: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class VideoPipeline:
+    """
+    VIDEO_PIPELINE 类型的值
+    不可变，每次添加步骤都返回新的管线，因此同一管线可以分叉给多个下游节点
+    """
+    source: str
+    stages: Tuple[PipelineStage, ...] = field(default=())
+
+    def with_filter(self, filter_string: str) -> "VideoPipeline":
+        """添加普通滤镜片段"""
+        if not filter_string:
+            return self
+        return VideoPipeline(self.source, self.stages + (PipelineStage(filter_string),))
+
+    def with_stage(self, stage: PipelineStage) -> "VideoPipeline":
+        """添加带附加输入的步骤"""
+        return VideoPipeline(self.source, self.stages + (stage,))
+
+    @property
+    def inputs(self) -> List[str]:
+        """所有输入文件，第一个是源视频"""
+        inputs = [self.source]
+        for stage in self.stages:
+            inputs.extend(stage.extra_inputs)
+        return inputs
+
+    def compile(self) -> Tuple[str, str]:
+        """
+        编译为滤镜图
+        返回: (filter_complex字符串, 最终视频输出标签)
+        """
+        if not self.stages:
+            return "[0:v]null[vout]", "[vout]"
+
+        graph = []
+        current = "[0:v]"
+        next_input = 1
+        for i, stage in enumerate(self.stages):
+            # 给片段内部的标签加上步骤前缀，避免不同步骤之间重名
+            fragment = _LABEL_PATTERN.sub(lambda m: f"[s{i}_{m.group(1)}]", stage.filter)
+
+            # 用replace而不是format，文字水印等片段中可能含有花括号
+            if "{main}" not in fragment:
+                fragment = "{main}" + fragment
+            fragment = fragment.replace("{main}", current)
+            for k in range(len(stage.extra_inputs)):
+                fragment = fragment.replace(f"{{input{k}}}", f"[{next_input + k}:v]")
+            next_input += len(stage.extra_inputs)
+
+            output = "[vout]" if i == len(self.stages) - 1 else f"[v{i}]"
+            graph.append(fragment + output)
+            current = output
+
+        return ";".join(graph), "[vout]"
+
+    def digest(self) -> str:
+        """管线内容的短哈希，用于生成输出文件名"""
+        filter_complex, _ = self.compile()
+        payload = "\n".join(self.inputs) + "\n" + filter_complex
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
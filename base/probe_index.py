@@ -0,0 +1,195 @@
+"""
+持久化探测索引
+将ffprobe等分析结果保存到SQLite数据库，ComfyUI重启后无需重新探测
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional, Tuple
+import folder_paths
+
+# 索引键: (真实路径, 文件大小, mtime_ns, inode)
+IndexKey = Tuple[str, int, int, int]
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    获取持久缓存目录
+    ComfyUI启动时会清空临时目录，因此缓存放在临时目录旁边的 ffmpeg_cache 中，
+    可通过环境变量 COMFYUI_FFMPEG_CACHE_DIR 指定其他位置
+    """
+    base_dir = os.environ.get("COMFYUI_FFMPEG_CACHE_DIR")
+    if not base_dir:
+        temp_dir = os.path.abspath(folder_paths.get_temp_directory())
+        base_dir = os.path.join(os.path.dirname(temp_dir), "ffmpeg_cache")
+    cache_dir = os.path.join(base_dir, *parts)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+class ProbeIndex:
+    """
+    基于SQLite的探测结果索引
+    每条记录按 (类型, 键) 存储，类型区分不同的分析结果(如 "probe")
+    超过 max_entries 时按最近访问时间淘汰
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 50000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " kind TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " inode INTEGER NOT NULL,"
+            " data BLOB NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (kind, path, size, mtime_ns, inode))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)"
+        )
+        self._conn.commit()
+        self._inserts_since_evict = 0
+
+    def get(self, kind: str, key: IndexKey) -> Optional[bytes]:
+        """
+        读取记录，不存在时返回None
+        数据库被锁定或损坏(多个ComfyUI进程共享缓存目录)时按未命中处理
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT data FROM entries WHERE kind=? AND path=? AND size=? AND mtime_ns=? AND inode=?",
+                    (kind, *key)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"读取探测索引失败: {str(e)}")
+                return None
+            if row is None:
+                return None
+            try:
+                self._conn.execute(
+                    "UPDATE entries SET last_access=? WHERE kind=? AND path=? AND size=? AND mtime_ns=? AND inode=?",
+                    (time.time(), kind, *key)
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                # 只影响淘汰顺序
+                self._rollback_quietly()
+            return row[0]
+
+    def put(self, kind: str, key: IndexKey, data: bytes) -> None:
+        """写入记录，同一路径的旧版本记录会被替换；写入失败时只打印错误"""
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE kind=? AND path=?", (kind, key[0])
+                )
+                self._conn.execute(
+                    "INSERT INTO entries (kind, path, size, mtime_ns, inode, data, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kind, *key, data, time.time())
+                )
+                self._conn.commit()
+
+                # 插入一定数量后再检查容量，避免每次写入都统计行数
+                self._inserts_since_evict += 1
+                if self._inserts_since_evict >= 256:
+                    self._inserts_since_evict = 0
+                    self._evict_locked()
+            except sqlite3.Error as e:
+                print(f"写入探测索引失败: {str(e)}")
+                self._rollback_quietly()
+
+    def _rollback_quietly(self) -> None:
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _evict_locked(self) -> int:
+        """淘汰最久未访问的记录，返回删除的行数"""
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        self._conn.execute(
+            "DELETE FROM entries WHERE rowid IN "
+            "(SELECT rowid FROM entries ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        return excess
+
+    def compact(self) -> Tuple[int, int]:
+        """
+        压缩索引
+        删除源文件已不存在或已变化的记录，按容量淘汰，然后回收数据库空间
+        返回: (删除的过期记录数, 淘汰的记录数)
+        """
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT DISTINCT path, size, mtime_ns, inode FROM entries"
+                ).fetchall()
+
+                stale = []
+                for path, size, mtime_ns, inode in rows:
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        stale.append((path, size, mtime_ns, inode))
+                        continue
+                    if (stat.st_size, stat.st_mtime_ns, stat.st_ino) != (size, mtime_ns, inode):
+                        stale.append((path, size, mtime_ns, inode))
+
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE path=? AND size=? AND mtime_ns=? AND inode=?",
+                    stale
+                )
+                self._conn.commit()
+
+                evicted = self._evict_locked()
+                self._conn.execute("VACUUM")
+                return len(stale), evicted
+            except sqlite3.Error as e:
+                print(f"压缩探测索引失败: {str(e)}")
+                self._rollback_quietly()
+                return 0, 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_probe_index: Optional[ProbeIndex] = None
+_probe_index_lock = threading.Lock()
+
+
+def get_probe_index() -> Optional[ProbeIndex]:
+    """
+    获取进程内共享的探测索引
+    设置环境变量 COMFYUI_FFMPEG_PROBE_INDEX=0 可禁用持久化
+    """
+    global _probe_index
+    if os.environ.get("COMFYUI_FFMPEG_PROBE_INDEX", "1") == "0":
+        return None
+
+    with _probe_index_lock:
+        if _probe_index is None:
+            try:
+                db_path = os.path.join(get_cache_dir(), "probe_index.sqlite3")
+                max_entries = int(os.environ.get("COMFYUI_FFMPEG_PROBE_INDEX_SIZE", "50000"))
+                _probe_index = ProbeIndex(db_path, max_entries=max_entries)
+            except (OSError, sqlite3.Error) as e:
+                print(f"打开探测索引失败: {str(e)}")
+                return None
+        return _probe_index
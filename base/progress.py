@@ -0,0 +1,96 @@
+"""
+FFmpeg进度解析模块
+解析 -progress 输出的 key=value 数据块，并转发给ComfyUI进度条和回调函数
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class FFmpegProgress:
+    """一次进度更新"""
+    out_time: float = 0.0           # 已处理的输出时长(秒)
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0              # 相对实时的倍速
+    duration: Optional[float] = None
+    finished: bool = False
+
+    @property
+    def percent(self) -> Optional[float]:
+        """完成百分比，未知总时长时返回None"""
+        if self.finished:
+            return 100.0
+        if not self.duration or self.duration <= 0:
+            return None
+        return min(100.0, self.out_time / self.duration * 100.0)
+
+
+ProgressCallback = Callable[[FFmpegProgress], None]
+
+
+def _parse_number(value: Optional[str], default: float = 0.0) -> float:
+    """解析数值，兼容 "1.5x" 和 "N/A" 形式"""
+    if not value:
+        return default
+    value = value.strip().rstrip("x")
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+class ProgressParser:
+    """
+    -progress 输出的增量解析器
+    每遇到 progress=continue/end 行就生成一次 FFmpegProgress
+    """
+
+    def __init__(self, duration: Optional[float] = None):
+        self.duration = duration
+        self._block: Dict[str, str] = {}
+
+    def feed(self, line: str) -> Optional[FFmpegProgress]:
+        """输入一行输出，数据块结束时返回进度"""
+        line = line.strip()
+        if "=" not in line:
+            return None
+        key, value = line.split("=", 1)
+        self._block[key] = value
+        if key != "progress":
+            return None
+
+        block, self._block = self._block, {}
+        # out_time_ms 实际单位也是微秒，优先使用 out_time_us
+        out_time_us = _parse_number(block.get("out_time_us") or block.get("out_time_ms"))
+        return FFmpegProgress(
+            out_time=max(0.0, out_time_us / 1_000_000),
+            frame=int(_parse_number(block.get("frame"))),
+            fps=_parse_number(block.get("fps")),
+            speed=_parse_number(block.get("speed")),
+            duration=self.duration,
+            finished=(value == "end"),
+        )
+
+
+class ComfyProgressBar:
+    """
+    ComfyUI进度条包装
+    在ComfyUI环境之外运行时不做任何事
+    """
+    RESOLUTION = 1000
+
+    def __init__(self):
+        try:
+            import comfy.utils
+            self._bar = comfy.utils.ProgressBar(self.RESOLUTION)
+        except Exception:
+            self._bar = None
+
+    def update(self, progress: FFmpegProgress) -> None:
+        if self._bar is None:
+            return
+        percent = progress.percent
+        if percent is None:
+            return
+        self._bar.update_absolute(int(percent / 100.0 * self.RESOLUTION), self.RESOLUTION)
@@ -0,0 +1,206 @@
+"""
+输出结果缓存
+以规范化后的ffmpeg参数(输入文件替换为内容指纹)和ffmpeg版本为键，缓存编码结果，
+相同输入和参数的任务再次执行时直接复用已有输出
+"""
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from typing import List, Optional
+
+from .fingerprint import fingerprint_file
+from .scheduler import output_indices
+
+# 不会影响输出内容的参数
+_NEUTRAL_FLAGS = {"-y", "-n", "-nostats", "-hide_banner"}
+
+# 滤镜参数中的文件引用，如 lut3d=file='a.cube'、drawtext=fontfile='b.ttf'
+_FILTER_FILE_PATTERN = re.compile(r"file='([^']+)'")
+
+# 一个输出参数会写出多个文件的格式
+_MULTI_FILE_FORMATS = {"segment", "ssegment", "stream_segment", "hls", "dash", "tee", "image2"}
+
+# 在输出路径之外写文件的选项
+_SIDE_OUTPUT_OPTIONS = {
+    "-hls_segment_filename", "-hls_fmp4_init_filename", "-master_pl_name", "-var_stream_map",
+    "-segment_list", "-pass", "-passlogfile", "-vstats_file",
+}
+
+# 滤镜写出的附加文件，如 vidstabdetect=result=x.trf(不指定时写工作目录中的transforms.trf)、psnr=stats_file=x.log
+_FILTER_SIDE_OUTPUT_PATTERN = re.compile(r"(?:^|[:,=])(?:result|stats_file)=|vidstabdetect")
+
+
+def _file_token(path: str) -> str:
+    """文件在缓存键中的表示"""
+    return f"file:{fingerprint_file(path)}:{os.stat(path).st_mtime_ns}"
+
+
+class ResultCache:
+    """
+    基于目录的内容寻址缓存
+    条目按最近使用时间(mtime)进行LRU淘汰，总大小不超过 max_bytes
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(command: List[str], ffmpeg_version: str) -> Optional[str]:
+        """
+        生成缓存键
+        无法安全缓存的命令返回None：多个输出、分片/HLS/tee等一个输出写多个文件的格式、
+        两遍编码日志等附加输出文件、图片序列、concat列表、标准输出
+        输入文件使用内容指纹加修改时间(指纹只抽样读取，同样大小的局部修改需要由mtime区分)
+        """
+        if len(command) < 3:
+            return None
+        if output_indices(command) != [len(command) - 1]:
+            return None
+
+        output_path = command[-1]
+        output_ext = os.path.splitext(output_path)[1]
+        if (not output_ext or "%" in output_path or output_path == "-"
+                or output_path.startswith("pipe:")):
+            return None
+
+        canonical = []
+        args = command[1:-1]
+        for i, arg in enumerate(args):
+            if arg in _NEUTRAL_FLAGS:
+                continue
+            # concat列表文件的指纹不包含其引用的视频内容
+            if arg == "concat" and i > 0 and args[i - 1] == "-f":
+                return None
+            if i > 0 and args[i - 1] == "-f" and arg in _MULTI_FILE_FORMATS:
+                return None
+            if arg in _SIDE_OUTPUT_OPTIONS or _FILTER_SIDE_OUTPUT_PATTERN.search(arg):
+                return None
+            if os.path.isfile(arg):
+                canonical.append(_file_token(arg))
+                continue
+            if i > 0 and args[i - 1] == "-i":
+                # 输入不是本地文件(流地址、设备等)时无法缓存
+                return None
+            canonical.append(arg)
+            # 滤镜参数中引用的文件(LUT、字体等)
+            for referenced in _FILTER_FILE_PATTERN.findall(arg):
+                if os.path.isfile(referenced):
+                    canonical.append(_file_token(referenced))
+        canonical.append("output" + output_ext.lower())
+
+        payload = json.dumps([ffmpeg_version, canonical], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ext.lower())
+
+    def temp_path(self, key: str, output_path: str) -> str:
+        """生成ffmpeg写入用的临时文件路径(与缓存条目在同一目录，保证可以原子重命名)"""
+        ext = os.path.splitext(output_path)[1]
+        directory = os.path.join(self.cache_dir, key[:2])
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f".tmp-{uuid.uuid4().hex}{ext}")
+
+    def restore(self, key: str, output_path: str) -> bool:
+        """命中时把缓存条目放到输出路径，返回是否命中"""
+        entry = self._entry_path(key, os.path.splitext(output_path)[1])
+        if not os.path.isfile(entry):
+            return False
+        try:
+            # 更新mtime作为最近使用时间
+            os.utime(entry)
+            self._link_or_copy(entry, output_path)
+            return True
+        except OSError as e:
+            print(f"读取结果缓存失败: {str(e)}")
+            return False
+
+    def publish(self, key: str, temp_path: str, output_path: str) -> None:
+        """把ffmpeg写完的临时文件原子地发布为缓存条目，并放到输出路径"""
+        entry = self._entry_path(key, os.path.splitext(output_path)[1])
+        os.replace(temp_path, entry)
+        self._link_or_copy(entry, output_path)
+        self.evict()
+
+    @staticmethod
+    def _link_or_copy(source: str, target: str) -> None:
+        """优先使用硬链接(不占用额外空间)，跨文件系统时复制，目标路径原子替换"""
+        # 目标已经是同一文件时无需处理(此时rename不会删除临时链接)
+        if os.path.exists(target) and os.path.samefile(source, target):
+            return
+        target_dir = os.path.dirname(os.path.abspath(target))
+        os.makedirs(target_dir, exist_ok=True)
+        staging = os.path.join(target_dir, f".tmp-{uuid.uuid4().hex}{os.path.splitext(target)[1]}")
+        try:
+            os.link(source, staging)
+        except OSError:
+            shutil.copy2(source, staging)
+        os.replace(staging, target)
+
+    def evict(self) -> int:
+        """按最近使用时间淘汰条目，返回删除的文件数"""
+        with self._lock:
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if name.startswith(".tmp-"):
+                        # 清理异常中断后残留超过一天的临时文件
+                        if time.time() - stat.st_mtime > 86400:
+                            self._remove_quietly(path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            removed = 0
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._remove_quietly(path):
+                    total -= size
+                    removed += 1
+            return removed
+
+    @staticmethod
+    def _remove_quietly(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    获取进程内共享的结果缓存
+    COMFYUI_FFMPEG_RESULT_CACHE=0 禁用缓存，COMFYUI_FFMPEG_RESULT_CACHE_MB 设置容量(默认10GB)
+    """
+    global _result_cache
+    if os.environ.get("COMFYUI_FFMPEG_RESULT_CACHE", "1") == "0":
+        return None
+
+    from .probe_index import get_cache_dir
+
+    with _result_cache_lock:
+        if _result_cache is None:
+            max_mb = int(os.environ.get("COMFYUI_FFMPEG_RESULT_CACHE_MB", "10240"))
+            _result_cache = ResultCache(get_cache_dir("results"), max_mb * 1024 * 1024)
+        return _result_cache
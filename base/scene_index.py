@@ -0,0 +1,123 @@
+"""
+场景切换索引
+用一次低分辨率解码(select='gt(scene,T)' + metadata=print)得到所有场景变化分数超过下限的帧，
+保存时间和分数；之后不同阈值的分割点、代表帧都直接从索引中计算，无需再次解码
+"""
+import io
+import re
+from typing import List, Tuple
+
+from .media_info import ProbeCache
+
+# 分析时记录的最低场景分数，更高的阈值直接在已记录的结果中筛选
+SCENE_SCORE_FLOOR = 0.1
+
+# 分析时的缩放宽度，场景分数对分辨率不敏感
+ANALYSIS_WIDTH = 160
+
+# 持久化索引中的类别名，时间改为相对容器起始时间后更换，旧结果不再使用
+INDEX_KIND = "scenes_v2"
+
+_PTS_TIME_PATTERN = re.compile(r"pts_time:\s*(-?[\d.]+)")
+_SCORE_PATTERN = re.compile(r"lavfi\.scene_score=\s*([\d.]+)")
+
+
+def build_scene_filter(floor: float = SCENE_SCORE_FLOOR) -> str:
+    """场景分析滤镜，选中的帧及其分数由metadata滤镜输出到日志"""
+    return f"scale={ANALYSIS_WIDTH}:-2,select='gt(scene,{floor})',metadata=print"
+
+
+class SceneIndex:
+    """
+    视频的场景变化索引
+    times: 场景变化帧的时间(秒，float64，升序)
+    scores: 对应的场景变化分数(0~1，float32)
+    """
+
+    def __init__(self, times, scores):
+        import numpy as np
+
+        order = np.argsort(times, kind="stable")
+        self.times = np.asarray(times, dtype=np.float64)[order]
+        self.scores = np.asarray(scores, dtype=np.float32)[order]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def cuts(self, threshold: float = 0.3, min_gap: float = 0.0) -> List[float]:
+        """
+        分数不低于阈值的场景切换时间
+        间隔小于 min_gap 的切换中只保留分数最高的一个(避免闪光、快速剪辑产生过短片段)
+        """
+        selected = [(float(t), float(s)) for t, s in zip(self.times, self.scores) if s >= threshold]
+        result: List[Tuple[float, float]] = []
+        for t, score in selected:
+            if result and t - result[-1][0] < min_gap:
+                if score > result[-1][1]:
+                    result[-1] = (t, score)
+                continue
+            result.append((t, score))
+        return [t for t, _ in result if t >= min_gap]
+
+    def scene_ranges(self, duration: float, threshold: float = 0.3,
+                     min_gap: float = 0.0) -> List[Tuple[float, float]]:
+        """按场景切换点划分的 [(开始, 结束)] 区间"""
+        bounds = [0.0] + [t for t in self.cuts(threshold, min_gap) if t < duration] + [duration]
+        return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+    def representative_times(self, count: int, duration: float,
+                             threshold: float = 0.3) -> List[float]:
+        """
+        挑选 count 个代表帧的时间，每个取所在场景的中点(避开转场)
+        场景多于 count 时取最长的几个场景；少于 count 时把最长的场景继续对半拆分
+        """
+        ranges = self.scene_ranges(duration, threshold)
+        while len(ranges) < count:
+            longest = max(ranges, key=lambda r: r[1] - r[0])
+            i = ranges.index(longest)
+            middle = (longest[0] + longest[1]) / 2
+            ranges[i:i + 1] = [(longest[0], middle), (middle, longest[1])]
+        ranges = sorted(ranges, key=lambda r: r[1] - r[0], reverse=True)[:count]
+        return sorted((start + end) / 2 for start, end in ranges)
+
+    @classmethod
+    def from_ffmpeg_log(cls, log: str, start_time: float = 0.0) -> "SceneIndex":
+        """
+        解析metadata=print滤镜的日志输出(每帧一行pts_time，之后是 lavfi.scene_score=...)
+        日志中是流的原始时间戳，减去容器的 start_time 后与其他时间(从0开始)一致
+        """
+        times, scores = [], []
+        current_time = None
+        for line in log.splitlines():
+            match = _PTS_TIME_PATTERN.search(line)
+            if match:
+                try:
+                    current_time = float(match.group(1))
+                except ValueError:
+                    current_time = None
+                continue
+            match = _SCORE_PATTERN.search(line)
+            if match and current_time is not None:
+                times.append(current_time - start_time)
+                scores.append(float(match.group(1)))
+                current_time = None
+        return cls(times, scores)
+
+    def to_bytes(self) -> bytes:
+        """序列化为npz格式，用于保存在探测索引中"""
+        import numpy as np
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, times=self.times, scores=self.scores)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SceneIndex":
+        import numpy as np
+
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(arrays["times"], arrays["scores"])
+
+
+# 进程内共享的场景索引缓存
+SCENE_CACHE = ProbeCache(maxsize=64)
@@ -0,0 +1,201 @@
+"""
+FFmpeg任务调度模块
+限制整个进程内同时运行的ffmpeg数量，并在各任务之间分配CPU线程预算
+"""
+import os
+import re
+import json
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+# 任务优先级，数值越小越先执行
+PRIORITY_INTERACTIVE = 0    # 预览、缩略图等交互任务
+PRIORITY_NORMAL = 10
+PRIORITY_BATCH = 20         # 批量导出等后台任务
+
+# 默认配置文件位置: 插件根目录下的 ffmpeg_settings.json
+DEFAULT_SETTINGS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "ffmpeg_settings.json"
+)
+
+
+def load_settings() -> dict:
+    """
+    读取插件配置
+    配置文件路径可通过环境变量 COMFYUI_FFMPEG_SETTINGS 指定，文件不存在时返回空字典
+    """
+    settings_file = os.environ.get("COMFYUI_FFMPEG_SETTINGS", DEFAULT_SETTINGS_FILE)
+    if not os.path.isfile(settings_file):
+        return {}
+    try:
+        with open(settings_file, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        return settings if isinstance(settings, dict) else {}
+    except (OSError, ValueError) as e:
+        print(f"读取配置文件失败 {settings_file}: {str(e)}")
+        return {}
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    """调度器配置"""
+    max_jobs: int
+    thread_budget: int
+
+    @property
+    def threads_per_job(self) -> int:
+        """每个任务分得的线程数"""
+        return max(1, self.thread_budget // self.max_jobs)
+
+    @classmethod
+    def from_environment(cls) -> "SchedulerConfig":
+        """
+        从配置文件和环境变量读取配置，环境变量优先
+        COMFYUI_FFMPEG_MAX_JOBS: 最大并发ffmpeg进程数
+        COMFYUI_FFMPEG_THREADS: 所有任务共享的CPU线程总数
+        """
+        settings = load_settings().get("scheduler", {})
+        cpu_count = os.cpu_count() or 1
+
+        thread_budget = int(os.environ.get(
+            "COMFYUI_FFMPEG_THREADS", settings.get("thread_budget", cpu_count)
+        ))
+        max_jobs = int(os.environ.get(
+            "COMFYUI_FFMPEG_MAX_JOBS", settings.get("max_jobs", max(1, min(4, cpu_count // 4)))
+        ))
+        return cls(max_jobs=max(1, max_jobs), thread_budget=max(1, thread_budget))
+
+
+class FFmpegScheduler:
+    """
+    进程内ffmpeg任务调度器
+    超过并发上限的任务按 (优先级, 提交顺序) 排队等待
+    """
+
+    def __init__(self, config: SchedulerConfig):
+        self.config = config
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waiting: List[tuple] = []
+        self._counter = itertools.count()
+
+    @contextmanager
+    def job(self, priority: int = PRIORITY_NORMAL) -> Iterator[int]:
+        """
+        占用一个任务槽位
+        用法: with scheduler.job(priority) as threads: ...
+        返回该任务可以使用的线程数
+        """
+        ticket = (priority, next(self._counter))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            while self._running >= self.config.max_jobs or self._waiting[0] != ticket:
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            self._running += 1
+            # 队首已变化，唤醒其他等待者检查是否轮到自己
+            self._condition.notify_all()
+
+        try:
+            yield self.config.threads_per_job
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify_all()
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+
+# 不带参数值的ffmpeg选项，其余选项都带一个参数值
+_FLAG_OPTIONS = {
+    "-y", "-n", "-nostdin", "-stdin", "-nostats", "-stats", "-hide_banner", "-an", "-vn", "-sn", "-dn",
+    "-shortest", "-copyts", "-re", "-accurate_seek", "-noaccurate_seek", "-autorotate", "-noautorotate",
+    "-ignore_unknown", "-copy_unknown", "-start_at_zero", "-xerror", "-benchmark", "-benchmark_all",
+    "-debug_ts", "-dump", "-hex", "-bitexact", "-frame_pts",
+}
+
+# 按流指定视频编码器的选项，如 -c:v:0、-codec:v:1
+_VIDEO_STREAM_CODEC = re.compile(r"^-(?:c|codec):v:(\d+)$")
+
+
+def _takes_value(command: List[str], i: int) -> bool:
+    """command[i] 处的选项是否带参数值"""
+    if command[i] in _FLAG_OPTIONS or i + 1 >= len(command):
+        return False
+    if command[i] == "-i":
+        return True
+    following = command[i + 1]
+    # 下一个参数本身像选项(不是 "-"、负数或 -0:a 这样的流说明符)时，当前选项不带参数值
+    return not (following.startswith("-") and len(following) > 1
+                and following[1] not in "0123456789.")
+
+
+def output_indices(command: List[str]) -> List[int]:
+    """命令中输出文件参数的位置(既不是选项也不是选项值的参数)"""
+    indices = []
+    i = 1
+    while i < len(command):
+        arg = command[i]
+        if arg.startswith("-") and arg != "-":
+            i += 2 if _takes_value(command, i) else 1
+            continue
+        indices.append(i)
+        i += 1
+    return indices
+
+
+def apply_thread_limits(command: List[str], threads: int) -> List[str]:
+    """
+    为ffmpeg命令添加线程限制
+    -filter_threads/-filter_complex_threads 作为全局参数放在最前面；
+    -threads 作为输出参数放在每个输出路径之前(对 libx264/libx265 等编码器生效)，
+    多个输出、一个输出中的多个视频编码器(码率阶梯)平分线程数，总数不超过分得的预算；
+    命令中已经显式指定的参数不会被覆盖
+    """
+    command = list(command)
+    global_args = []
+    if "-filter_threads" not in command:
+        global_args.extend(["-filter_threads", str(threads)])
+    if "-filter_complex_threads" not in command:
+        global_args.extend(["-filter_complex_threads", str(threads)])
+    command[1:1] = global_args
+
+    if any(arg == "-threads" or arg.startswith("-threads:") for arg in command):
+        return command
+
+    outputs = output_indices(command)
+    if not outputs:
+        return command
+    per_output = max(1, threads // len(outputs))
+    # 从后往前插入，前面输出的位置不变
+    for n in range(len(outputs) - 1, -1, -1):
+        start = outputs[n - 1] + 1 if n > 0 else 1
+        end = outputs[n]
+        encoders = {match.group(1) for match in map(_VIDEO_STREAM_CODEC.match, command[start:end]) if match}
+        per_encoder = max(1, per_output // max(1, len(encoders)))
+        command[end:end] = ["-threads", str(per_encoder)]
+    return command
+
+
+_scheduler: Optional[FFmpegScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> FFmpegScheduler:
+    """获取进程内共享的调度器"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FFmpegScheduler(SchedulerConfig.from_environment())
+        return _scheduler
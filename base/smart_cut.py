@@ -0,0 +1,99 @@
+"""
+智能剪切
+剪切区间内完整的GOP直接流复制，只重新编码两端不完整的GOP(使用与源视频一致的编码参数)，
+最后用concat分离器无损拼接
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .keyframe_index import KeyframeIndex
+from .media_info import StreamInfo
+
+# 可以重新编码出与源视频兼容码流的编码器
+_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+}
+
+# ffprobe的profile名称 -> 编码器的profile参数
+_PROFILES = {
+    "h264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 10": "high10",
+        "High 4:2:2": "high422",
+        "High 4:4:4 Predictive": "high444",
+    },
+    "hevc": {
+        "Main": "main",
+        "Main 10": "main10",
+        "Main 4:2:2 10": "main422-10",
+    },
+}
+
+
+@dataclass(frozen=True)
+class CutPart:
+    """剪切结果中的一段，时间为相对文件起点的秒数"""
+    start: float
+    end: Optional[float]    # None表示到文件结尾
+    copy: bool              # True为流复制，False为重新编码
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+
+def plan_smart_cut(keyframe_index: KeyframeIndex, start: float, end: Optional[float],
+                   frame_time: float) -> List[CutPart]:
+    """
+    规划剪切区间
+    返回: 按时间顺序排列的各段，区间内没有完整GOP时只有一段重新编码
+    """
+    first_key = keyframe_index.nearest_keyframe_after(start)
+    if first_key is None or (end is not None and first_key >= end):
+        return [CutPart(start, end, False)]
+
+    last_key = None
+    if end is not None:
+        last_key = keyframe_index.nearest_keyframe_before(end)
+        if last_key <= first_key:
+            return [CutPart(start, end, False)]
+
+    parts = []
+    # 不足半帧的边缘直接忽略
+    if first_key - start > frame_time / 2:
+        parts.append(CutPart(start, first_key, False))
+    parts.append(CutPart(first_key, last_key, True))
+    if end is not None and end - last_key > frame_time / 2:
+        parts.append(CutPart(last_key, end, False))
+    return parts
+
+
+def matching_encoder_args(video: StreamInfo) -> Optional[List[str]]:
+    """
+    生成与源视频码流兼容的编码参数(编码器、profile、像素格式)
+    不支持的编码格式返回None
+    """
+    encoder = _ENCODERS.get(video.codec_name or "")
+    if encoder is None:
+        return None
+
+    args = ["-c:v", encoder]
+    profile = _PROFILES[video.codec_name].get(video.profile or "")
+    if profile:
+        args.extend(["-profile:v", profile])
+    if video.pix_fmt:
+        args.extend(["-pix_fmt", video.pix_fmt])
+    return args
+
+
+def timescale_args(video: StreamInfo) -> List[str]:
+    """保持源视频的时间基，避免拼接后时间戳取整误差"""
+    if video.time_base and "/" in video.time_base:
+        denominator = video.time_base.split("/", 1)[1]
+        if denominator.isdigit():
+            return ["-video_track_timescale", denominator]
+    return []
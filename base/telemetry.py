@@ -0,0 +1,392 @@
+"""
+ffmpeg执行遥测
+每次启动ffmpeg/ffprobe都生成一条结构化的任务记录(命令、节点、输入指纹、耗时、CPU时间、
+峰值内存、退出码、输出大小、ffmpeg报告的倍速)，发送到可插拔的输出:
+JSONL文件、内存环形缓冲区、Prometheus textfile。用于统计哪些节点和预设占用了最多的算力
+"""
+import os
+import re
+import sys
+import json
+import time
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from .scheduler import load_settings
+
+# 从标准错误的统计行中提取倍速，如 "speed=2.35x"
+_SPEED_PATTERN = re.compile(r"speed=\s*([\d.]+)x")
+
+# 默认的环形缓冲区容量
+DEFAULT_RING_SIZE = 1000
+
+
+class TrackedPopen(subprocess.Popen):
+    """
+    回收子进程时使用 os.wait4 取得该进程自己的资源统计(rusage)
+    wait()/communicate() 经过 _try_wait，poll()(包括 kill() 内部的调用)也改为经过 _try_wait，
+    进程被强制终止时同样能得到统计；不支持 wait4 的平台(Windows)上 rusage 为 None
+    """
+    rusage = None
+
+    if hasattr(os, "wait4"):
+        def _try_wait(self, wait_flags):
+            try:
+                pid, status, rusage = os.wait4(self.pid, wait_flags)
+            except ChildProcessError:
+                return self.pid, 0
+            if pid == self.pid:
+                self.rusage = rusage
+            return pid, status
+
+        def poll(self):
+            if self.returncode is not None:
+                return self.returncode
+            if not self._waitpid_lock.acquire(False):
+                # 其他线程正在等待该进程
+                return None
+            try:
+                if self.returncode is None:
+                    pid, status = self._try_wait(os.WNOHANG)
+                    if pid == self.pid:
+                        self._handle_exitstatus(status)
+            finally:
+                self._waitpid_lock.release()
+            return self.returncode
+
+
+@dataclass
+class JobRecord:
+    """一次ffmpeg/ffprobe调用的记录"""
+    tool: str                               # ffmpeg / ffprobe
+    node: str                               # 发起调用的节点类名
+    argv: List[str]
+    exit_code: int
+    wall_time: float                        # 秒
+    user_time: Optional[float] = None       # 子进程用户态CPU时间(秒)
+    system_time: Optional[float] = None     # 子进程内核态CPU时间(秒)
+    peak_rss: Optional[int] = None          # 子进程峰值内存(字节)
+    input_fingerprint: Optional[str] = None
+    output_bytes: Optional[int] = None
+    speed: Optional[float] = None           # ffmpeg报告的相对实时倍速
+    encoder: Optional[str] = None
+    preset: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def cpu_time(self) -> Optional[float]:
+        if self.user_time is None or self.system_time is None:
+            return None
+        return self.user_time + self.system_time
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _option_value(argv: List[str], names: Tuple[str, ...]) -> Optional[str]:
+    """命令中第一个匹配选项的值"""
+    for i, arg in enumerate(argv[:-1]):
+        if arg in names:
+            return argv[i + 1]
+    return None
+
+
+def parse_speed(stderr: str) -> Optional[float]:
+    """标准错误中最后一次报告的倍速"""
+    matches = _SPEED_PATTERN.findall(stderr or "")
+    if not matches:
+        return None
+    try:
+        return float(matches[-1])
+    except ValueError:
+        return None
+
+
+def output_size(argv: List[str]) -> Optional[int]:
+    """命令最后一个参数是普通文件时返回其大小"""
+    if not argv:
+        return None
+    try:
+        return os.path.getsize(argv[-1]) if os.path.isfile(argv[-1]) else None
+    except OSError:
+        return None
+
+
+def build_record(tool: str, node: str, process: subprocess.Popen, wall_time: float,
+                 speed: Optional[float] = None, input_fingerprint: Optional[str] = None) -> JobRecord:
+    """根据已结束的进程生成记录"""
+    argv = [str(arg) for arg in process.args]
+    record = JobRecord(
+        tool=tool,
+        node=node,
+        argv=argv,
+        exit_code=process.returncode if process.returncode is not None else -1,
+        wall_time=wall_time,
+        input_fingerprint=input_fingerprint,
+        output_bytes=output_size(argv) if tool == "ffmpeg" else None,
+        speed=speed,
+        encoder=_option_value(argv, ("-c:v", "-vcodec", "-c:v:0")) if tool == "ffmpeg" else None,
+        preset=_option_value(argv, ("-preset", "-preset:v")) if tool == "ffmpeg" else None,
+    )
+    rusage = getattr(process, "rusage", None)
+    if rusage is not None:
+        record.user_time = rusage.ru_utime
+        record.system_time = rusage.ru_stime
+        # Linux下 ru_maxrss 的单位是KB，macOS下是字节
+        record.peak_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    return record
+
+
+def record_process(tool: str, node: str, process: subprocess.Popen, started: float,
+                   speed: Optional[float] = None, input_fingerprint: Optional[str] = None) -> None:
+    """把已结束的进程写入遥测记录，started 为启动前的 time.monotonic()"""
+    telemetry = get_telemetry()
+    if not telemetry.enabled:
+        return
+    wall_time = time.monotonic() - started
+    try:
+        telemetry.emit(build_record(tool, node, process, wall_time, speed, input_fingerprint))
+    except Exception as e:
+        print(f"生成遥测记录失败: {str(e)}")
+
+
+def run_tracked(command: List[str], node: str, timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """
+    与 subprocess.run 类似地执行一条ffmpeg/ffprobe命令并记录遥测，用于版本、能力检测等没有节点的调用
+    返回: (返回码, 标准输出, 标准错误)；超时时终止进程后抛出 subprocess.TimeoutExpired
+    """
+    tool = "ffprobe" if os.path.basename(command[0]).startswith("ffprobe") else "ffmpeg"
+    started = time.monotonic()
+    process = TrackedPopen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        errors='replace'
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        record_process(tool, node, process, started)
+        raise
+    record_process(tool, node, process, started, parse_speed(stderr))
+    return process.returncode, stdout, stderr
+
+
+class TelemetrySink:
+    """记录输出的基类"""
+
+    def emit(self, record: JobRecord) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSink(TelemetrySink):
+    """每条记录追加一行JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def emit(self, record: JobRecord) -> None:
+        line = json.dumps(record.to_dict(), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class RingSink(TelemetrySink):
+    """在内存中保留最近的若干条记录"""
+
+    def __init__(self, capacity: int = DEFAULT_RING_SIZE):
+        self._records = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+
+    def emit(self, record: JobRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> List[JobRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class PrometheusTextfileSink(TelemetrySink):
+    """
+    按 (节点, 工具, 编码器, 预设, 状态) 汇总记录，写入node_exporter textfile collector格式的文件
+    每次更新都先写临时文件再替换，采集时不会读到写了一半的文件
+    """
+    _COUNTERS = (
+        ("jobs_total", "counter", "ffmpeg/ffprobe调用次数"),
+        ("wall_seconds_total", "counter", "调用的总耗时(秒)"),
+        ("user_seconds_total", "counter", "子进程用户态CPU时间(秒)"),
+        ("system_seconds_total", "counter", "子进程内核态CPU时间(秒)"),
+        ("output_bytes_total", "counter", "输出文件的总大小(字节)"),
+        ("peak_rss_bytes", "gauge", "子进程峰值内存的最大值(字节)"),
+    )
+
+    def __init__(self, path: str, prefix: str = "comfyui_ffmpeg"):
+        self.path = path
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Dict[str, float]] = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def emit(self, record: JobRecord) -> None:
+        key = (
+            record.node,
+            record.tool,
+            record.encoder or "",
+            record.preset or "",
+            "ok" if record.exit_code == 0 else "error",
+        )
+        with self._lock:
+            values = self._series.setdefault(key, {name: 0.0 for name, _, _ in self._COUNTERS})
+            values["jobs_total"] += 1
+            values["wall_seconds_total"] += record.wall_time
+            values["user_seconds_total"] += record.user_time or 0.0
+            values["system_seconds_total"] += record.system_time or 0.0
+            values["output_bytes_total"] += record.output_bytes or 0
+            values["peak_rss_bytes"] = max(values["peak_rss_bytes"], record.peak_rss or 0)
+            self._write()
+
+    def render(self) -> str:
+        lines = []
+        for name, metric_type, help_text in self._COUNTERS:
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for (node, tool, encoder, preset, status), values in sorted(self._series.items()):
+                labels = ",".join(
+                    f'{label}="{_escape_label(value)}"'
+                    for label, value in (("node", node), ("tool", tool), ("encoder", encoder),
+                                         ("preset", preset), ("status", status))
+                )
+                lines.append(f"{metric}{{{labels}}} {values[name]}")
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> None:
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, self.path)
+
+
+class Telemetry:
+    """把记录分发给所有输出，单个输出出错不影响其他输出和ffmpeg任务本身"""
+
+    def __init__(self, sinks: Optional[List[TelemetrySink]] = None):
+        self._sinks: List[TelemetrySink] = list(sinks or [])
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._sinks)
+
+    @property
+    def sinks(self) -> List[TelemetrySink]:
+        with self._lock:
+            return list(self._sinks)
+
+    def add_sink(self, sink: TelemetrySink) -> None:
+        with self._lock:
+            self._sinks.append(sink)
+
+    def remove_sink(self, sink: TelemetrySink) -> None:
+        with self._lock:
+            if sink in self._sinks:
+                self._sinks.remove(sink)
+
+    def emit(self, record: JobRecord) -> None:
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:
+                print(f"遥测记录输出失败 ({type(sink).__name__}): {str(e)}")
+
+    def recent(self) -> List[JobRecord]:
+        """内存环形缓冲区中的记录"""
+        for sink in self.sinks:
+            if isinstance(sink, RingSink):
+                return sink.records()
+        return []
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+def _default_path(filename: str) -> str:
+    from .probe_index import get_cache_dir
+    return os.path.join(get_cache_dir("telemetry"), filename)
+
+
+def create_sinks() -> List[TelemetrySink]:
+    """
+    从配置文件和环境变量创建输出，环境变量优先
+    COMFYUI_FFMPEG_TELEMETRY: 逗号分隔的输出列表 ring, jsonl, prometheus；0 或 off 表示关闭，默认 ring
+    COMFYUI_FFMPEG_TELEMETRY_JSONL: JSONL文件路径
+    COMFYUI_FFMPEG_TELEMETRY_PROMETHEUS: Prometheus textfile路径(应放在node_exporter的textfile目录中)
+    COMFYUI_FFMPEG_TELEMETRY_RING: 环形缓冲区容量
+    """
+    settings = load_settings().get("telemetry", {})
+    names = os.environ.get("COMFYUI_FFMPEG_TELEMETRY")
+    if names is None:
+        names = settings.get("sinks", "ring")
+    if isinstance(names, str):
+        names = names.split(",")
+    names = [str(name).strip().lower() for name in names if str(name).strip()]
+    if any(name in ("0", "off", "false", "none") for name in names):
+        return []
+
+    sinks: List[TelemetrySink] = []
+    for name in names:
+        try:
+            if name == "ring":
+                capacity = int(os.environ.get(
+                    "COMFYUI_FFMPEG_TELEMETRY_RING", settings.get("ring_size", DEFAULT_RING_SIZE)
+                ))
+                sinks.append(RingSink(capacity))
+            elif name == "jsonl":
+                path = os.environ.get("COMFYUI_FFMPEG_TELEMETRY_JSONL", settings.get("jsonl_path"))
+                sinks.append(JsonlSink(path or _default_path("jobs.jsonl")))
+            elif name == "prometheus":
+                path = os.environ.get("COMFYUI_FFMPEG_TELEMETRY_PROMETHEUS", settings.get("prometheus_path"))
+                sinks.append(PrometheusTextfileSink(path or _default_path("comfyui_ffmpeg.prom")))
+            else:
+                print(f"未知的遥测输出: {name}")
+        except (OSError, ValueError) as e:
+            print(f"创建遥测输出 {name} 失败: {str(e)}")
+    return sinks
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """进程内共享的遥测实例"""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry(create_sinks())
+    return _telemetry
@@ -0,0 +1,14 @@
+"""
+FFmpeg节点基准测试
+用lavfi生成的确定性素材逐个运行 NODE_CLASS_MAPPINGS 中的节点，记录耗时、CPU时间、
+ffmpeg进程峰值内存、输出大小和实时倍率，并可以与保存的基线结果比较
+"""
+from .compare import compare_results, format_comparison, has_regressions
+from .media import MediaSpec, DEFAULT_SPECS, QUICK_SPECS, generate_media
+from .runner import run_benchmarks, save_results, load_results
+
+__all__ = [
+    'MediaSpec', 'DEFAULT_SPECS', 'QUICK_SPECS', 'generate_media',
+    'run_benchmarks', 'save_results', 'load_results',
+    'compare_results', 'format_comparison', 'has_regressions',
+]
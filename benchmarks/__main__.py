@@ -0,0 +1,73 @@
+"""
+基准测试命令行
+在插件根目录下运行:
+    python -m benchmarks run [--quick] [--sizes 1280x720x5,...] [--nodes VideoCrop,...]
+                            [--repeat 3] [--gpu] [--output result.json] [--baseline baseline.json]
+    python -m benchmarks compare current.json baseline.json [--metric wall_time] [--threshold 0.1]
+"""
+import sys
+import argparse
+
+from .compare import compare_results, format_comparison, has_regressions
+from .media import DEFAULT_SPECS, QUICK_SPECS, parse_specs
+from .runner import default_work_dir, load_results, run_benchmarks, save_results
+
+
+def _add_compare_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metric", default="wall_time",
+                        help="比较的指标 (wall_time, child_user_time, child_peak_rss, output_bytes, realtime_factor ...)")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="判定为回归的相对变化 (默认0.1，即10%%)")
+
+
+def _report(current: dict, baseline: dict, args) -> int:
+    rows = compare_results(current, baseline, args.metric, args.threshold)
+    print(format_comparison(rows, args.metric))
+    return 1 if has_regressions(rows) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="FFmpeg节点基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="运行基准测试")
+    run_parser.add_argument("--quick", action="store_true", help="只使用一个小尺寸素材")
+    run_parser.add_argument("--sizes", help="素材规格，如 1280x720x5,640x360x10@30 (宽x高x时长[@帧率])")
+    run_parser.add_argument("--nodes", help="只测试指定的节点，逗号分隔")
+    run_parser.add_argument("--repeat", type=int, default=1, help="每个用例的运行次数，结果取中位数")
+    run_parser.add_argument("--gpu", action="store_true", help="开启节点的 use_gpu 选项")
+    run_parser.add_argument("--ffmpeg", default="ffmpeg", help="生成素材使用的ffmpeg")
+    run_parser.add_argument("--work-dir", default=default_work_dir(), help="素材和临时文件目录")
+    run_parser.add_argument("--timeout", type=int, default=1800, help="单个用例的超时时间(秒)")
+    run_parser.add_argument("--output", help="结果JSON文件")
+    run_parser.add_argument("--baseline", help="与基线结果比较，有回归时返回1")
+    _add_compare_options(run_parser)
+
+    compare_parser = subparsers.add_parser("compare", help="比较两次结果")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    _add_compare_options(compare_parser)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return _report(load_results(args.current), load_results(args.baseline), args)
+
+    if args.sizes:
+        specs = parse_specs(args.sizes)
+    else:
+        specs = QUICK_SPECS if args.quick else DEFAULT_SPECS
+    nodes = [node.strip() for node in args.nodes.split(",") if node.strip()] if args.nodes else None
+
+    results = run_benchmarks(specs, nodes, args.repeat, args.gpu, args.work_dir, args.ffmpeg, args.timeout)
+    if args.output:
+        save_results(results, args.output)
+        print(f"结果已保存: {args.output}")
+
+    if args.baseline:
+        return _report(results, load_results(args.baseline), args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
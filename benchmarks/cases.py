@@ -0,0 +1,186 @@
+"""
+基准测试用例
+根据节点的 INPUT_TYPES 自动生成调用参数：路径类输入填入测试素材，其余使用默认值，
+个别节点的参数在 NODE_OVERRIDES 中调整
+"""
+import os
+import sys
+import types
+import importlib.util
+from typing import Any, Dict, Optional
+
+# 插件加载后使用的模块名(插件目录名可能包含连字符)
+PLUGIN_MODULE = "comfyui_ffmpeg_tool"
+
+# 插件根目录
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 是否使用GPU的输入名
+_GPU_INPUTS = ("use_gpu", "使用GPU")
+
+# 个别节点的参数调整，值可以是以素材信息为参数的函数
+NODE_OVERRIDES: Dict[str, Dict[str, Any]] = {
+    # 不覆盖测试素材
+    "VideoAudioMix": {"覆盖原文件": False},
+    "VideoMetadata": {"operation": "write", "title": "benchmark"},
+    "VideoSplitting": {"split_mode": "segments", "segments": 2},
+    "VideoStreaming": {"quality_levels": 2},
+    "VideoThumbnail": {"mode": "multiple", "max_frames": 5},
+    "VideoTrim": {
+        "start_time": lambda media: f"{media['duration'] / 4:.3f}",
+        "duration": lambda media: f"{media['duration'] / 2:.3f}",
+    },
+    "VideoTransition": {"transition_duration": lambda media: min(1.0, media["duration"] / 4)},
+    # 限制帧数，避免大分辨率素材占用过多内存
+    "VideoToImages": {"max_frames": 50},
+}
+
+# 需要额外Python模块的节点
+NODE_REQUIREMENTS: Dict[str, tuple] = {
+    "ImagesToVideo": ("torch",),
+    "VideoToImages": ("numpy", "torch"),
+}
+
+# 输出不是文件路径的节点
+TEXT_OUTPUT_NODES = ("VideoInfo",)
+
+
+def install_folder_paths(output_dir: str, temp_dir: str, input_dir: str) -> None:
+    """在ComfyUI之外运行时提供 folder_paths 模块，输出写入基准测试的工作目录"""
+    module = types.ModuleType("folder_paths")
+    module.get_output_directory = lambda: output_dir
+    module.get_temp_directory = lambda: temp_dir
+    module.get_input_directory = lambda: input_dir
+    module.get_annotated_filepath = lambda name: os.path.join(input_dir, name)
+    module.exists_annotated_filepath = lambda name: os.path.exists(os.path.join(input_dir, name))
+    for directory in (output_dir, temp_dir, input_dir):
+        os.makedirs(directory, exist_ok=True)
+    sys.modules["folder_paths"] = module
+
+
+def load_plugin(root: str = PLUGIN_ROOT):
+    """按包的方式加载插件(节点使用相对导入)"""
+    module = sys.modules.get(PLUGIN_MODULE)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(
+        PLUGIN_MODULE, os.path.join(root, "__init__.py"), submodule_search_locations=[root]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PLUGIN_MODULE] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _asset_for(name: str, options: dict) -> Optional[str]:
+    """根据输入名判断需要的测试素材(只针对默认值为空的字符串输入)"""
+    if options.get("default", "") != "":
+        return None
+    lowered = name.lower()
+    if lowered == "input_videos":
+        return "video_list"
+    if "video" in lowered or "视频" in name:
+        return "video"
+    if "audio" in lowered or "音频" in name:
+        return "audio"
+    if "subtitle_file" in lowered:
+        return "subtitle"
+    if "image_path" in lowered:
+        return "image"
+    return None
+
+
+def _default_value(input_type, options: dict):
+    if isinstance(input_type, (list, tuple)):
+        return options.get("default", input_type[0] if input_type else None)
+    if "default" in options:
+        return options["default"]
+    if input_type in ("INT", "FLOAT"):
+        return options.get("min", 0)
+    if input_type == "BOOLEAN":
+        return False
+    return ""
+
+
+class SkipCase(Exception):
+    """当前环境无法运行的用例(例如缺少torch)"""
+
+
+def build_inputs(plugin, node_name: str, media: dict, use_gpu: bool) -> Dict[str, Any]:
+    """生成节点主函数的调用参数"""
+    missing = [name for name in NODE_REQUIREMENTS.get(node_name, ())
+               if importlib.util.find_spec(name) is None]
+    if missing:
+        raise SkipCase(f"需要 {', '.join(missing)}")
+
+    node_class = plugin.NODE_CLASS_MAPPINGS[node_name]
+    input_types = node_class.INPUT_TYPES()
+    overrides = NODE_OVERRIDES.get(node_name, {})
+    kwargs = {}
+
+    for section in ("required", "optional"):
+        for name, spec in input_types.get(section, {}).items():
+            input_type = spec[0]
+            options = spec[1] if len(spec) > 1 and isinstance(spec[1], dict) else {}
+
+            if name in overrides:
+                value = overrides[name]
+                kwargs[name] = value(media) if callable(value) else value
+            elif name in _GPU_INPUTS:
+                kwargs[name] = use_gpu
+            elif input_type == "VIDEO_PIPELINE":
+                kwargs[name] = _make_pipeline(plugin, media)
+            elif input_type == "IMAGE":
+                kwargs[name] = _make_images(plugin, media)
+            elif input_type == "STRING" and _asset_for(name, options):
+                asset = _asset_for(name, options)
+                kwargs[name] = (f"{media['video']}\n{media['video']}" if asset == "video_list"
+                                else media[asset])
+            elif section == "required":
+                kwargs[name] = _default_value(input_type, options)
+    return kwargs
+
+
+def _make_pipeline(plugin, media: dict):
+    node_class = plugin.NODE_CLASS_MAPPINGS["VideoPipelineLoad"]
+    node = node_class()
+    return getattr(node, node_class.FUNCTION)(media["video"])[0]
+
+
+def _make_images(plugin, media: dict):
+    node_class = plugin.NODE_CLASS_MAPPINGS["VideoToImages"]
+    node = node_class()
+    return getattr(node, node_class.FUNCTION)(media["video"], max_frames=50)[0]
+
+
+def _split_paths(value: str) -> list:
+    """多个输出路径以换行或逗号分隔"""
+    if os.path.exists(value):
+        return [value]
+    parts = [part.strip() for line in value.splitlines() for part in line.split(",")]
+    return [part for part in parts if part and os.path.exists(part)]
+
+
+def output_paths(node_name: str, result) -> list:
+    """节点返回值中的输出文件路径"""
+    if node_name in TEXT_OUTPUT_NODES or not isinstance(result, tuple):
+        return []
+    paths = []
+    for value in result:
+        if isinstance(value, str):
+            paths.extend(path for path in _split_paths(value) if path not in paths)
+    return paths
+
+
+def is_success(node_name: str, result) -> bool:
+    """
+    节点是否执行成功
+    节点出错时返回错误信息而不是输出路径，第一个字符串输出不是已存在的路径即视为失败
+    """
+    if not isinstance(result, tuple) or not result:
+        return False
+    first = result[0]
+    if node_name in TEXT_OUTPUT_NODES or not isinstance(first, str):
+        return True
+    return bool(_split_paths(first))
+
@@ -0,0 +1,70 @@
+"""
+基准测试结果比较
+按 (节点, 素材) 对比当前结果和基线结果，超过阈值的变慢记为回归
+"""
+from typing import Dict, List, Tuple
+
+# 指标越小越好时比较 current/baseline，realtime_factor 越大越好
+_HIGHER_IS_BETTER = ("realtime_factor",)
+
+
+def _index(results: dict) -> Dict[Tuple[str, str], dict]:
+    return {(record["node"], record["media"]): record for record in results.get("results", [])}
+
+
+def compare_results(current: dict, baseline: dict, metric: str = "wall_time",
+                    threshold: float = 0.1) -> List[dict]:
+    """
+    比较两次结果
+    返回每个用例一行: node, media, baseline, current, change(相对变化), status
+    status: regression / improved / unchanged / failed / fixed / new / missing
+    """
+    current_index = _index(current)
+    baseline_index = _index(baseline)
+    rows = []
+    for key in sorted(set(current_index) | set(baseline_index)):
+        node, media = key
+        now = current_index.get(key)
+        before = baseline_index.get(key)
+        row = {"node": node, "media": media, "baseline": None, "current": None,
+               "change": None, "status": "unchanged"}
+
+        if now is None:
+            row["status"] = "missing"
+        elif before is None:
+            row["status"] = "new"
+            row["current"] = now.get(metric)
+        elif now.get("status") != "ok":
+            row["status"] = "failed" if before.get("status") == "ok" else "unchanged"
+        elif before.get("status") != "ok":
+            row["status"] = "fixed"
+            row["current"] = now.get(metric)
+        else:
+            row["baseline"] = before.get(metric)
+            row["current"] = now.get(metric)
+            if row["baseline"] and row["current"] is not None:
+                change = row["current"] / row["baseline"] - 1.0
+                if metric in _HIGHER_IS_BETTER:
+                    change = -change
+                row["change"] = change
+                if change > threshold:
+                    row["status"] = "regression"
+                elif change < -threshold:
+                    row["status"] = "improved"
+        rows.append(row)
+    return rows
+
+
+def has_regressions(rows: List[dict]) -> bool:
+    return any(row["status"] in ("regression", "failed") for row in rows)
+
+
+def format_comparison(rows: List[dict], metric: str = "wall_time") -> str:
+    """生成文本表格"""
+    lines = [f"{'node':<24} {'media':<20} {'baseline':>10} {'current':>10} {'change':>8}  status  ({metric})"]
+    for row in rows:
+        baseline = f"{row['baseline']:.3f}" if isinstance(row["baseline"], (int, float)) else "-"
+        current = f"{row['current']:.3f}" if isinstance(row["current"], (int, float)) else "-"
+        change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        lines.append(f"{row['node']:<24} {row['media']:<20} {baseline:>10} {current:>10} {change:>8}  {row['status']}")
+    return "\n".join(lines)
@@ -0,0 +1,132 @@
+"""
+基准测试素材
+用lavfi的 testsrc2/sine 生成确定性的测试视频，不依赖外部文件，可以离线运行
+"""
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class MediaSpec:
+    """测试视频规格"""
+    width: int
+    height: int
+    duration: float     # 秒
+    fps: int = 25
+
+    @property
+    def name(self) -> str:
+        # 名称同时用作素材文件名和结果的比较键，必须包含全部参数
+        return f"{self.width}x{self.height}_{self.duration:g}s_{self.fps}fps"
+
+
+# 默认素材：不同分辨率和时长
+DEFAULT_SPECS = [
+    MediaSpec(640, 360, 5),
+    MediaSpec(1280, 720, 5),
+    MediaSpec(1920, 1080, 10),
+]
+
+# 快速检查用的素材
+QUICK_SPECS = [
+    MediaSpec(320, 180, 2),
+]
+
+
+def parse_specs(text: str) -> List[MediaSpec]:
+    """解析 "1280x720x5,640x360x10@30" 形式的素材规格(宽x高x时长[@帧率])"""
+    specs = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        size, _, fps = item.partition("@")
+        width, height, duration = size.split("x")
+        specs.append(MediaSpec(int(width), int(height), float(duration), int(fps or 25)))
+    return specs
+
+
+def _run(command: List[str]) -> None:
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True, errors='replace')
+    if result.returncode != 0:
+        raise RuntimeError(f"生成测试素材失败: {result.stderr[-2000:]}")
+
+
+def generate_video(ffmpeg_path: str, spec: MediaSpec, output_path: str) -> str:
+    """
+    生成带音频的测试视频
+    单线程编码并去掉编码器版本等元数据，相同ffmpeg版本每次生成的文件完全相同
+    """
+    if os.path.isfile(output_path):
+        return output_path
+    temp_path = output_path + ".tmp.mp4"
+    _run([
+        ffmpeg_path, "-hide_banner", "-y",
+        "-f", "lavfi", "-i",
+        f"testsrc2=size={spec.width}x{spec.height}:rate={spec.fps}:duration={spec.duration:g}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={spec.duration:g}",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+        "-g", str(spec.fps * 2), "-threads", "1",
+        "-c:a", "aac", "-b:a", "128k", "-ac", "2",
+        "-map_metadata", "-1", "-fflags", "+bitexact", "-flags", "+bitexact",
+        "-shortest", temp_path
+    ])
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def _srt_time(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    return f"{millis // 3600000:02d}:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d},{millis % 1000:03d}"
+
+
+def generate_assets(ffmpeg_path: str, directory: str, duration: float) -> Dict[str, str]:
+    """生成音频、水印图片和字幕等辅助素材"""
+    os.makedirs(directory, exist_ok=True)
+    audio_path = os.path.join(directory, f"sine_{duration:g}s.wav")
+    if not os.path.isfile(audio_path):
+        _run([
+            ffmpeg_path, "-hide_banner", "-y",
+            "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=48000:duration={duration:g}",
+            "-ac", "2", "-fflags", "+bitexact", "-flags", "+bitexact", audio_path
+        ])
+
+    image_path = os.path.join(directory, "watermark.png")
+    if not os.path.isfile(image_path):
+        _run([
+            ffmpeg_path, "-hide_banner", "-y",
+            "-f", "lavfi", "-i", "testsrc2=size=128x64:rate=1:duration=1",
+            "-frames:v", "1", image_path
+        ])
+
+    subtitle_path = os.path.join(directory, f"subtitle_{duration:g}s.srt")
+    if not os.path.isfile(subtitle_path):
+        lines = []
+        for i in range(max(1, int(duration))):
+            lines.append(f"{i + 1}\n{_srt_time(i)} --> {_srt_time(i + 0.9)}\nbenchmark {i + 1}\n")
+        with open(subtitle_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+    return {"audio": audio_path, "image": image_path, "subtitle": subtitle_path}
+
+
+def generate_media(ffmpeg_path: str, directory: str, specs: List[MediaSpec]) -> Dict[str, dict]:
+    """
+    生成全部测试素材(已存在的文件直接复用)
+    返回: {素材名: {"video": 路径, "duration": 时长, "audio"/"image"/"subtitle": 路径}}
+    """
+    os.makedirs(directory, exist_ok=True)
+    media = {}
+    for spec in specs:
+        video_path = generate_video(ffmpeg_path, spec, os.path.join(directory, f"{spec.name}.mp4"))
+        media[spec.name] = {
+            "video": video_path,
+            "width": spec.width,
+            "height": spec.height,
+            "duration": spec.duration,
+            **generate_assets(ffmpeg_path, directory, spec.duration),
+        }
+    return media
@@ -0,0 +1,190 @@
+"""
+基准测试运行器
+为每个 (节点, 素材) 组合启动一个子进程执行节点主函数，汇总为可比较的JSON结果
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+from .cases import PLUGIN_ROOT, install_folder_paths, load_plugin
+from .media import MediaSpec, generate_media
+
+# 结果文件格式版本(2: 素材名称包含宽度和帧率)
+RESULT_VERSION = 2
+
+# 取多次运行中位数的指标
+_MEDIAN_METRICS = ("wall_time", "python_cpu_time", "child_user_time", "child_system_time",
+                   "child_peak_rss", "output_bytes", "realtime_factor")
+
+
+def default_work_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), "comfyui_ffmpeg_bench")
+
+
+def list_nodes(work_dir: str) -> List[str]:
+    """插件注册的全部节点"""
+    install_folder_paths(
+        os.path.join(work_dir, "output"),
+        os.path.join(work_dir, "temp"),
+        os.path.join(work_dir, "input"),
+    )
+    return list(load_plugin(PLUGIN_ROOT).NODE_CLASS_MAPPINGS.keys())
+
+
+def _ffmpeg_version(ffmpeg_path: str) -> str:
+    try:
+        result = subprocess.run([ffmpeg_path, "-version"], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True, errors='replace')
+        return result.stdout.splitlines()[0] if result.stdout else ""
+    except OSError:
+        return ""
+
+
+def _worker_env(work_dir: str) -> Dict[str, str]:
+    """关闭各级缓存，保证每次运行都真正执行ffmpeg"""
+    env = dict(os.environ)
+    env.update({
+        "COMFYUI_FFMPEG_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "COMFYUI_FFMPEG_RESULT_CACHE": "0",
+        "COMFYUI_FFMPEG_FRAME_CACHE": "0",
+        "COMFYUI_FFMPEG_PROBE_INDEX": "0",
+    })
+    return env
+
+
+def run_case(node: str, media_name: str, media: dict, work_dir: str,
+             use_gpu: bool, timeout: int) -> dict:
+    """在子进程中运行一个用例"""
+    case = {
+        "node": node,
+        "media_name": media_name,
+        "media": media,
+        "work_dir": work_dir,
+        "plugin_root": PLUGIN_ROOT,
+        "use_gpu": use_gpu,
+    }
+    case_dir = os.path.join(work_dir, "cases")
+    os.makedirs(case_dir, exist_ok=True)
+    case_file = os.path.join(case_dir, f"{node}_{media_name}.json")
+    result_file = os.path.join(case_dir, f"{node}_{media_name}.result.json")
+    log_file = os.path.join(case_dir, f"{node}_{media_name}.log")
+    with open(case_file, "w", encoding="utf-8") as f:
+        json.dump(case, f, ensure_ascii=False)
+    if os.path.exists(result_file):
+        os.remove(result_file)
+
+    with open(log_file, "w", encoding="utf-8") as log:
+        try:
+            subprocess.run(
+                # 在插件根目录下运行，子进程可以导入 benchmarks 包
+                [sys.executable, "-m", "benchmarks.worker", case_file, result_file],
+                cwd=PLUGIN_ROOT, env=_worker_env(work_dir),
+                stdout=log, stderr=subprocess.STDOUT, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return {"node": node, "media": media_name, "status": "failed",
+                    "error": f"超时 (>{timeout}秒)"}
+
+    try:
+        with open(result_file, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        record = {"node": node, "media": media_name, "status": "failed",
+                  "error": f"没有结果，详见 {log_file}"}
+    record["log"] = log_file
+    return record
+
+
+def _summarize(runs: List[dict]) -> dict:
+    """合并多次运行，数值指标取中位数"""
+    summary = dict(runs[-1])
+    ok_runs = [run for run in runs if run.get("status") == "ok"]
+    if not ok_runs:
+        return summary
+    summary = dict(ok_runs[-1])
+    for metric in _MEDIAN_METRICS:
+        values = [run[metric] for run in ok_runs if run.get(metric) is not None]
+        summary[metric] = statistics.median(values) if values else None
+    summary["repeats"] = len(ok_runs)
+    return summary
+
+
+def run_benchmarks(specs: List[MediaSpec], nodes: Optional[List[str]] = None,
+                   repeat: int = 1, use_gpu: bool = False,
+                   work_dir: Optional[str] = None, ffmpeg_path: str = "ffmpeg",
+                   timeout: int = 1800, verbose: bool = True) -> dict:
+    """
+    运行基准测试
+    返回: {"version", "created", "environment", "results": [每个用例的测量结果]}
+    """
+    work_dir = work_dir or default_work_dir()
+    media = generate_media(ffmpeg_path, os.path.join(work_dir, "media"), specs)
+    available = list_nodes(work_dir)
+    if nodes:
+        unknown = [node for node in nodes if node not in available]
+        if unknown:
+            raise ValueError(f"未知的节点: {', '.join(unknown)}")
+    else:
+        nodes = available
+
+    results = []
+    for media_name, media_info in media.items():
+        for node in nodes:
+            runs = []
+            for _ in range(max(1, repeat)):
+                runs.append(run_case(node, media_name, media_info, work_dir, use_gpu, timeout))
+                if runs[-1]["status"] != "ok":
+                    break
+            summary = _summarize(runs)
+            results.append(summary)
+            if verbose:
+                _print_record(summary)
+
+    # 节点输出只用于统计大小，运行结束后删除
+    shutil.rmtree(os.path.join(work_dir, "output"), ignore_errors=True)
+
+    return {
+        "version": RESULT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": _ffmpeg_version(ffmpeg_path),
+            "use_gpu": use_gpu,
+        },
+        "results": results,
+    }
+
+
+def _print_record(record: dict) -> None:
+    name = f"{record['node']:<24} {record['media']:<20}"
+    if record["status"] != "ok":
+        print(f"{name} {record['status']}: {record.get('error') or ''}"[:200])
+        return
+    print(f"{name} {record['wall_time']:8.2f}s  "
+          f"x{record['realtime_factor'] or 0:6.2f}  "
+          f"{(record['output_bytes'] or 0) / 1048576:8.2f}MB")
+
+
+def save_results(results: dict, path: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("version") != RESULT_VERSION:
+        raise ValueError(f"不支持的结果文件版本: {results.get('version')}")
+    return results
@@ -0,0 +1,164 @@
+"""
+基准测试子进程
+每个用例在独立的进程中运行，子进程资源统计(RUSAGE_CHILDREN)只包含该用例启动的ffmpeg进程
+用法: python -m benchmarks.worker <用例JSON文件> <结果JSON文件>
+"""
+import os
+import sys
+import json
+import time
+import threading
+import traceback
+from typing import Optional
+
+from .cases import (
+    PLUGIN_ROOT, SkipCase, build_inputs, install_folder_paths, is_success, load_plugin, output_paths
+)
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class _PeakSampler:
+    """没有 resource 模块(Windows)时用psutil定期采样子进程内存，得到近似的峰值"""
+
+    def __init__(self, interval: float = 0.05):
+        import psutil
+
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            for child in self._process.children(recursive=True):
+                try:
+                    self.peak = max(self.peak, child.memory_info().rss)
+                except Exception:
+                    pass
+            self._stop.wait(self._interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _children_usage():
+    """已结束子进程的 (用户态CPU, 内核态CPU, 峰值内存字节数)"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # Linux下 ru_maxrss 的单位是KB，macOS下是字节
+    rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return usage.ru_utime, usage.ru_stime, rss
+
+
+def _self_cpu() -> float:
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _directory_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def run_case(case: dict) -> dict:
+    """运行一个用例，返回测量结果"""
+    work_dir = case["work_dir"]
+    install_folder_paths(
+        os.path.join(work_dir, "output"),
+        os.path.join(work_dir, "temp"),
+        os.path.join(work_dir, "input"),
+    )
+    plugin = load_plugin(case.get("plugin_root") or PLUGIN_ROOT)
+    node_name = case["node"]
+    media = case["media"]
+    record = {"node": node_name, "media": case["media_name"], "status": "ok", "error": None}
+
+    try:
+        kwargs = build_inputs(plugin, node_name, media, case.get("use_gpu", False))
+    except SkipCase as e:
+        record.update(status="skipped", error=str(e))
+        return record
+
+    node_class = plugin.NODE_CLASS_MAPPINGS[node_name]
+    node = node_class()
+    function = getattr(node, node_class.FUNCTION)
+
+    # 准备输入时也可能启动ffmpeg，只统计节点执行期间的增量
+    before = _children_usage()
+    self_before = _self_cpu()
+    sampler: Optional[_PeakSampler] = None
+    if before is None:
+        try:
+            sampler = _PeakSampler().__enter__()
+        except ImportError:
+            sampler = None
+
+    start = time.perf_counter()
+    try:
+        result = function(**kwargs)
+    except Exception as e:
+        result = None
+        record.update(status="failed", error=f"{type(e).__name__}: {e}")
+        traceback.print_exc()
+    wall_time = time.perf_counter() - start
+
+    after = _children_usage()
+    if sampler is not None:
+        sampler.__exit__(None, None, None)
+
+    if record["status"] == "ok" and not is_success(node_name, result):
+        record.update(status="failed", error=str(result[0])[:500] if isinstance(result, tuple) and result else None)
+
+    paths = output_paths(node_name, result)
+    record.update({
+        "wall_time": wall_time,
+        "python_cpu_time": _self_cpu() - self_before,
+        "child_user_time": after[0] - before[0] if after else None,
+        "child_system_time": after[1] - before[1] if after else None,
+        # 峰值内存是所有已结束子进程的最大值，准备输入的进程也包含在内
+        "child_peak_rss": after[2] if after else (sampler.peak if sampler else None),
+        "output_bytes": sum(_directory_size(path) for path in paths),
+        "realtime_factor": media["duration"] / wall_time if wall_time > 0 else None,
+    })
+    return record
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    case_file, result_file = argv
+    with open(case_file, "r", encoding="utf-8") as f:
+        case = json.load(f)
+    try:
+        record = run_case(case)
+    except Exception as e:
+        traceback.print_exc()
+        record = {"node": case.get("node"), "media": case.get("media_name"),
+                  "status": "failed", "error": f"{type(e).__name__}: {e}"}
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
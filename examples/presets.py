@@ -13,7 +13,7 @@ COMPRESS_PRESETS = {
     },
     "balanced": {
         "crf": 23,
-        "preset": "medium",
+        "preset": "auto",   # 默认预设使用全局速度设置
         "tune": "film",
         "audio_bitrate": "128k"
     },
@@ -1,18 +1,108 @@
 import os
+import mmap
+import time
 import hashlib
+import threading
 from PIL import Image, ImageOps, ImageSequence
 import numpy as np
 import torch
 import folder_paths
 
+# 文件哈希缓存 {(路径, 文件大小, mtime_ns): sha256}，文件未变化时只需要一次stat
+_HASH_CACHE = {}
+_HASH_CACHE_LOCK = threading.Lock()
+_HASH_CACHE_SIZE = 1024
+# 分块读取的块大小
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _sha256_file(path, use_mmap=False):
+    """
+    分块计算文件的SHA-256，不会把整个文件读入内存
+    use_mmap 为 True 时通过内存映射交给hashlib一次处理(大文件时更快)
+    """
+    m = hashlib.sha256()
+    with open(path, "rb") as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                m.update(mapped)
+        else:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                m.update(chunk)
+    return m.hexdigest()
+
+
+def cached_file_hash(path, use_mmap=False):
+    """获取文件的SHA-256，按 (路径, 文件大小, mtime_ns) 缓存"""
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    with _HASH_CACHE_LOCK:
+        digest = _HASH_CACHE.get(key)
+    if digest is not None:
+        return digest
+
+    digest = _sha256_file(path, use_mmap)
+    with _HASH_CACHE_LOCK:
+        if len(_HASH_CACHE) >= _HASH_CACHE_SIZE:
+            # 删除最早加入的记录
+            _HASH_CACHE.pop(next(iter(_HASH_CACHE)))
+        _HASH_CACHE[key] = digest
+    return digest
+
+
+# 按媒体类型筛选文件时使用的扩展名
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tif", ".tiff"}
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm", ".flv", ".wmv", ".m4v", ".ts"}
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".aac", ".flac", ".m4a", ".ogg", ".opus"}
+MEDIA_TYPES = {
+    "image": IMAGE_EXTENSIONS,
+    "video": VIDEO_EXTENSIONS,
+    "audio": AUDIO_EXTENSIONS,
+}
+
+# 目录列表缓存 {真实路径: (目录mtime_ns, 列出时间, 排序后的文件名)}
+_LISTING_CACHE = {}
+_LISTING_CACHE_LOCK = threading.Lock()
+# 目录在列出前这么多秒内被修改过时不信任缓存(mtime精度较低的文件系统上，
+# 同一时间单位内的后续修改不会改变mtime)
+_LISTING_SETTLE_SECONDS = 2.0
+
+
+def list_directory_files(directory, media_type=None):
+    """
+    列出目录中的文件(不含子目录)，按文件名排序
+    使用 os.scandir 的缓存类型信息，不需要对每个文件单独stat；
+    结果按目录mtime缓存，目录中增删文件后自动重新扫描
+    media_type: None表示全部文件，或 "image"、"video"、"audio"
+    """
+    real_dir = os.path.realpath(directory)
+    mtime_ns = os.stat(real_dir).st_mtime_ns
+    with _LISTING_CACHE_LOCK:
+        entry = _LISTING_CACHE.get(real_dir)
+    if (entry is None or entry[0] != mtime_ns
+            or entry[1] - mtime_ns / 1e9 < _LISTING_SETTLE_SECONDS):
+        listed_at = time.time()
+        with os.scandir(real_dir) as it:
+            files = tuple(sorted(e.name for e in it if e.is_file()))
+        entry = (mtime_ns, listed_at, files)
+        with _LISTING_CACHE_LOCK:
+            _LISTING_CACHE[real_dir] = entry
+
+    files = entry[2]
+    if media_type is None:
+        return list(files)
+    extensions = MEDIA_TYPES[media_type]
+    return [f for f in files if os.path.splitext(f)[1].lower() in extensions]
+
+
 class LoadImageAndReturnPath:
     @classmethod
     def INPUT_TYPES(cls):
         input_dir = folder_paths.get_input_directory()
-        files = [f for f in os.listdir(input_dir) if os.path.isfile(os.path.join(input_dir, f))]
+        files = list_directory_files(input_dir)
         return {
             "required": {
-                "image": (sorted(files), {"image_upload": True}),  # 图像文件
+                "image": (files, {"image_upload": True}),  # 图像文件
             }
         }
 
@@ -20,6 +110,7 @@ class LoadImageAndReturnPath:
     RETURN_TYPES = ("STRING",)  # 返回保存文件的路径
     RETURN_NAMES = ("File_path",)  # 返回名称
     FUNCTION = "load_image_and_return_path"  # 节点功能名称
+    USE_MMAP = False  # 是否使用内存映射计算文件哈希
 
     def load_image_and_return_path(self, image):
         """
@@ -35,10 +126,7 @@ class LoadImageAndReturnPath:
         检查文件是否发生变化。
         """
         image_path = folder_paths.get_annotated_filepath(image)
-        m = hashlib.sha256()
-        with open(image_path, "rb") as f:
-            m.update(f.read())
-        return m.digest().hex()
+        return cached_file_hash(image_path, cls.USE_MMAP)
 
     @classmethod
     def VALIDATE_INPUTS(cls, image):
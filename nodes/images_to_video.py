@@ -0,0 +1,141 @@
+import os
+import time
+import uuid
+import threading
+from typing import List, Tuple
+import folder_paths
+from ..base.ffmpeg_base import FFmpegBase
+from ..base.progress import FFmpegProgress, ComfyProgressBar
+from ..examples.presets import COMPRESS_PRESETS
+
+class ImagesToVideo(FFmpegBase):
+    """
+    图像转视频节点
+    功能：把ComfyUI的IMAGE批次编码为视频，原始帧由后台线程分块写入ffmpeg标准输入，
+    GPU到CPU的传输和uint8量化按固定大小的分块进行，不会生成第二份完整的批次
+    """
+    # 每个写入分块的最大字节数(uint8帧数据)
+    WRITE_CHUNK_BYTES = 64 * 1024 * 1024
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "images": ("IMAGE",),
+                "fps": ("FLOAT", {"default": 24.0, "min": 1.0, "max": 240.0, "step": 0.01}),
+                "preset": (list(COMPRESS_PRESETS.keys()), {"default": "balanced"}),
+                "use_gpu": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                "filename_prefix": ("STRING", {"default": "images"}),
+                "audio_path": ("STRING", {"default": ""}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("output_path",)
+    FUNCTION = "encode_images"
+    CATEGORY = "FFmpeg"
+
+    def create_output_path(self, filename_prefix: str) -> str:
+        """创建输出文件路径"""
+        base_output_dir = folder_paths.get_output_directory()
+        output_filename = f"{filename_prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}.mp4"
+        return os.path.join(base_output_dir, output_filename)
+
+    def build_command(self, width: int, height: int, fps: float, preset: str,
+                      use_gpu: bool, audio_path: str, output_path: str) -> List[str]:
+        """生成从标准输入读取rgb24原始帧的编码命令"""
+        preset_params = COMPRESS_PRESETS.get(preset, COMPRESS_PRESETS["balanced"])
+
+        command = [
+            "ffmpeg", "-y",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-r", f"{fps:g}",
+            "-i", "pipe:0",
+        ]
+        if audio_path:
+            command.extend(["-i", audio_path])
+
+        if width % 2 or height % 2:
+            # yuv420p要求宽高为偶数
+            command.extend(["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"])
+        command.extend(self.get_encoder_args(
+            use_gpu,
+            quality=preset_params["crf"],
+            speed=preset_params["preset"],
+            tune=preset_params["tune"]
+        ))
+        command.extend(["-pix_fmt", "yuv420p"])
+
+        if audio_path:
+            command.extend([
+                "-map", "0:v:0", "-map", "1:a:0",
+                "-c:a", "aac", "-b:a", preset_params["audio_bitrate"],
+                "-shortest",
+            ])
+        command.extend(["-movflags", "+faststart", output_path])
+        return command
+
+    def _write_frames(self, images, stdin, state: dict) -> None:
+        """
+        写入线程：逐块量化为uint8并转到CPU后写入管道
+        在GPU上先量化再传输，传输量只有float32的四分之一
+        """
+        import torch
+
+        try:
+            total, height, width = images.shape[0], images.shape[1], images.shape[2]
+            chunk_frames = max(1, self.WRITE_CHUNK_BYTES // (height * width * 3))
+            for start in range(0, total, chunk_frames):
+                chunk = images[start:start + chunk_frames, :, :, :3]
+                chunk = chunk.mul(255.0).add_(0.5).clamp_(0, 255).to(torch.uint8)
+                data = chunk.cpu().contiguous().numpy()
+                stdin.write(memoryview(data).cast("B"))
+                state["written"] = start + chunk.shape[0]
+        except Exception as e:
+            # ffmpeg提前退出时写入会失败，详细原因以标准错误为准
+            state["error"] = str(e)
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    def encode_images(self, images, fps: float, preset: str, use_gpu: bool,
+                      filename_prefix: str = "images",
+                      audio_path: str = "") -> Tuple[str]:
+        """执行图像序列编码"""
+        try:
+            if images is None or len(images.shape) != 4 or images.shape[0] == 0:
+                raise ValueError("没有输入图像")
+            if audio_path and not os.path.exists(audio_path):
+                raise FileNotFoundError("音频文件不存在")
+
+            total, height, width = images.shape[0], images.shape[1], images.shape[2]
+            output_path = self.create_output_path(filename_prefix)
+            command = self.build_command(width, height, fps, preset, use_gpu, audio_path, output_path)
+
+            state = {"written": 0, "error": None}
+            progress_bar = ComfyProgressBar()
+            with self.open_ffmpeg_pipe(command, stdin=True) as (process, stderr_tail):
+                writer = threading.Thread(
+                    target=self._write_frames, args=(images, process.stdin, state), daemon=True
+                )
+                writer.start()
+                while writer.is_alive():
+                    writer.join(timeout=0.5)
+                    progress_bar.update(FFmpegProgress(out_time=state["written"], duration=total))
+
+            if process.returncode != 0:
+                raise RuntimeError(f"编码视频失败: {''.join(stderr_tail)}")
+            if state["error"]:
+                raise RuntimeError(f"写入帧数据失败: {state['error']}")
+
+            return (output_path,)
+
+        except Exception as e:
+            print(f"图像转视频时出错: {str(e)}")
+            return (str(e),)
@@ -300,22 +300,19 @@ class VideoAudioMix(FFmpegBase):
         """
         获取音频文件的平均分贝（dB）水平。
         """
-        import subprocess
-
         # 使用 FFmpeg 提取音频流并计算分贝
         command = [
             "ffmpeg", 
             "-i", audio_file,
             "-af", "volumedetect",
             "-f", "null", 
-            "/dev/null"
+            "-"
         ]
         
-        # 运行命令并捕获输出
-        result = subprocess.run(command, stderr=subprocess.PIPE, text=True)
+        # 运行命令并捕获输出(经过调度器并记录遥测)
+        _, _, output = self.run_ffmpeg(command, progress=False, cache=False)
         
         # 从输出中提取平均分贝
-        output = result.stderr
         for line in output.splitlines():
             if "mean_volume" in line:
                 # 提取平均分贝值
@@ -8,6 +8,7 @@ class VideoCompress(FFmpegBase):
     视频压缩节点
     功能：压缩视频文件大小，支持多种压缩策略
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -65,7 +66,7 @@ class VideoCompress(FFmpegBase):
         return presets.get(preset, presets["default"])
 
     def get_compression_params(self, level: str) -> dict:
-        """获取压缩参数"""
+        """获取压缩参数(crf为x264刻度，h265编码时自动换算)"""
         params = {
             "light": {
                 "crf": 23,
@@ -73,17 +74,17 @@ class VideoCompress(FFmpegBase):
                 "codec": "h264"
             },
             "medium": {
-                "crf": 28,
-                "preset": "faster",
+                "crf": 23,
+                "preset": "auto",   # 默认压缩等级使用全局速度设置
                 "codec": "h265"
             },
             "heavy": {
-                "crf": 32,
+                "crf": 27,
                 "preset": "veryfast",
                 "codec": "h265"
             },
             "extreme": {
-                "crf": 35,
+                "crf": 30,
                 "preset": "ultrafast",
                 "codec": "h265"
             }
@@ -136,23 +137,6 @@ class VideoCompress(FFmpegBase):
             # 添加输入文件
             command.extend(["-i", input_video])
 
-            # 添加视频编码参数
-            if use_gpu:
-                codec = "h264_nvenc" if comp_params["codec"] == "h264" else "hevc_nvenc"
-                command.extend([
-                    "-c:v", codec,
-                    "-preset", "p7",  # 使用 NVENC 特定的预设
-                    "-rc:v", "vbr",   # 使用可变比特率
-                    "-cq:v", str(comp_params["crf"]),
-                ])
-            else:
-                codec = "libx264" if comp_params["codec"] == "h264" else "libx265"
-                command.extend([
-                    "-c:v", codec,
-                    "-preset", comp_params["preset"],
-                    "-crf", str(comp_params["crf"]),
-                ])
-
             # 添加尺寸限制
             if max_width > 0 and max_height > 0:
                 command.extend([
@@ -160,16 +144,28 @@ class VideoCompress(FFmpegBase):
                 ])
 
             # 如果指定了目标大小
+            video_bitrate = 0
             if target_size_mb > 0:
-                duration = float(os.popen(f'ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{input_video}"').read().strip())
+                duration = self.get_video_duration(input_video)
+                if not duration:
+                    raise RuntimeError("无法获取视频时长")
                 total_bitrate = int((target_size_mb * 8192) / duration)
-                video_bitrate = total_bitrate - (audio_bitrate * 1024)
-                if video_bitrate > 0:
-                    command.extend([
-                        "-b:v", f"{video_bitrate}k",
-                        "-maxrate", f"{int(video_bitrate * 1.5)}k",
-                        "-bufsize", f"{video_bitrate * 2}k"
-                    ])
+                video_bitrate = total_bitrate - audio_bitrate
+
+            # 添加视频编码参数
+            # 保持质量时使用恒定质量并以目标码率为上限，否则按目标码率编码
+            command.extend(self.get_encoder_args(
+                use_gpu,
+                quality=comp_params["crf"],
+                codec=comp_params["codec"],
+                speed=comp_params["preset"],
+                bitrate=video_bitrate if video_bitrate > 0 and not maintain_quality else None
+            ))
+            if video_bitrate > 0:
+                command.extend([
+                    "-maxrate", f"{int(video_bitrate * (1.0 if maintain_quality else 1.5))}k",
+                    "-bufsize", f"{video_bitrate * 2}k"
+                ])
 
             # 添加音频参数
             command.extend([
@@ -177,10 +173,6 @@ class VideoCompress(FFmpegBase):
                 "-b:a", f"{audio_bitrate}k"
             ])
 
-            # 如果需要保持质量
-            if maintain_quality:
-                command.extend(["-qmin", "0", "-qmax", "69"])
-
             # 添加输出路径
             command.extend([output_path])
 
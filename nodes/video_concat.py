@@ -22,6 +22,9 @@ class VideoConcat(FFmpegBase):
                 "transition": (["none", "fade", "dissolve"], {"default": "none"}),
                 "transition_duration": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 5.0}),
             },
+            "optional": {
+                "auto_stream_copy": ("BOOLEAN", {"default": True}),
+            }
         }
 
     RETURN_TYPES = ("STRING",)
@@ -75,7 +78,8 @@ class VideoConcat(FFmpegBase):
     def concat_videos(self, input_videos: str, output_format: str,
                      quality: int, use_gpu: bool, preset: str = "default",
                      transition: str = "none",
-                     transition_duration: float = 1.0) -> Tuple[str]:
+                     transition_duration: float = 1.0,
+                     auto_stream_copy: bool = True) -> Tuple[str]:
         """执行视频拼接"""
         try:
             # 解析输入视频列表
@@ -90,6 +94,7 @@ class VideoConcat(FFmpegBase):
 
             # 应用预设参数
             preset_params = self.get_preset_params(preset)
+            user_quality = quality
             if preset != "default":
                 quality = preset_params["quality"]
                 output_format = preset_params["output_format"]
@@ -98,6 +103,17 @@ class VideoConcat(FFmpegBase):
             # 创建输出文件路径
             output_path = self.create_output_path(output_format)
 
+            # 没有转场时优先流复制，只转换格式不一致的片段
+            if auto_stream_copy and transition == "none":
+                # 流复制预设的质量为-1，格式不一致的片段按节点的质量设置(默认23)转换
+                conform_quality = quality if quality >= 0 else user_quality
+                result = self.concat_stream_copy(video_list, output_path, conform_quality)
+                if result is not None:
+                    success, message = result
+                    if not success:
+                        raise RuntimeError(f"FFmpeg 执行失败: {message}")
+                    return (output_path,)
+
             # 获取 GPU 参数
             gpu_params = self.get_gpu_params(use_gpu)
 
@@ -132,10 +148,8 @@ class VideoConcat(FFmpegBase):
 
             # 添加编码参数
             if quality >= 0:
+                command.extend(self.get_encoder_args(use_gpu, quality=quality))
                 command.extend([
-                    "-c:v", gpu_params["h264_encoder"],
-                    "-crf", str(quality),
-                    "-preset", "medium",
                     "-c:a", "aac",
                     "-b:a", "128k"
                 ])
@@ -8,6 +8,7 @@ class VideoConvert(FFmpegBase):
     视频格式转换节点
     功能：将视频转换为不同的格式，支持多种编码器和容器格式
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -62,23 +63,6 @@ class VideoConvert(FFmpegBase):
         }
         return presets.get(preset, presets["default"])
 
-    def get_codec_params(self, video_codec: str, use_gpu: bool) -> dict:
-        """获取编码器参数"""
-        if not use_gpu:
-            return {
-                "h264": {"codec": "libx264", "options": []},
-                "h265": {"codec": "libx265", "options": []},
-                "vp9": {"codec": "libvpx-vp9", "options": []},
-                "av1": {"codec": "libaom-av1", "options": []}
-            }.get(video_codec, {"codec": "libx264", "options": []})
-        else:
-            return {
-                "h264": {"codec": "h264_nvenc", "options": []},
-                "h265": {"codec": "hevc_nvenc", "options": []},
-                "vp9": {"codec": "libvpx-vp9", "options": []},  # VP9 暂不支持 GPU
-                "av1": {"codec": "libaom-av1", "options": []}   # AV1 暂不支持 GPU
-            }.get(video_codec, {"codec": "h264_nvenc", "options": []})
-
     def create_output_path(self, input_video: str, output_format: str) -> str:
         """创建输出文件路径"""
         video_hash = self.get_video_hash(input_video)
@@ -108,9 +92,6 @@ class VideoConvert(FFmpegBase):
             # 获取 GPU 参数
             gpu_params = self.get_gpu_params(use_gpu)
 
-            # 获取编码器参数
-            codec_params = self.get_codec_params(video_codec, use_gpu)
-
             # 构建命令
             command = [
                 "ffmpeg",
@@ -127,11 +108,8 @@ class VideoConvert(FFmpegBase):
                 ])
             else:
                 # 添加编码器参数
+                command.extend(self.get_encoder_args(use_gpu, quality=quality, codec=video_codec))
                 command.extend([
-                    "-c:v", codec_params["codec"],
-                    *codec_params["options"],
-                    "-crf", str(quality),
-                    "-preset", "medium",
                     "-c:a", "aac",
                     "-b:a", "128k"
                 ])
@@ -8,6 +8,7 @@ class VideoCrop(FFmpegBase):
     视频裁剪节点
     功能：裁剪视频画面的特定区域
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -155,19 +156,7 @@ class VideoCrop(FFmpegBase):
             command.extend(["-vf", ",".join(filter_complex)])
 
             # 添加编码参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23"
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "medium",
-                    "-crf", "23"
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -8,6 +8,7 @@ class VideoDenoise(FFmpegBase):
     视频降噪节点
     功能：使用多种降噪算法减少视频噪点
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -24,6 +25,7 @@ class VideoDenoise(FFmpegBase):
             "optional": {
                 "temporal_size": ("INT", {"default": 3, "min": 1, "max": 7}),
                 "spatial_size": ("INT", {"default": 5, "min": 1, "max": 9}),
+                "chunked": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -85,7 +87,8 @@ class VideoDenoise(FFmpegBase):
                      strength: float, use_gpu: bool,
                      preset: str = "default",
                      temporal_size: int = 3,
-                     spatial_size: int = 5) -> Tuple[str]:
+                     spatial_size: int = 5,
+                     chunked: bool = False) -> Tuple[str]:
         """执行视频降噪"""
         try:
             # 检查输入视频是否存在
@@ -125,19 +128,7 @@ class VideoDenoise(FFmpegBase):
             command.extend(["-vf", denoise_filter])
 
             # 添加编码参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23"
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "medium",
-                    "-crf", "23"
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -146,7 +137,12 @@ class VideoDenoise(FFmpegBase):
             command.extend([output_path])
 
             # 执行命令
-            success, message = self.execute_ffmpeg(command)
+            if chunked:
+                # hqdn3d的时域降噪依赖前面的帧，分段时需要预热
+                overlap = 1.0 if denoise_type == "hqdn3d" else 0.0
+                success, message = self.execute_ffmpeg_chunked(command, overlap=overlap)
+            else:
+                success, message = self.execute_ffmpeg(command)
 
             if not success:
                 raise RuntimeError(f"FFmpeg 执行失败: {message}")
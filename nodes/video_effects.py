@@ -8,6 +8,7 @@ class VideoEffects(FFmpegBase):
     视频特效节点
     功能：添加各种视频特效，如模糊、锐化、颜色调整等
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -27,6 +28,7 @@ class VideoEffects(FFmpegBase):
                 "contrast": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0}),
                 "saturation": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0}),
                 "hue": ("FLOAT", {"default": 0.0, "min": -180.0, "max": 180.0}),
+                "chunked": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -102,7 +104,8 @@ class VideoEffects(FFmpegBase):
                     brightness: float = 0.0,
                     contrast: float = 1.0,
                     saturation: float = 1.0,
-                    hue: float = 0.0) -> Tuple[str]:
+                    hue: float = 0.0,
+                    chunked: bool = False) -> Tuple[str]:
         """执行视频特效应用"""
         try:
             # 检查输入视频是否存在
@@ -143,19 +146,7 @@ class VideoEffects(FFmpegBase):
             command.extend(["-vf", effect_filter])
 
             # 添加编码参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23"
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "medium",
-                    "-crf", "23"
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -164,7 +155,10 @@ class VideoEffects(FFmpegBase):
             command.extend([output_path])
 
             # 执行命令
-            success, message = self.execute_ffmpeg(command)
+            if chunked and effect_type != "fade":
+                success, message = self.execute_ffmpeg_chunked(command)
+            else:
+                success, message = self.execute_ffmpeg(command)
 
             if not success:
                 raise RuntimeError(f"FFmpeg 执行失败: {message}")
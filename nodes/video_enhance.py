@@ -8,6 +8,7 @@ class VideoEnhance(FFmpegBase):
     视频增强节点
     功能：提升视频质量，包括超分辨率、降噪、锐化、色彩增强等
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -29,6 +30,8 @@ class VideoEnhance(FFmpegBase):
                 "color_boost": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 2.0}),
                 "target_fps": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 120.0}),
                 "hdr_tone": ("FLOAT", {"default": 1.0, "min": 0.5, "max": 2.0}),
+                "chunked": ("BOOLEAN", {"default": False}),
+                "encode_speed": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
             }
         }
 
@@ -144,7 +147,9 @@ class VideoEnhance(FFmpegBase):
                      denoising: float = 0.5,
                      color_boost: float = 1.0,
                      target_fps: float = 0.0,
-                     hdr_tone: float = 1.0) -> Tuple[str]:
+                     hdr_tone: float = 1.0,
+                     chunked: bool = False,
+                     encode_speed: str = "auto") -> Tuple[str]:
         """增强视频"""
         try:
             # 检查输入视频是否存在
@@ -190,19 +195,7 @@ class VideoEnhance(FFmpegBase):
             command.extend(["-vf", enhance_filters])
 
             # 添加编码参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "18"  # 使用较高质量
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "slow",  # 使用较慢的编码以提高质量
-                    "-crf", "18"
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=18, speed=encode_speed))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -211,7 +204,13 @@ class VideoEnhance(FFmpegBase):
             command.extend([output_path])
 
             # 执行命令
-            success, message = self.execute_ffmpeg(command)
+            # 稳定滤镜读写工作目录中同一个 transforms.trf，不能分段并行
+            if chunked and enhance_type not in ["stabilize", "all"]:
+                # 降噪、插帧和HDR的亮度归一化(smoothing)都依赖相邻帧，分段时需要预热
+                overlap = 2.0 if enhance_type in ["denoise", "framerate", "hdr"] else 0.0
+                success, message = self.execute_ffmpeg_chunked(command, overlap=overlap)
+            else:
+                success, message = self.execute_ffmpeg(command)
 
             if not success:
                 raise RuntimeError(f"FFmpeg 执行失败: {message}")
@@ -8,6 +8,7 @@ class VideoFilter(FFmpegBase):
     视频滤镜节点
     功能：应用各种视频滤镜效果，如模糊、锐化、色彩调整等
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -31,6 +32,7 @@ class VideoFilter(FFmpegBase):
                 "saturation": ("FLOAT", {"default": 1.0, "min": 0.0, "max": 3.0}),
                 "gamma": ("FLOAT", {"default": 1.0, "min": 0.1, "max": 10.0}),
                 "lut_file": ("STRING", {"default": ""}),
+                "chunked": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -113,7 +115,8 @@ class VideoFilter(FFmpegBase):
                     contrast: float = 1.0,
                     saturation: float = 1.0,
                     gamma: float = 1.0,
-                    lut_file: str = "") -> Tuple[str]:
+                    lut_file: str = "",
+                    chunked: bool = False) -> Tuple[str]:
         """应用视频滤镜"""
         try:
             # 检查输入视频是否存在
@@ -158,19 +161,7 @@ class VideoFilter(FFmpegBase):
             command.extend(["-vf", filter_string])
 
             # 添加编码参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23"
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "medium",
-                    "-crf", "23"
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -179,7 +170,10 @@ class VideoFilter(FFmpegBase):
             command.extend([output_path])
 
             # 执行命令
-            success, message = self.execute_ffmpeg(command)
+            if chunked:
+                success, message = self.execute_ffmpeg_chunked(command)
+            else:
+                success, message = self.execute_ffmpeg(command)
 
             if not success:
                 raise RuntimeError(f"FFmpeg 执行失败: {message}")
@@ -8,6 +8,7 @@ class VideoFormat(FFmpegBase):
     视频格式转换节点
     功能：转换视频格式，支持各种常见视频格式之间的转换
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -153,15 +154,9 @@ class VideoFormat(FFmpegBase):
             command.extend(["-i", input_video])
 
             # 添加视频编码参数
-            if use_gpu and codec in ["h264", "hevc"]:
-                command.extend([
-                    "-c:v", gpu_params[f"{codec}_encoder"],
-                    "-preset", "p4",  # 使用较快的预设
-                    "-tune", "hq",    # 高质量调优
-                    "-rc:v", "vbr",   # 可变比特率
-                    "-cq", str(quality)
-                ])
-                
+            if codec in ["h264", "hevc", "vp9", "av1"]:
+                command.extend(self.get_encoder_args(use_gpu, quality=quality, codec=codec))
+
                 if bitrate:
                     command.extend(["-b:v", bitrate])
             else:
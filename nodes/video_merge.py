@@ -24,6 +24,7 @@ class VideoMerge(FFmpegBase):
                 "transition_time": ("FLOAT", {"default": 0.0, "min": 0.0}),
                 "grid_columns": ("INT", {"default": 2, "min": 1}),
                 "pad_color": ("STRING", {"default": "black"}),
+                "auto_stream_copy": ("BOOLEAN", {"default": True}),
             }
         }
 
@@ -48,7 +49,7 @@ class VideoMerge(FFmpegBase):
 
     def create_output_path(self, input_videos: List[str]) -> str:
         """创建输出文件路径"""
-        video_hash = self.get_video_hash(input_videos[0])
+        video_hash = self.get_video_hash(*input_videos)
         base_output_dir = folder_paths.get_output_directory()
         output_filename = f"merged_{video_hash}.mp4"
         return os.path.join(base_output_dir, output_filename)
@@ -69,7 +70,8 @@ class VideoMerge(FFmpegBase):
                     use_gpu: bool, preset: str = "default",
                     transition_time: float = 0.0,
                     grid_columns: int = 2,
-                    pad_color: str = "black") -> Tuple[str]:
+                    pad_color: str = "black",
+                    auto_stream_copy: bool = True) -> Tuple[str]:
         """合并视频"""
         try:
             # 解析输入视频列表
@@ -80,8 +82,14 @@ class VideoMerge(FFmpegBase):
             # 创建输出路径
             output_path = self.create_unique_output_path(video_list[0])
             
-            # 获取 GPU 参数
-            gpu_params = self.get_gpu_params(use_gpu)
+            # 拼接模式优先流复制，只转换格式不一致的片段
+            if merge_mode == "concat" and auto_stream_copy:
+                result = self.concat_stream_copy(video_list, output_path)
+                if result is not None:
+                    success, message = result
+                    if not success:
+                        raise RuntimeError(f"FFmpeg 执行失败: {message}")
+                    return (output_path,)
 
             # 根据合并模式构建滤镜
             filter_complex = []
@@ -98,9 +106,7 @@ class VideoMerge(FFmpegBase):
                     "-f", "concat",
                     "-safe", "0",
                     "-i", concat_file,
-                    "-c:v", gpu_params["h264_encoder"] if use_gpu else "libx264",
-                    "-crf", "23",
-                    "-preset", "medium",
+                    *self.get_encoder_args(use_gpu, quality=23),
                     "-c:a", "aac",
                     output_path
                 ]
@@ -141,9 +147,7 @@ class VideoMerge(FFmpegBase):
                     "-filter_complex", "".join(filter_complex),
                     "-map", "[v]",
                     "-map", "0:a",
-                    "-c:v", gpu_params["h264_encoder"] if use_gpu else "libx264",
-                    "-crf", "23",
-                    "-preset", "medium",
+                    *self.get_encoder_args(use_gpu, quality=23),
                     "-c:a", "aac",
                     output_path
                 ]
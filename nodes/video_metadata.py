@@ -129,12 +129,8 @@ class VideoMetadata(FFmpegBase):
                 command.extend(["-map_metadata", "-1"])
 
             # 添加编码参数
-            command.extend([
-                "-c:v", gpu_params["h264_encoder"],
-                "-crf", "23",  # 使用默认质量
-                "-preset", "medium",
-                "-c:a", "copy"  # 复制音频流
-            ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
+            command.extend(["-c:a", "copy"])  # 复制音频流
 
             # 添加输出路径
             command.extend([output_path])
@@ -8,6 +8,7 @@ class VideoPiP(FFmpegBase):
     画中画节点
     功能：将一个视频嵌入到另一个视频中，支持位置和大小调整
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -182,20 +183,7 @@ class VideoPiP(FFmpegBase):
             command.extend(["-filter_complex", filter_complex])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p4",
-                    "-tune", "hq",
-                    "-rc:v", "vbr",
-                    "-cq", "23"
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "medium",
-                    "-crf", "23"
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
 
             # 添加音频参数
             command.extend(["-c:a", "copy"])
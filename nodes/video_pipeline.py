@@ -0,0 +1,386 @@
+import os
+from typing import Tuple
+import folder_paths
+from ..base.ffmpeg_base import FFmpegBase
+from ..base.pipeline import VideoPipeline, PipelineStage
+from .video_filter import VideoFilter
+from .video_effects import VideoEffects
+from .video_enhance import VideoEnhance
+from .video_denoise import VideoDenoise
+from .video_watermark import VideoWatermark
+
+# 源节点中只影响编码的可选控件(分段并行、编码速度、编码预设)。管线节点只追加滤镜、不编码，
+# 复制参数时去掉这些控件，否则ComfyUI会把它们作为未声明的关键字参数传入
+ENCODER_ONLY_INPUTS = ("chunked", "encode_speed", "preset")
+
+
+def _stage_inputs(node_class) -> dict:
+    """由对应视频节点的参数生成管线节点的参数：输入视频换成管线，去掉GPU和只影响编码的控件"""
+    inputs = node_class.INPUT_TYPES()
+    required = {"pipeline": ("VIDEO_PIPELINE",)}
+    required.update({k: v for k, v in inputs["required"].items()
+                     if k not in ("input_video", "use_gpu")})
+    optional = {k: v for k, v in inputs.get("optional", {}).items()
+                if k not in ENCODER_ONLY_INPUTS}
+    return {"required": required, "optional": optional}
+
+
+class VideoPipelineLoad:
+    """
+    视频管线起点节点
+    功能：以输入视频创建处理管线，后续管线节点只记录滤镜，由渲染节点统一编码
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "input_video": ("STRING", {"default": ""}),
+            }
+        }
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "load"
+    CATEGORY = "FFmpeg/管线"
+
+    def load(self, input_video: str) -> Tuple[VideoPipeline]:
+        if not os.path.exists(input_video):
+            raise FileNotFoundError("输入视频文件不存在")
+        return (VideoPipeline(os.path.abspath(input_video)),)
+
+
+class VideoPipelineFilter:
+    """
+    管线滤镜节点
+    功能：与视频滤镜节点参数相同，只向管线追加滤镜
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return _stage_inputs(VideoFilter)
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "apply_filter"
+    CATEGORY = "FFmpeg/管线"
+
+    def apply_filter(self, pipeline: VideoPipeline, filter_type: str,
+                    intensity: float, preset: str = "default",
+                    red: float = 1.0, green: float = 1.0, blue: float = 1.0,
+                    brightness: float = 0.0, contrast: float = 1.0,
+                    saturation: float = 1.0, gamma: float = 1.0,
+                    lut_file: str = "") -> Tuple[VideoPipeline]:
+        node = VideoFilter()
+        if preset != "custom":
+            preset_params = node.get_preset_params(preset)
+            filter_type = preset_params["filter_type"]
+            intensity = preset_params["intensity"]
+            red = preset_params["red"]
+            green = preset_params["green"]
+            blue = preset_params["blue"]
+
+        filter_string = node.get_filter_string(
+            filter_type, intensity, red, green, blue,
+            brightness, contrast, saturation, gamma, lut_file
+        )
+        return (pipeline.with_filter(filter_string),)
+
+
+class VideoPipelineEffects:
+    """
+    管线特效节点
+    功能：与视频特效节点参数相同，只向管线追加滤镜
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return _stage_inputs(VideoEffects)
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "apply_effect"
+    CATEGORY = "FFmpeg/管线"
+
+    def apply_effect(self, pipeline: VideoPipeline, effect_type: str,
+                    intensity: float, preset: str = "default",
+                    brightness: float = 0.0, contrast: float = 1.0,
+                    saturation: float = 1.0, hue: float = 0.0) -> Tuple[VideoPipeline]:
+        node = VideoEffects()
+        if preset != "custom":
+            preset_params = node.get_preset_params(preset)
+            effect_type = preset_params["effect_type"]
+            intensity = preset_params["intensity"]
+            brightness = preset_params.get("brightness", brightness)
+            contrast = preset_params.get("contrast", contrast)
+            saturation = preset_params.get("saturation", saturation)
+
+        effect_filter = node.get_effect_filter(
+            effect_type, intensity, brightness, contrast, saturation, hue
+        )
+        return (pipeline.with_filter(effect_filter),)
+
+
+class VideoPipelineEnhance:
+    """
+    管线增强节点
+    功能：与视频增强节点参数相同，只向管线追加滤镜
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return _stage_inputs(VideoEnhance)
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "enhance_video"
+    CATEGORY = "FFmpeg/管线"
+
+    def enhance_video(self, pipeline: VideoPipeline, enhance_type: str,
+                     intensity: float, preset: str = "default",
+                     quality_level: int = 2, sharpness: float = 1.0,
+                     denoising: float = 0.5, color_boost: float = 1.0,
+                     target_fps: float = 0.0, hdr_tone: float = 1.0) -> Tuple[VideoPipeline]:
+        node = VideoEnhance()
+        if preset != "custom":
+            preset_params = node.get_preset_params(preset)
+            enhance_type = preset_params["enhance_type"]
+            intensity = preset_params["intensity"]
+            quality_level = preset_params.get("quality_level", quality_level)
+            sharpness = preset_params.get("sharpness", sharpness)
+            denoising = preset_params.get("denoising", denoising)
+            color_boost = preset_params.get("color_boost", color_boost)
+            target_fps = preset_params.get("target_fps", target_fps)
+            hdr_tone = preset_params.get("hdr_tone", hdr_tone)
+
+        enhance_filters = node.get_enhance_filters(
+            enhance_type, intensity, quality_level,
+            sharpness, denoising, color_boost,
+            target_fps, hdr_tone
+        )
+        return (pipeline.with_filter(enhance_filters),)
+
+
+class VideoPipelineDenoise:
+    """
+    管线降噪节点
+    功能：与视频降噪节点参数相同，只向管线追加滤镜
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return _stage_inputs(VideoDenoise)
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "denoise_video"
+    CATEGORY = "FFmpeg/管线"
+
+    def denoise_video(self, pipeline: VideoPipeline, denoise_type: str,
+                     strength: float, preset: str = "default",
+                     temporal_size: int = 3, spatial_size: int = 5) -> Tuple[VideoPipeline]:
+        node = VideoDenoise()
+        if preset != "custom":
+            preset_params = node.get_preset_params(preset)
+            denoise_type = preset_params["denoise_type"]
+            strength = preset_params["strength"]
+            temporal_size = preset_params["temporal_size"]
+            spatial_size = preset_params["spatial_size"]
+
+        denoise_filter = node.get_denoise_filter(
+            denoise_type, strength, temporal_size, spatial_size
+        )
+        return (pipeline.with_filter(denoise_filter),)
+
+
+class VideoPipelineCrop:
+    """
+    管线裁剪节点
+    功能：按像素区域裁剪，宽高为0时表示裁到画面边缘
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "pipeline": ("VIDEO_PIPELINE",),
+                "x": ("INT", {"default": 0, "min": 0}),
+                "y": ("INT", {"default": 0, "min": 0}),
+                "width": ("INT", {"default": 0, "min": 0}),
+                "height": ("INT", {"default": 0, "min": 0}),
+            }
+        }
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "crop"
+    CATEGORY = "FFmpeg/管线"
+
+    def crop(self, pipeline: VideoPipeline, x: int, y: int,
+             width: int, height: int) -> Tuple[VideoPipeline]:
+        crop_width = width if width > 0 else f"iw-{x}"
+        crop_height = height if height > 0 else f"ih-{y}"
+        return (pipeline.with_filter(f"crop={crop_width}:{crop_height}:{x}:{y}"),)
+
+
+class VideoPipelineScale:
+    """
+    管线缩放节点
+    功能：缩放到目标尺寸，可保持宽高比并填充边缘
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "pipeline": ("VIDEO_PIPELINE",),
+                "width": ("INT", {"default": 1280, "min": 2, "max": 7680, "step": 2}),
+                "height": ("INT", {"default": 720, "min": 2, "max": 4320, "step": 2}),
+                "keep_aspect": ("BOOLEAN", {"default": True}),
+                "pad": ("BOOLEAN", {"default": True}),
+                "scaling_method": (["bicubic", "bilinear", "lanczos", "neighbor"],
+                                  {"default": "bicubic"}),
+            },
+            "optional": {
+                "pad_color": ("STRING", {"default": "black"}),
+            }
+        }
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "scale"
+    CATEGORY = "FFmpeg/管线"
+
+    def scale(self, pipeline: VideoPipeline, width: int, height: int,
+              keep_aspect: bool, pad: bool, scaling_method: str,
+              pad_color: str = "black") -> Tuple[VideoPipeline]:
+        filters = [f"scale={width}:{height}"]
+        if keep_aspect:
+            filters[0] += ":force_original_aspect_ratio=decrease"
+            if pad:
+                filters.append(f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:{pad_color}")
+        filters[0] += f":flags={scaling_method}"
+        filters.append("setsar=1")
+        return (pipeline.with_filter(",".join(filters)),)
+
+
+class VideoPipelineWatermark:
+    """
+    管线水印节点
+    功能：与视频水印节点参数相同，图片水印作为管线的附加输入叠加
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return _stage_inputs(VideoWatermark)
+
+    RETURN_TYPES = ("VIDEO_PIPELINE",)
+    RETURN_NAMES = ("pipeline",)
+    FUNCTION = "add_watermark"
+    CATEGORY = "FFmpeg/管线"
+
+    def add_watermark(self, pipeline: VideoPipeline, watermark_type: str,
+                     position: str, image_path: str = "", text_content: str = "",
+                     font_file: str = "", font_size: int = 24,
+                     font_color: str = "white", opacity: float = 0.8,
+                     margin: int = 10) -> Tuple[VideoPipeline]:
+        x_pos, y_pos = VideoWatermark().get_position_expression(position, margin)
+
+        if watermark_type == "image":
+            if not image_path or not os.path.exists(image_path):
+                raise FileNotFoundError("水印图片文件不存在")
+            stage = PipelineStage(
+                f"{{input0}}format=rgba,colorchannelmixer=aa={opacity}[watermark];"
+                f"{{main}}[watermark]overlay=x={x_pos}:y={y_pos}",
+                (os.path.abspath(image_path),)
+            )
+            return (pipeline.with_stage(stage),)
+
+        if not text_content:
+            raise ValueError("水印文字内容不能为空")
+        font_settings = f"fontsize={font_size}:fontcolor={font_color}@{opacity}"
+        if font_file and os.path.exists(font_file):
+            font_settings += f":fontfile='{font_file}'"
+        # drawtext中没有overlay_w/h，使用文字尺寸变量
+        x_pos = x_pos.replace("overlay_w", "tw").replace("main_w", "w")
+        y_pos = y_pos.replace("overlay_h", "th").replace("main_h", "h")
+        return (pipeline.with_filter(
+            f"drawtext=text='{text_content}':{font_settings}:x={x_pos}:y={y_pos}"
+        ),)
+
+
+class VideoPipelineRender(FFmpegBase):
+    """
+    管线渲染节点
+    功能：把整条管线编译成一个 -filter_complex，只解码、编码一次
+    """
+    CACHE_RESULTS = True
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "pipeline": ("VIDEO_PIPELINE",),
+                "use_gpu": ("BOOLEAN", {"default": True}),
+                "quality": ("INT", {"default": 23, "min": 0, "max": 51}),
+            },
+            "optional": {
+                "preset": (["auto", "ultrafast", "superfast", "veryfast", "faster", "fast",
+                           "medium", "slow", "slower", "veryslow"],
+                          {"default": "auto"}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("output_path",)
+    FUNCTION = "render"
+    CATEGORY = "FFmpeg/管线"
+
+    def create_output_path(self, pipeline: VideoPipeline) -> str:
+        """创建输出文件路径，文件名包含管线内容哈希，不同滤镜链不会互相覆盖"""
+        video_hash = self.get_video_hash(pipeline.source)
+        base_output_dir = folder_paths.get_output_directory()
+        output_filename = f"pipeline_{video_hash}_{pipeline.digest()}.mp4"
+        return os.path.join(base_output_dir, output_filename)
+
+    def render(self, pipeline: VideoPipeline, use_gpu: bool, quality: int,
+               preset: str = "auto") -> Tuple[str]:
+        """渲染管线"""
+        try:
+            for path in pipeline.inputs:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"输入文件不存在: {path}")
+
+            output_path = self.create_output_path(pipeline)
+            filter_complex, video_label = pipeline.compile()
+
+            command = ["ffmpeg", "-y"]
+
+            command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+
+            for path in pipeline.inputs:
+                command.extend(["-i", path])
+
+            command.extend([
+                "-filter_complex", filter_complex,
+                "-map", video_label,
+                "-map", "0:a?",
+            ])
+
+            command.extend(self.get_encoder_args(use_gpu, quality=quality, speed=preset))
+
+            command.extend([
+                "-pix_fmt", "yuv420p",
+                "-c:a", "copy",
+                output_path
+            ])
+
+            success, message = self.execute_ffmpeg(command)
+            if not success:
+                raise RuntimeError(f"FFmpeg执行失败: {message}")
+
+            return (output_path,)
+
+        except Exception as e:
+            print(f"管线渲染失败: {str(e)}")
+            return (str(e),)
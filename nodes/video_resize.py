@@ -8,6 +8,7 @@ class VideoResize(FFmpegBase):
     视频尺寸调整节点
     功能：调整视频分辨率和尺寸，支持多种缩放算法
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -26,9 +27,10 @@ class VideoResize(FFmpegBase):
                 "使用GPU": ("BOOLEAN", {"default": True}),
             },
             "optional": {
-                "编码速度": (["中等", "快速", "慢速"], {"default": "中等"}),
+                "编码速度": (["自动", "中等", "快速", "慢速"], {"default": "自动"}),
                 "填充颜色": ("STRING", {"default": "black"}),
                 "尺寸对齐": ("INT", {"default": 2, "min": 1}),
+                "分段并行": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -63,9 +65,10 @@ class VideoResize(FFmpegBase):
 
     def resize_video(self, 输入视频: str, 分辨率方案: str, 宽度: int, 高度: int,
                     保持宽高比: bool, 缩放算法: str,
-                    使用GPU: bool, 编码速度: str = "中等",
+                    使用GPU: bool, 编码速度: str = "自动",
                     填充颜色: str = "black",
-                    尺寸对齐: int = 2) -> Tuple[str]:
+                    尺寸对齐: int = 2,
+                    分段并行: bool = False) -> Tuple[str]:
         """执行视频尺寸调整"""
         try:
             # 获取实际分辨率
@@ -79,6 +82,7 @@ class VideoResize(FFmpegBase):
                 "最近邻": "neighbor"
             }
             preset_map = {
+                "自动": "auto",
                 "快速": "fast",
                 "中等": "medium",
                 "慢速": "slow"
@@ -126,24 +130,8 @@ class VideoResize(FFmpegBase):
             command.extend(["-vf", ",".join(filter_complex)])
 
             # 添加编码器参数
-            if 使用GPU:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-tune", "hq",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23",
-                    "-profile:v", "high",
-                    "-pix_fmt", "yuv420p"
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset_map[编码速度],
-                    "-crf", "23",
-                    "-profile:v", "high",
-                    "-pix_fmt", "yuv420p"
-                ])
+            command.extend(self.get_encoder_args(使用GPU, quality=23, speed=preset_map[编码速度]))
+            command.extend(["-profile:v", "high", "-pix_fmt", "yuv420p"])
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -152,7 +140,10 @@ class VideoResize(FFmpegBase):
             command.extend([output_path])
 
             # 执行命令
-            success, message = self.execute_ffmpeg(command)
+            if 分段并行:
+                success, message = self.execute_ffmpeg_chunked(command)
+            else:
+                success, message = self.execute_ffmpeg(command)
 
             if not success:
                 raise RuntimeError(f"FFmpeg 执行失败: {message}")
@@ -8,6 +8,7 @@ class VideoResolution(FFmpegBase):
     视频分辨率调整节点
     功能：调整视频分辨率，支持多种预设和自定义分辨率
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -26,6 +27,7 @@ class VideoResolution(FFmpegBase):
             "optional": {
                 "force_divisible": ("INT", {"default": 2, "min": 1}),
                 "pad_color": ("STRING", {"default": "black"}),
+                "chunked": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -67,7 +69,8 @@ class VideoResolution(FFmpegBase):
                         width: int, height: int, keep_aspect: bool,
                         scaling_method: str, use_gpu: bool,
                         force_divisible: int = 2,
-                        pad_color: str = "black") -> Tuple[str]:
+                        pad_color: str = "black",
+                        chunked: bool = False) -> Tuple[str]:
         """执行分辨率调整"""
         try:
             # 检查输入视频是否存在
@@ -136,19 +139,7 @@ class VideoResolution(FFmpegBase):
                 filter_complex.append("format=nv12")
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",  # 使用 NVENC 特定的预设
-                    "-rc:v", "vbr",   # 使用可变比特率
-                    "-cq:v", "23",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", "medium",
-                    "-crf", "23",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23))
 
             # 添加滤镜链
             command.extend(["-vf", ",".join(filter_complex)])
@@ -160,7 +151,10 @@ class VideoResolution(FFmpegBase):
             command.extend([output_path])
 
             # 执行命令
-            success, message = self.execute_ffmpeg(command)
+            if chunked:
+                success, message = self.execute_ffmpeg_chunked(command)
+            else:
+                success, message = self.execute_ffmpeg(command)
 
             if not success:
                 raise RuntimeError(f"FFmpeg 执行失败: {message}")
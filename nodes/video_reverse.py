@@ -8,6 +8,7 @@ class VideoReverse(FFmpegBase):
     视频倒放节点
     功能：将视频倒序播放
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -19,7 +20,7 @@ class VideoReverse(FFmpegBase):
             },
             "optional": {
                 "audio_reverse": ("BOOLEAN", {"default": False}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
             }
         }
 
@@ -37,7 +38,7 @@ class VideoReverse(FFmpegBase):
 
     def reverse_video(self, input_video: str, use_gpu: bool,
                      maintain_quality: bool, audio_reverse: bool = False,
-                     preset: str = "medium") -> Tuple[str]:
+                     preset: str = "auto") -> Tuple[str]:
         """执行视频倒放"""
         try:
             # 检查输入视频是否存在
@@ -77,19 +78,7 @@ class VideoReverse(FFmpegBase):
             command.extend(["-vf", ",".join(filter_complex)])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23" if maintain_quality else "28",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23" if maintain_quality else "28",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23 if maintain_quality else 28, speed=preset))
 
             # 处理音频
             if audio_reverse:
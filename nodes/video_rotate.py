@@ -8,6 +8,7 @@ class VideoRotate(FFmpegBase):
     视频旋转节点
     功能：旋转视频角度，支持水平和垂直翻转
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -21,7 +22,7 @@ class VideoRotate(FFmpegBase):
             },
             "optional": {
                 "background_color": ("STRING", {"default": "black"}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
             }
         }
 
@@ -40,7 +41,7 @@ class VideoRotate(FFmpegBase):
     def rotate_video(self, input_video: str, rotation_angle: int,
                     flip_horizontal: bool, flip_vertical: bool,
                     use_gpu: bool, background_color: str = "black",
-                    preset: str = "medium") -> Tuple[str]:
+                    preset: str = "auto") -> Tuple[str]:
         """执行视频旋转"""
         try:
             # 检查输入视频是否存在
@@ -87,19 +88,7 @@ class VideoRotate(FFmpegBase):
                 command.extend(["-vf", ",".join(filter_complex)])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -8,6 +8,7 @@ class VideoSpeed(FFmpegBase):
     视频速度调整节点
     功能：调整视频播放速度，支持加速和减速
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -19,7 +20,7 @@ class VideoSpeed(FFmpegBase):
                 "use_gpu": ("BOOLEAN", {"default": True}),
             },
             "optional": {
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
                 "audio_quality": ("INT", {"default": 3, "min": 0, "max": 5}),
             }
         }
@@ -38,7 +39,7 @@ class VideoSpeed(FFmpegBase):
 
     def adjust_speed(self, input_video: str, speed_factor: float,
                     maintain_pitch: bool, use_gpu: bool,
-                    preset: str = "medium",
+                    preset: str = "auto",
                     audio_quality: int = 3) -> Tuple[str]:
         """执行视频速度调整"""
         try:
@@ -79,19 +80,7 @@ class VideoSpeed(FFmpegBase):
             command.extend(["-vf", ",".join(filter_complex)])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
             # 处理音频
             if maintain_pitch:
@@ -1,5 +1,5 @@
 import os
-from typing import Tuple
+from typing import List, Tuple
 import folder_paths
 from ..base.ffmpeg_base import FFmpegBase
 
@@ -14,14 +14,18 @@ class VideoSplitting(FFmpegBase):
         return {
             "required": {
                 "input_video": ("STRING", {"default": ""}),
-                "split_mode": (["time", "duration", "segments"], {"default": "time"}),
+                "split_mode": (["time", "duration", "segments", "scenes"], {"default": "time"}),
                 "use_gpu": ("BOOLEAN", {"default": True}),
             },
             "optional": {
                 "start_time": ("STRING", {"default": "00:00:00"}),
                 "duration": ("STRING", {"default": "00:01:00"}),
                 "segments": ("INT", {"default": 2, "min": 2, "max": 100}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
+                "split_method": (["single_pass", "parallel"], {"default": "single_pass"}),
+                "stream_copy": ("BOOLEAN", {"default": False}),
+                "scene_threshold": ("FLOAT", {"default": 0.3, "min": 0.1, "max": 1.0, "step": 0.05}),
+                "min_scene_duration": ("FLOAT", {"default": 2.0, "min": 0.0, "max": 600.0, "step": 0.5}),
             }
         }
 
@@ -37,16 +41,90 @@ class VideoSplitting(FFmpegBase):
         output_filename = f"split_{video_hash}_part{index}.mp4"
         return os.path.join(base_output_dir, output_filename)
 
-    def get_video_duration(self, input_video: str) -> float:
-        """获取视频总时长"""
-        cmd = f'ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{input_video}"'
-        duration = float(os.popen(cmd).read().strip())
-        return duration
+    def split_single_pass(self, input_video: str, boundaries: List[float],
+                          use_gpu: bool, preset: str, stream_copy: bool) -> List[str]:
+        """
+        使用segment复用器一次读取输入、输出所有片段
+        重新编码时在分割点强制插入关键帧，保证在准确的时间切分
+        """
+        times = ",".join(f"{t:.6f}" for t in boundaries)
+        output_pattern = self.create_output_path(input_video, 0).replace("_part0.", "_part%d.")
+        # 分割点保留6位小数，向上舍入时会错过该时间的关键帧，允许提前半帧切分
+        framerate = self.get_video_framerate(input_video) or 25.0
+        time_delta = 0.5 / framerate
+        # 记录实际写出的片段，避免把之前运行留下的多余片段当作本次输出
+        segment_list = os.path.join(
+            self.temp_dir, os.path.basename(output_pattern).replace("_part%d.mp4", "_segments.txt")
+        )
+
+        command = ["ffmpeg", "-y"]
+        command.extend(self.get_gpu_params(use_gpu and not stream_copy)["hw_accel"])
+        command.extend(["-i", input_video, "-map", "0:v:0", "-map", "0:a?"])
+
+        if stream_copy:
+            command.extend(["-c", "copy"])
+        else:
+            command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
+            command.extend(["-force_key_frames", times, "-c:a", "copy"])
+            if use_gpu:
+                command.extend(["-forced-idr", "1"])
+
+        command.extend([
+            "-f", "segment",
+            "-segment_times", times,
+            "-segment_time_delta", f"{time_delta:.6f}",
+            "-segment_list", segment_list,
+            "-segment_list_type", "flat",
+            "-reset_timestamps", "1",
+            output_pattern
+        ])
+
+        try:
+            success, message = self.execute_ffmpeg(command)
+            if not success:
+                raise RuntimeError(f"分割视频时失败: {message}")
+
+            output_dir = os.path.dirname(output_pattern)
+            with open(segment_list, "r", encoding="utf-8") as f:
+                names = [line.strip() for line in f if line.strip()]
+        finally:
+            self.cleanup_temp_files(segment_list)
+
+        return [os.path.join(output_dir, os.path.basename(name)) for name in names]
+
+    def split_parallel(self, input_video: str, starts: List[float], total_duration: float,
+                       use_gpu: bool, preset: str) -> List[str]:
+        """每个片段一个ffmpeg进程，在输入端定位后并发执行"""
+        commands = []
+        output_files = []
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else total_duration
+            output_path = self.create_output_path(input_video, i)
+
+            command = ["ffmpeg", "-y"]
+            command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+            command.extend([
+                "-ss", f"{start:.6f}",
+                "-t", f"{end - start:.6f}",
+                "-i", input_video,
+            ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
+            command.extend(["-c:a", "copy", output_path])
+
+            commands.append(command)
+            output_files.append(output_path)
+
+        success, message = self.run_ffmpeg_parallel(commands)
+        if not success:
+            raise RuntimeError(f"分割视频时失败: {message}")
+        return output_files
 
     def split_video(self, input_video: str, split_mode: str,
                    use_gpu: bool, start_time: str = "00:00:00",
                    duration: str = "00:01:00", segments: int = 2,
-                   preset: str = "medium") -> Tuple[str]:
+                   preset: str = "auto", split_method: str = "single_pass",
+                   stream_copy: bool = False, scene_threshold: float = 0.3,
+                   min_scene_duration: float = 2.0) -> Tuple[str]:
         """执行视频分割"""
         try:
             # 检查输入视频是否存在
@@ -55,52 +133,46 @@ class VideoSplitting(FFmpegBase):
 
             output_files = []
             total_duration = self.get_video_duration(input_video)
-
-            if split_mode == "segments":
-                segment_duration = total_duration / segments
-                for i in range(segments):
-                    output_path = self.create_output_path(input_video, i)
-                    start = i * segment_duration
-                    
-                    command = [
-                        "ffmpeg",
-                        "-y",
+            if not total_duration:
+                raise RuntimeError("无法获取视频时长")
+
+            if split_mode in ("segments", "scenes"):
+                if split_mode == "scenes":
+                    # 在场景切换处分割，分割点来自缓存的场景索引
+                    scene_index = self.get_scene_index(input_video)
+                    if scene_index is None:
+                        raise RuntimeError("无法分析场景")
+                    boundaries = [
+                        t for t in scene_index.cuts(scene_threshold, min_scene_duration)
+                        if t < total_duration - min_scene_duration
                     ]
-
-                    if use_gpu:
-                        command.extend(["-hwaccel", "cuda"])
-
-                    command.extend([
-                        "-i", input_video,
-                        "-ss", str(start),
-                        "-t", str(segment_duration),
-                    ])
-
-                    # 添加编码器参数
-                    if use_gpu:
-                        command.extend([
-                            "-c:v", "h264_nvenc",
-                            "-preset", "p7",
-                            "-rc:v", "vbr",
-                            "-cq:v", "23",
-                        ])
-                    else:
-                        command.extend([
-                            "-c:v", "libx264",
-                            "-preset", preset,
-                            "-crf", "23",
-                        ])
-
-                    command.extend([
-                        "-c:a", "copy",
-                        output_path
-                    ])
-
-                    success, message = self.execute_ffmpeg(command)
-                    if success:
-                        output_files.append(output_path)
-                    else:
-                        raise RuntimeError(f"分割第{i+1}段时失败: {message}")
+                else:
+                    segment_duration = total_duration / segments
+                    boundaries = [i * segment_duration for i in range(1, segments)]
+
+                if stream_copy:
+                    # 流复制只能在关键帧处切分，把分割点对齐到之前最近的关键帧
+                    keyframe_index = self.get_keyframe_index(input_video)
+                    if keyframe_index is None:
+                        raise RuntimeError("无法获取关键帧信息")
+                    aligned = []
+                    for t in boundaries:
+                        keyframe = keyframe_index.nearest_keyframe_before(t)
+                        if keyframe > (aligned[-1] if aligned else 0.0):
+                            aligned.append(keyframe)
+                    boundaries = aligned
+
+                if not boundaries:
+                    raise RuntimeError("没有可用的分割点")
+
+                if split_method == "parallel" and not stream_copy:
+                    output_files = self.split_parallel(
+                        input_video, [0.0] + boundaries, total_duration, use_gpu, preset
+                    )
+                else:
+                    output_files = self.split_single_pass(
+                        input_video, boundaries, use_gpu, preset, stream_copy
+                    )
 
             else:  # time or duration mode
                 output_path = self.create_output_path(input_video, 0)
@@ -109,31 +181,18 @@ class VideoSplitting(FFmpegBase):
                     "-y",
                 ]
 
-                if use_gpu:
-                    command.extend(["-hwaccel", "cuda"])
+                command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
 
                 command.extend([
-                    "-i", input_video,
                     "-ss", start_time,
+                    "-i", input_video,
                 ])
 
                 if split_mode == "duration":
                     command.extend(["-t", duration])
 
                 # 添加编码器参数
-                if use_gpu:
-                    command.extend([
-                        "-c:v", "h264_nvenc",
-                        "-preset", "p7",
-                        "-rc:v", "vbr",
-                        "-cq:v", "23",
-                    ])
-                else:
-                    command.extend([
-                        "-c:v", "libx264",
-                        "-preset", preset,
-                        "-crf", "23",
-                    ])
+                command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
                 command.extend([
                     "-c:a", "copy",
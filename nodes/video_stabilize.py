@@ -22,7 +22,7 @@ class VideoStabilize(FFmpegBase):
                 "accuracy": ("INT", {"default": 15, "min": 1, "max": 15}),
                 "step_size": ("INT", {"default": 6, "min": 1, "max": 32}),
                 "min_contrast": ("FLOAT", {"default": 0.3, "min": 0.0, "max": 1.0}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
             }
         }
 
@@ -42,7 +42,7 @@ class VideoStabilize(FFmpegBase):
                        use_gpu: bool, shakiness: int = 5,
                        accuracy: int = 15, step_size: int = 6,
                        min_contrast: float = 0.3,
-                       preset: str = "medium") -> Tuple[str]:
+                       preset: str = "auto") -> Tuple[str]:
         """执行视频稳定"""
         try:
             # 检查输入视频是否存在
@@ -104,19 +104,7 @@ class VideoStabilize(FFmpegBase):
             command.extend(["-vf", ",".join(filter_complex)])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
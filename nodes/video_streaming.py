@@ -1,7 +1,12 @@
 import os
-from typing import Tuple
+import math
+from dataclasses import replace
+from typing import List, Tuple
 import folder_paths
 from ..base.ffmpeg_base import FFmpegBase
+from ..base.encoder_profile import per_stream_args
+from ..base.abr_ladder import Rung, build_ladder, build_split_filter
+from ..base import hls_packager
 
 class VideoStreaming(FFmpegBase):
     """
@@ -20,8 +25,10 @@ class VideoStreaming(FFmpegBase):
             },
             "optional": {
                 "playlist_name": ("STRING", {"default": "playlist"}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
                 "quality_levels": ("INT", {"default": 3, "min": 1, "max": 5}),
+                "resumable": ("BOOLEAN", {"default": False}),
+                "parallel_jobs": ("INT", {"default": 1, "min": 1, "max": 16}),
             }
         }
 
@@ -38,11 +45,124 @@ class VideoStreaming(FFmpegBase):
         os.makedirs(output_dir, exist_ok=True)
         return output_dir
 
+    def get_encode_args(self, ladder: List[Rung], has_audio: bool, use_gpu: bool,
+                        preset: str, segment_duration: int,
+                        audio_per_variant: bool) -> List[str]:
+        """解码一次后split成各档位分别编码的参数"""
+        args = ["-filter_complex", build_split_filter(ladder)]
+        encoder = self.get_gpu_params(use_gpu)["h264_encoder"]
+        profile = self.get_encoder_profile(speed=preset)
+
+        for i, rung in enumerate(ladder):
+            args.extend(["-map", f"[out{i}]"])
+            args.extend(per_stream_args(replace(profile, bitrate=rung.bitrate).args(encoder), i))
+            args.extend([
+                f"-maxrate:v:{i}", f"{rung.maxrate}k",
+                f"-bufsize:v:{i}", f"{rung.bufsize}k",
+            ])
+
+        # 各档在相同时间点插入关键帧，保证分片边界对齐，可以无缝切换
+        args.extend([
+            "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
+        ])
+        if encoder == "libx264":
+            args.extend(["-sc_threshold", "0"])
+
+        if has_audio:
+            # HLS每个档位各带一路音频，DASH所有档位共用一路
+            for _ in range(len(ladder) if audio_per_variant else 1):
+                args.extend(["-map", "0:a:0"])
+            args.extend(["-c:a", "aac", "-b:a", "128k", "-ac", "2"])
+        return args
+
+    def package_hls_resumable(self, input_video: str, output_dir: str, media_info,
+                              ladder: List[Rung], segment_duration: int, use_gpu: bool,
+                              playlist_name: str, preset: str, parallel_jobs: int) -> str:
+        """
+        分区间编码HLS
+        每个区间从分片边界开始在输入端定位，已完成的分片直接跳过，全部完成后拼接播放列表
+        返回: 主播放列表路径
+        """
+        duration = media_info.duration or self.get_video_duration(input_video)
+        if not duration:
+            raise RuntimeError("无法获取视频时长")
+        # 不足一帧的结尾不会形成分片
+        frame_time = 1.0 / (self.get_video_framerate(input_video) or 30.0)
+        total_segments = max(1, math.ceil((duration - frame_time / 2) / segment_duration))
+        has_audio = media_info.audio is not None
+
+        # 编码参数变化后已有分片不能续用
+        manifest_path = os.path.join(output_dir, f"{playlist_name}_job.json")
+        manifest = {
+            "ladder": [[rung.height, rung.bitrate] for rung in ladder],
+            "segment_duration": segment_duration,
+            "use_gpu": use_gpu,
+            "preset": preset,
+            "has_audio": has_audio,
+        }
+        if hls_packager.load_manifest(manifest_path) != manifest:
+            hls_packager.remove_pieces(output_dir, playlist_name)
+            hls_packager.save_manifest(manifest_path, manifest)
+
+        done = hls_packager.completed_segments(output_dir, playlist_name, len(ladder))
+        ranges = hls_packager.plan_ranges(total_segments, parallel_jobs, done)
+        if done and ranges:
+            print(f"HLS续传: 已完成 {len(done)}/{total_segments} 个分片")
+
+        if has_audio:
+            stream_map = " ".join(f"v:{i},a:{i}" for i in range(len(ladder)))
+        else:
+            stream_map = " ".join(f"v:{i}" for i in range(len(ladder)))
+
+        commands = []
+        for start, end in ranges:
+            start_time = start * segment_duration
+            command = ["ffmpeg", "-y"]
+            command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+            command.extend(["-ss", str(start_time)])
+            if end < total_segments:
+                command.extend(["-t", str((end - start) * segment_duration)])
+            command.extend(["-i", input_video])
+            command.extend(self.get_encode_args(
+                ladder, has_audio, use_gpu, preset, segment_duration, audio_per_variant=True
+            ))
+            command.extend([
+                "-f", "hls",
+                "-hls_time", str(segment_duration),
+                "-hls_list_size", "0",
+                "-hls_playlist_type", "event",
+                "-start_number", str(start),
+                "-hls_segment_filename", hls_packager.segment_filename_pattern(output_dir, playlist_name),
+                "-var_stream_map", stream_map,
+                hls_packager.piece_playlist_path(output_dir, playlist_name, start),
+            ])
+            commands.append(command)
+
+        if commands:
+            success, message = self.run_ffmpeg_parallel(commands)
+            if not success:
+                raise RuntimeError(f"流媒体转换失败: {message}")
+            done = hls_packager.completed_segments(output_dir, playlist_name, len(ladder))
+
+        playlists = hls_packager.write_media_playlists(output_dir, playlist_name, total_segments, done)
+
+        video = media_info.video
+        variants = []
+        for playlist, rung in zip(playlists, ladder):
+            width = int(round(video.width * rung.height / video.height / 2)) * 2
+            bandwidth = (rung.maxrate + (128 if has_audio else 0)) * 1000
+            variants.append((playlist, bandwidth, width, rung.height))
+        output_path = os.path.join(output_dir, f"{playlist_name}.m3u8")
+        hls_packager.write_master_playlist(output_path, variants)
+        return output_path
+
     def create_stream(self, input_video: str, format: str,
                      segment_duration: int, use_gpu: bool,
                      playlist_name: str = "playlist",
-                     preset: str = "medium",
-                     quality_levels: int = 3) -> Tuple[str]:
+                     preset: str = "auto",
+                     quality_levels: int = 3,
+                     resumable: bool = False,
+                     parallel_jobs: int = 1) -> Tuple[str]:
         """执行流媒体转换"""
         try:
             # 检查输入视频是否存在
@@ -52,60 +172,65 @@ class VideoStreaming(FFmpegBase):
             # 创建输出目录
             output_dir = self.create_output_path(input_video, format)
             
-            # 基础命令
+            media_info = self.probe(input_video)
+            if media_info is None:
+                raise RuntimeError("无法获取视频信息")
+
+            # 根据源视频生成各档清晰度，解码一次后split成多路编码
+            ladder = build_ladder(media_info, quality_levels)
+            has_audio = media_info.audio is not None
+
+            # HLS可以按分片区间分段编码，支持中断后续传和多进程并行
+            if format == "hls" and (resumable or parallel_jobs > 1):
+                output_path = self.package_hls_resumable(
+                    input_video, output_dir, media_info, ladder, segment_duration,
+                    use_gpu, playlist_name, preset, parallel_jobs
+                )
+                return (output_path,)
+
             command = [
                 "ffmpeg",
                 "-y",
             ]
 
             # 添加GPU相关参数
-            if use_gpu:
-                command.extend(["-hwaccel", "cuda"])
+            command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
 
-            # 添加输入文件
             command.extend(["-i", input_video])
-
-            # 构建滤镜字符串
-            filter_complex = []
-            
-            if use_gpu:
-                filter_complex.append("hwupload_cuda")
-                filter_complex.append("hwdownload")
-                filter_complex.append("format=nv12")
-
-            # 添加滤镜链（如果有）
-            if filter_complex:
-                command.extend(["-vf", ",".join(filter_complex)])
+            command.extend(self.get_encode_args(
+                ladder, has_audio, use_gpu, preset, segment_duration,
+                audio_per_variant=(format == "hls")
+            ))
 
             # 根据格式设置特定参数
             if format == "hls":
+                if has_audio:
+                    stream_map = " ".join(f"v:{i},a:{i}" for i in range(len(ladder)))
+                else:
+                    stream_map = " ".join(f"v:{i}" for i in range(len(ladder)))
                 output_path = os.path.join(output_dir, f"{playlist_name}.m3u8")
                 command.extend([
-                    "-c:v", "h264_nvenc" if use_gpu else "libx264",
-                    "-preset", "p7" if use_gpu else preset,
-                    "-c:a", "aac",
-                    "-b:a", "128k",
                     "-f", "hls",
                     "-hls_time", str(segment_duration),
                     "-hls_list_size", "0",
-                    "-hls_segment_filename", os.path.join(output_dir, "segment%03d.ts"),
+                    "-hls_playlist_type", "vod",
+                    "-hls_segment_filename", os.path.join(output_dir, f"{playlist_name}_%v_%03d.ts"),
+                    "-master_pl_name", f"{playlist_name}.m3u8",
+                    "-var_stream_map", stream_map,
+                    os.path.join(output_dir, f"{playlist_name}_%v.m3u8"),
                 ])
             else:  # dash
                 output_path = os.path.join(output_dir, f"{playlist_name}.mpd")
+                adaptation_sets = "id=0,streams=v id=1,streams=a" if has_audio else "id=0,streams=v"
                 command.extend([
-                    "-c:v", "h264_nvenc" if use_gpu else "libx264",
-                    "-preset", "p7" if use_gpu else preset,
-                    "-c:a", "aac",
-                    "-b:a", "128k",
                     "-f", "dash",
                     "-seg_duration", str(segment_duration),
+                    "-adaptation_sets", adaptation_sets,
                     "-init_seg_name", "init-$RepresentationID$.m4s",
                     "-media_seg_name", "chunk-$RepresentationID$-$Number%05d$.m4s",
+                    output_path,
                 ])
 
-            # 添加输出路径
-            command.extend([output_path])
-
             # 执行命令
             success, message = self.execute_ffmpeg(command)
 
@@ -22,7 +22,7 @@ class VideoSubtitle(FFmpegBase):
                 "font_file": ("STRING", {"default": ""}),
                 "font_size": ("INT", {"default": 24, "min": 8, "max": 72}),
                 "font_color": ("STRING", {"default": "white"}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
                 "subtitle_encoding": ("STRING", {"default": "utf-8"}),
             }
         }
@@ -46,7 +46,7 @@ class VideoSubtitle(FFmpegBase):
                         use_gpu: bool, subtitle_file: str = "",
                         font_file: str = "", font_size: int = 24,
                         font_color: str = "white",
-                        preset: str = "medium",
+                        preset: str = "auto",
                         subtitle_encoding: str = "utf-8") -> Tuple[str]:
         """处理视频字幕"""
         try:
@@ -96,19 +96,7 @@ class VideoSubtitle(FFmpegBase):
                 command.extend(["-vf", ",".join(filter_complex)])
 
                 # 添加编码器参数
-                if use_gpu:
-                    command.extend([
-                        "-c:v", "h264_nvenc",
-                        "-preset", "p7",
-                        "-rc:v", "vbr",
-                        "-cq:v", "23",
-                    ])
-                else:
-                    command.extend([
-                        "-c:v", "libx264",
-                        "-preset", preset,
-                        "-crf", "23",
-                    ])
+                command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
                 # 复制音频流
                 command.extend(["-c:a", "copy"])
@@ -128,19 +116,7 @@ class VideoSubtitle(FFmpegBase):
                     "-map", "0:a",  # 只选择音频流
                 ])
 
-                if use_gpu:
-                    command.extend([
-                        "-c:v", "h264_nvenc",
-                        "-preset", "p7",
-                        "-rc:v", "vbr",
-                        "-cq:v", "23",
-                    ])
-                else:
-                    command.extend([
-                        "-c:v", "libx264",
-                        "-preset", preset,
-                        "-crf", "23",
-                    ])
+                command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
                 command.extend(["-c:a", "copy"])
 
@@ -1,20 +1,24 @@
 import os
-from typing import Tuple
+import math
+from typing import List, Tuple
 import folder_paths
 from ..base.ffmpeg_base import FFmpegBase
+from ..base.scheduler import PRIORITY_INTERACTIVE
 
 class VideoThumbnail(FFmpegBase):
     """
     视频缩略图生成节点
-    功能：从视频中提取缩略图，支持单帧和多帧
+    功能：从视频中提取缩略图，支持单帧、多帧、关键帧、指定时间点、按场景挑选和缩略图拼图
     """
+    # 缩略图用于预览，优先于批量任务执行
+    JOB_PRIORITY = PRIORITY_INTERACTIVE
     
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "input_video": ("STRING", {"default": ""}),
-                "mode": (["single", "multiple"], {"default": "single"}),
+                "mode": (["single", "multiple", "keyframes", "timestamps", "contact_sheet", "scenes"], {"default": "single"}),
                 "use_gpu": ("BOOLEAN", {"default": True}),
             },
             "optional": {
@@ -24,6 +28,10 @@ class VideoThumbnail(FFmpegBase):
                 "width": ("INT", {"default": 320, "min": 32}),
                 "height": ("INT", {"default": 240, "min": 32}),
                 "quality": ("INT", {"default": 90, "min": 1, "max": 100}),
+                # 逗号分隔的时间点(秒或HH:MM:SS)，为空时在整个视频中均匀取 max_frames 个
+                "timestamps": ("STRING", {"default": ""}),
+                "columns": ("INT", {"default": 4, "min": 1, "max": 20}),
+                "scene_threshold": ("FLOAT", {"default": 0.3, "min": 0.1, "max": 1.0, "step": 0.05}),
             }
         }
 
@@ -38,15 +46,60 @@ class VideoThumbnail(FFmpegBase):
         base_output_dir = folder_paths.get_output_directory()
         if mode == "single":
             output_filename = f"thumbnail_{video_hash}.jpg"
+        elif mode == "contact_sheet":
+            output_filename = f"thumbnail_{video_hash}_sheet.jpg"
         else:
             output_filename = f"thumbnail_{video_hash}_%03d.jpg" if index == 0 else f"thumbnail_{video_hash}_{index:03d}.jpg"
         return os.path.join(base_output_dir, output_filename)
 
+    def get_timestamps(self, input_video: str, timestamps: str, max_frames: int) -> List[str]:
+        """解析时间点列表，为空时按视频时长均匀分布"""
+        values = [t.strip() for t in timestamps.split(",") if t.strip()]
+        if values:
+            return values[:max_frames]
+
+        duration = self.get_video_duration(input_video)
+        if not duration:
+            raise RuntimeError("无法获取视频时长")
+        # 取每一段的中点，避开开头的黑场和结尾
+        return [f"{duration * (i + 0.5) / max_frames:.3f}" for i in range(max_frames)]
+
+    def get_scene_timestamps(self, input_video: str, max_frames: int,
+                             scene_threshold: float) -> List[str]:
+        """从场景索引中为每个主要场景挑选一个代表帧"""
+        duration = self.get_video_duration(input_video)
+        if not duration:
+            raise RuntimeError("无法获取视频时长")
+        scene_index = self.get_scene_index(input_video)
+        if scene_index is None:
+            raise RuntimeError("无法分析场景")
+        times = scene_index.representative_times(max_frames, duration, scene_threshold)
+        return [f"{t:.3f}" for t in times]
+
+    def extract_timestamps(self, input_video: str, times: List[str], use_gpu: bool,
+                           width: int, height: int, quality: int) -> Tuple[bool, str]:
+        """每个时间点单独在输入端定位后解码一帧，多个进程并行执行"""
+        commands = []
+        for index, time_position in enumerate(times, 1):
+            command = ["ffmpeg", "-y"]
+            command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+            command.extend([
+                "-ss", time_position,
+                "-i", input_video,
+                "-vframes", "1",
+                "-vf", f"scale={width}:{height}",
+                "-q:v", str(int((100 - quality) / 5)),
+                self.create_output_path(input_video, "timestamps", index),
+            ])
+            commands.append(command)
+        return self.run_ffmpeg_parallel(commands)
+
     def generate_thumbnail(self, input_video: str, mode: str,
                          use_gpu: bool, time_position: str = "00:00:00",
                          frame_interval: int = 10, max_frames: int = 10,
                          width: int = 320, height: int = 240,
-                         quality: int = 90) -> Tuple[str]:
+                         quality: int = 90, timestamps: str = "",
+                         columns: int = 4, scene_threshold: float = 0.3) -> Tuple[str]:
         """生成视频缩略图"""
         try:
             # 检查输入视频是否存在
@@ -56,14 +109,25 @@ class VideoThumbnail(FFmpegBase):
             # 创建输出文件路径
             output_path = self.create_output_path(input_video, mode)
 
+            if mode in ("timestamps", "scenes"):
+                if mode == "scenes":
+                    times = self.get_scene_timestamps(input_video, max_frames, scene_threshold)
+                else:
+                    times = self.get_timestamps(input_video, timestamps, max_frames)
+                success, message = self.extract_timestamps(
+                    input_video, times, use_gpu, width, height, quality
+                )
+                if not success:
+                    raise RuntimeError(f"生成缩略图失败: {message}")
+                return (output_path,)
+
             if mode == "single":
                 command = [
                     "ffmpeg",
                     "-y",
                 ]
 
-                if use_gpu:
-                    command.extend(["-hwaccel", "cuda"])
+                command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
 
                 command.extend([
                     "-ss", time_position,
@@ -73,14 +137,60 @@ class VideoThumbnail(FFmpegBase):
                     "-q:v", str(int((100 - quality) / 5)),  # 转换质量参数
                 ])
 
+            elif mode == "keyframes":
+                command = [
+                    "ffmpeg",
+                    "-y",
+                ]
+
+                command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+
+                # 只解码关键帧，frame_interval 表示每隔几个关键帧取一张
+                command.extend([
+                    "-skip_frame", "nokey",
+                    "-i", input_video,
+                    "-vf", f"select=not(mod(n\\,{frame_interval})),scale={width}:{height}",
+                    "-vsync", "0",
+                    "-frame_pts", "1",
+                    "-vframes", str(max_frames),
+                    "-q:v", str(int((100 - quality) / 5)),
+                ])
+
+            elif mode == "contact_sheet":
+                duration = self.get_video_duration(input_video)
+                if not duration:
+                    raise RuntimeError("无法获取视频时长")
+                rows = math.ceil(max_frames / columns)
+                # 按时间间隔挑选后由tile拼成一张图；关键帧间隔都不超过挑选间隔时只解码关键帧
+                step = duration / max_frames
+                keyframe_times = self.get_keyframe_times(input_video)
+                bounds = [0.0] + keyframe_times + [duration]
+                max_gap = max(b - a for a, b in zip(bounds, bounds[1:]))
+                command = [
+                    "ffmpeg",
+                    "-y",
+                ]
+
+                command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+
+                if keyframe_times and max_gap <= step:
+                    command.extend(["-skip_frame", "nokey"])
+                command.extend([
+                    "-i", input_video,
+                    "-vf", (f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{step:.3f})',"
+                            f"scale={width}:{height},tile={columns}x{rows}"),
+                    "-vsync", "0",
+                    "-vframes", "1",
+                    "-q:v", str(int((100 - quality) / 5)),
+                ])
+
             else:  # multiple
                 command = [
                     "ffmpeg",
                     "-y",
                 ]
 
-                if use_gpu:
-                    command.extend(["-hwaccel", "cuda"])
+                command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
 
                 command.extend([
                     "-i", input_video,
@@ -0,0 +1,181 @@
+import os
+import math
+from typing import Optional, Tuple
+from ..base.ffmpeg_base import FFmpegBase
+
+class VideoToImages(FFmpegBase):
+    """
+    视频转图像节点
+    功能：把视频解码为ComfyUI的IMAGE批次，缩放和抽帧在ffmpeg中完成，
+    原始帧通过管道直接读入预分配的缓冲区，不经过图片文件
+    """
+    # 每次从管道读取的帧数
+    READ_CHUNK_FRAMES = 16
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "input_video": ("STRING", {"default": ""}),
+                "use_gpu": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                "start_time": ("STRING", {"default": "00:00:00"}),
+                "frame_stride": ("INT", {"default": 1, "min": 1, "max": 1000}),
+                # 0表示读取到视频结尾
+                "max_frames": ("INT", {"default": 0, "min": 0, "max": 100000}),
+                # 0表示保持原尺寸，只设置一边时按比例缩放
+                "width": ("INT", {"default": 0, "min": 0, "max": 8192}),
+                "height": ("INT", {"default": 0, "min": 0, "max": 8192}),
+                # 整段解码一次写入帧缓存，之后同一视频、同一尺寸的读取直接从缓存取帧
+                "use_frame_cache": ("BOOLEAN", {"default": False}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "INT", "FLOAT")
+    RETURN_NAMES = ("images", "frame_count", "fps")
+    FUNCTION = "load_frames"
+    CATEGORY = "FFmpeg"
+
+    def get_output_size(self, input_video: str, width: int, height: int) -> Tuple[int, int]:
+        """计算输出尺寸(偶数)，需要提前确定每帧的字节数"""
+        resolution = self.get_video_resolution(input_video)
+        if not resolution or not all(resolution):
+            raise RuntimeError("无法获取视频分辨率")
+        source_width, source_height = resolution
+
+        if width and height:
+            return width, height
+        if width:
+            return width, max(2, int(round(source_height * width / source_width / 2)) * 2)
+        if height:
+            return max(2, int(round(source_width * height / source_height / 2)) * 2), height
+        return source_width, source_height
+
+    def estimate_frame_count(self, input_video: str, start: float, frame_stride: int,
+                             max_frames: int) -> Optional[int]:
+        """根据时长和帧率估计输出帧数，用于预分配缓冲区"""
+        duration = self.get_video_duration(input_video)
+        framerate = self.get_video_framerate(input_video)
+        if not duration or not framerate:
+            return max_frames or None
+        estimate = math.ceil(max(0.0, duration - start) * framerate / frame_stride) + 1
+        return min(estimate, max_frames) if max_frames else estimate
+
+    def build_command(self, input_video: str, use_gpu: bool, start_time: str,
+                      frame_stride: int, max_frames: int, width: int, height: int) -> list:
+        """生成向标准输出写rgb24原始帧的命令"""
+        command = ["ffmpeg", "-nostdin"]
+        command.extend(self.get_gpu_params(use_gpu)["hw_accel"])
+        if start_time and self.parse_time(start_time) > 0:
+            command.extend(["-ss", start_time])
+        command.extend(["-i", input_video, "-an", "-sn", "-dn"])
+
+        filters = []
+        if frame_stride > 1:
+            filters.append(f"select=not(mod(n\\,{frame_stride}))")
+        filters.append(f"scale={width}:{height}")
+        command.extend(["-vf", ",".join(filters), "-vsync", "0"])
+        if max_frames:
+            command.extend(["-frames:v", str(max_frames)])
+
+        command.extend(["-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1"])
+        return command
+
+    @staticmethod
+    def _read_frames(stream, buffer, frame_size: int) -> int:
+        """
+        把管道数据读入buffer，直到填满或数据结束
+        返回: 读到的完整帧数
+        """
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view):
+            count = stream.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        return filled // frame_size
+
+    def frames_from_cache(self, cached, start: float, frame_stride: int, max_frames: int):
+        """从帧缓存的内存映射切片转换为IMAGE批次"""
+        import numpy as np
+        import torch
+
+        frames = cached.select(start, frame_stride, max_frames)
+        if len(frames) == 0:
+            raise RuntimeError("没有读取到视频帧")
+        images = torch.empty(frames.shape, dtype=torch.float32)
+        chunk = np.empty((self.READ_CHUNK_FRAMES,) + frames.shape[1:], dtype=np.uint8)
+        for i in range(0, len(frames), self.READ_CHUNK_FRAMES):
+            count = len(frames[i:i + self.READ_CHUNK_FRAMES])
+            chunk[:count] = frames[i:i + count]
+            images[i:i + count].copy_(torch.from_numpy(chunk[:count]))
+        return images.mul_(1.0 / 255.0)
+
+    def load_frames(self, input_video: str, use_gpu: bool = False,
+                    start_time: str = "00:00:00", frame_stride: int = 1,
+                    max_frames: int = 0, width: int = 0, height: int = 0,
+                    use_frame_cache: bool = False):
+        """读取视频帧"""
+        try:
+            import numpy as np
+            import torch
+
+            # 检查输入视频是否存在
+            if not os.path.exists(input_video):
+                raise FileNotFoundError("输入视频文件不存在")
+
+            width, height = self.get_output_size(input_video, width, height)
+            frame_size = width * height * 3
+            start = self.parse_time(start_time) if start_time else 0.0
+            fps = (self.get_video_framerate(input_video) or 0.0) / frame_stride
+
+            if use_frame_cache:
+                cached = self.get_cached_frames(input_video, width, height)
+                if cached is not None:
+                    images = self.frames_from_cache(cached, start, frame_stride, max_frames)
+                    return (images, images.shape[0], fps)
+            capacity = self.estimate_frame_count(input_video, start, frame_stride, max_frames) or 256
+
+            # 输出直接写入预分配的float32批次，管道数据只经过一个小的uint8中转缓冲区
+            images = torch.empty((capacity, height, width, 3), dtype=torch.float32)
+            chunk = np.empty((self.READ_CHUNK_FRAMES, height, width, 3), dtype=np.uint8)
+            chunk_tensor = torch.from_numpy(chunk)
+            count = 0
+
+            command = self.build_command(
+                input_video, use_gpu, start_time, frame_stride, max_frames, width, height
+            )
+            with self.open_ffmpeg_pipe(command, stdout=True) as (process, stderr_tail):
+                while True:
+                    frames = self._read_frames(process.stdout, chunk, frame_size)
+                    if frames == 0:
+                        break
+                    if count + frames > capacity:
+                        # 估计偏小时扩容
+                        capacity = max(capacity * 2, count + frames)
+                        grown = torch.empty((capacity, height, width, 3), dtype=torch.float32)
+                        grown[:count].copy_(images[:count])
+                        images = grown
+                    images[count:count + frames].copy_(chunk_tensor[:frames])
+                    count += frames
+                    if frames < self.READ_CHUNK_FRAMES:
+                        break
+                process.stdout.close()
+
+            if process.returncode != 0:
+                raise RuntimeError(f"解码视频失败: {''.join(stderr_tail)}")
+            if count == 0:
+                raise RuntimeError("没有读取到视频帧")
+
+            images = images[:count]
+            if count < capacity * 3 // 4:
+                # 扩容后剩余空间较多时释放多余的内存
+                images = images.clone()
+            images.mul_(1.0 / 255.0)
+            return (images, count, fps)
+
+        except Exception as e:
+            print(f"读取视频帧时出错: {str(e)}")
+            raise
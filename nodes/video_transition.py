@@ -21,7 +21,7 @@ class VideoTransition(FFmpegBase):
                 "use_gpu": ("BOOLEAN", {"default": True}),
             },
             "optional": {
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
                 "direction": (["left", "right", "up", "down"], {"default": "left"}),
                 "maintain_quality": ("BOOLEAN", {"default": True}),
             }
@@ -34,14 +34,14 @@ class VideoTransition(FFmpegBase):
 
     def create_output_path(self, input_video1: str, input_video2: str) -> str:
         """创建输出文件路径"""
-        video_hash = self.get_video_hash(input_video1 + input_video2)
+        video_hash = self.get_video_hash(input_video1, input_video2)
         base_output_dir = folder_paths.get_output_directory()
         output_filename = f"transition_{video_hash}.mp4"
         return os.path.join(base_output_dir, output_filename)
 
     def create_transition(self, input_video1: str, input_video2: str,
                          transition_type: str, transition_duration: float,
-                         use_gpu: bool, preset: str = "medium",
+                         use_gpu: bool, preset: str = "auto",
                          direction: str = "left",
                          maintain_quality: bool = True) -> Tuple[str]:
         """创建视频转场效果"""
@@ -117,19 +117,7 @@ class VideoTransition(FFmpegBase):
             ])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23" if maintain_quality else "28",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23" if maintain_quality else "28",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23 if maintain_quality else 28, speed=preset))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
@@ -1,13 +1,19 @@
 import os
-from typing import Tuple
+import shutil
+import tempfile
+from typing import Optional, Tuple
 import folder_paths
 from ..base.ffmpeg_base import FFmpegBase
+from ..base.chunked import write_concat_list
+from ..base.encoder_profile import normalize_speed
+from ..base.smart_cut import plan_smart_cut, matching_encoder_args, timescale_args
 
 class VideoTrim(FFmpegBase):
     """
     视频裁剪节点
     功能：裁剪视频的时间段或帧范围
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -23,8 +29,9 @@ class VideoTrim(FFmpegBase):
                 "duration": ("STRING", {"default": ""}),
                 "start_frame": ("INT", {"default": 0, "min": 0}),
                 "end_frame": ("INT", {"default": -1, "min": -1}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
                 "maintain_quality": ("BOOLEAN", {"default": True}),
+                "smart_cut": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -42,19 +49,116 @@ class VideoTrim(FFmpegBase):
 
     def get_video_info(self, input_video: str) -> dict:
         """获取视频信息"""
-        cmd = f'ffprobe -v error -select_streams v:0 -show_entries stream=nb_frames,duration -of default=noprint_wrappers=1 "{input_video}"'
         info = {}
-        for line in os.popen(cmd).readlines():
-            key, value = line.strip().split('=')
-            info[key] = float(value) if key == 'duration' else int(value)
+        media_info = self.probe(input_video)
+        video = media_info.video if media_info else None
+        if video is not None:
+            if video.nb_frames is not None:
+                info['nb_frames'] = video.nb_frames
+            if video.duration is not None:
+                info['duration'] = video.duration
         return info
 
+    def get_trim_range(self, input_video: str, trim_mode: str,
+                       start_time: str, end_time: str, duration: str,
+                       start_frame: int, end_frame: int) -> Tuple[float, Optional[float]]:
+        """把裁剪参数换算为 (起点, 终点) 秒数，终点为None表示到结尾"""
+        if trim_mode == "time":
+            start = self.parse_time(start_time)
+            if end_time:
+                return start, self.parse_time(end_time)
+            if duration:
+                return start, start + self.parse_time(duration)
+            return start, None
+
+        framerate = self.get_video_framerate(input_video)
+        if not framerate:
+            raise RuntimeError("无法获取视频帧率")
+        end = (end_frame + 1) / framerate if end_frame != -1 else None
+        return start_frame / framerate, end
+
+    def smart_trim(self, input_video: str, start: float, end: Optional[float],
+                   output_path: str, preset: str) -> Optional[Tuple[bool, str]]:
+        """
+        智能剪切：完整的GOP流复制，只重新编码两端不完整的GOP
+        源视频编码格式不支持或区间内没有完整GOP时返回None，由调用方完整重新编码
+        """
+        media_info = self.probe(input_video)
+        video = media_info.video if media_info else None
+        encoder_args = matching_encoder_args(video) if video is not None else None
+        if encoder_args is None:
+            return None
+
+        keyframe_index = self.get_keyframe_index(input_video)
+        if keyframe_index is None:
+            return None
+
+        frame_time = 1.0 / (video.frame_rate or 30.0)
+        plan = plan_smart_cut(keyframe_index, start, end, frame_time)
+        if not any(part.copy for part in plan):
+            return None
+
+        def produce(target: str) -> Tuple[bool, str]:
+            work_dir = tempfile.mkdtemp(prefix="smartcut_", dir=self.temp_dir)
+            try:
+                # 各段使用MPEG-TS，关键帧前带有参数集，拼接时不依赖各段各自的extradata
+                part_files = [os.path.join(work_dir, f"part_{i:02d}.ts") for i in range(len(plan))]
+                commands = []
+                for part, part_file in zip(plan, part_files):
+                    if part.copy:
+                        # 稍微越过关键帧定位，防止时间戳取整后落到前一个GOP
+                        command = ["ffmpeg", "-y", "-ss", f"{part.start + frame_time / 4:.6f}"]
+                    else:
+                        command = ["ffmpeg", "-y", "-ss", f"{part.start:.6f}"]
+                    if part.end is not None:
+                        # 边界帧属于下一段
+                        command.extend(["-t", f"{part.duration - frame_time / 2:.6f}"])
+                    command.extend(["-i", input_video, "-map", "0:v:0"])
+                    if part.copy:
+                        command.extend(["-c:v", "copy", "-avoid_negative_ts", "make_zero"])
+                    else:
+                        command.extend(encoder_args + ["-preset", normalize_speed(preset), "-crf", "18"])
+                    command.extend(["-f", "mpegts", part_file])
+                    commands.append(command)
+
+                success, message = self.run_ffmpeg_parallel(commands)
+                if not success:
+                    return False, message
+
+                list_path = os.path.join(work_dir, "concat_list.txt")
+                write_concat_list(list_path, part_files)
+
+                # 拼接视频，音频从原文件按相同区间复制
+                command = [
+                    "ffmpeg", "-y",
+                    "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-ss", f"{start:.6f}",
+                ]
+                if end is not None:
+                    command.extend(["-t", f"{end - start:.6f}"])
+                command.extend([
+                    "-i", input_video,
+                    "-map", "0:v", "-map", "1:a?",
+                    "-c", "copy",
+                    *timescale_args(video),
+                    target
+                ])
+                returncode, _, stderr = self.run_ffmpeg(command, progress=False, cache=False)
+                return returncode == 0, stderr
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        key_command = ["ffmpeg", "-ss", f"{start:.6f}", "-to", str(end), "-i", input_video,
+                       "smart_cut", preset, output_path]
+        return self.execute_composite(key_command, produce)
+
     def trim_video(self, input_video: str, trim_mode: str,
                   use_gpu: bool, start_time: str = "00:00:00",
                   end_time: str = "", duration: str = "",
                   start_frame: int = 0, end_frame: int = -1,
-                  preset: str = "medium",
-                  maintain_quality: bool = True) -> Tuple[str]:
+                  preset: str = "auto",
+                  maintain_quality: bool = True,
+                  smart_cut: bool = False) -> Tuple[str]:
         """执行视频裁剪"""
         try:
             # 检查输入视频是否存在
@@ -64,6 +168,18 @@ class VideoTrim(FFmpegBase):
             # 创建输出文件路径
             output_path = self.create_output_path(input_video)
 
+            if smart_cut:
+                start, end = self.get_trim_range(
+                    input_video, trim_mode, start_time, end_time, duration,
+                    start_frame, end_frame
+                )
+                result = self.smart_trim(input_video, start, end, output_path, preset)
+                if result is not None:
+                    success, message = result
+                    if not success:
+                        raise RuntimeError(f"裁剪视频失败: {message}")
+                    return (output_path,)
+
             # 构建基本命令
             command = [
                 "ffmpeg",
@@ -83,34 +199,22 @@ class VideoTrim(FFmpegBase):
                 elif duration:
                     command.extend(["-t", duration])
             else:  # frame mode
-                video_info = self.get_video_info(input_video)
-                total_frames = video_info.get('nb_frames', 0)
-                
-                if end_frame == -1:
-                    end_frame = total_frames
-                
-                command.extend([
-                    "-vf", f"select=between(n\\,{start_frame}\\,{end_frame})",
-                    "-vsync", "0"
-                ])
+                # 帧号换算为时间，在输入端定位，不必从头解码
+                framerate = self.get_video_framerate(input_video)
+                if not framerate:
+                    raise RuntimeError("无法获取视频帧率")
+
+                if start_frame > 0:
+                    command.extend(["-ss", f"{start_frame / framerate:.6f}"])
+                if end_frame != -1:
+                    frame_count = max(1, end_frame - start_frame + 1)
+                    command.extend(["-t", f"{frame_count / framerate:.6f}"])
 
             # 添加输入文件
             command.extend(["-i", input_video])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23" if maintain_quality else "28",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23" if maintain_quality else "28",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23 if maintain_quality else 28, speed=preset))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])
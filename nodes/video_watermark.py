@@ -8,6 +8,7 @@ class VideoWatermark(FFmpegBase):
     视频水印处理节点
     功能：为视频添加图片或文字水印
     """
+    CACHE_RESULTS = True
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -27,7 +28,7 @@ class VideoWatermark(FFmpegBase):
                 "font_color": ("STRING", {"default": "white"}),
                 "opacity": ("FLOAT", {"default": 0.8, "min": 0.0, "max": 1.0}),
                 "margin": ("INT", {"default": 10, "min": 0}),
-                "preset": (["medium", "fast", "slow"], {"default": "medium"}),
+                "preset": (["auto", "medium", "fast", "slow"], {"default": "auto"}),
             }
         }
 
@@ -59,7 +60,7 @@ class VideoWatermark(FFmpegBase):
                      image_path: str = "", text_content: str = "",
                      font_file: str = "", font_size: int = 24,
                      font_color: str = "white", opacity: float = 0.8,
-                     margin: int = 10, preset: str = "medium") -> Tuple[str]:
+                     margin: int = 10, preset: str = "auto") -> Tuple[str]:
         """添加水印"""
         try:
             # 检查输入视频是否存在
@@ -141,19 +142,7 @@ class VideoWatermark(FFmpegBase):
             ])
 
             # 添加编码器参数
-            if use_gpu:
-                command.extend([
-                    "-c:v", "h264_nvenc",
-                    "-preset", "p7",
-                    "-rc:v", "vbr",
-                    "-cq:v", "23",
-                ])
-            else:
-                command.extend([
-                    "-c:v", "libx264",
-                    "-preset", preset,
-                    "-crf", "23",
-                ])
+            command.extend(self.get_encoder_args(use_gpu, quality=23, speed=preset))
 
             # 复制音频流
             command.extend(["-c:a", "copy"])